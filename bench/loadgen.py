@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Generador de carga sintética para el servidor de resultados.
+
+Simula `--clientes` jugadores concurrentes (un hilo y una conexión
+persistente clients.common.network.Client por jugador) que envían resultados
+realistas de nreinas/caballo/hanoi durante `--duracion` segundos o hasta
+`--peticiones` mensajes, a un ritmo total de `--rate` mensajes/s (0 = tan
+rápido como responda el servidor).
+
+Los payloads se generan al arrancar jugando partidas con los motores de cada
+juego (clients/<juego>/engine.py) a partir de los solvers, con clics y
+movimientos de más para que pasos/movimientos varíen como en partidas reales.
+
+Con ritmo fijado, la latencia se mide desde el instante en que el mensaje
+*debía* salir y no desde que salió: si el servidor se atasca, la cola que se
+acumula en el cliente cuenta como latencia (sin "coordinated omission").
+
+Si la conexión falla, el cliente espera antes de reintentar (de BACKOFF_MIN a
+BACKOFF_MAX segundos, duplicando en cada fallo seguido) para no girar en vacío
+contra un puerto cerrado. El informe distingue los mensajes intentados de los
+enviados (los que obtuvieron ACK o NACK del servidor).
+
+Con `--servidor-local` arranca server/main.py en un puerto libre con una BD
+temporal, lo para al terminar (SIGINT, para que vacíe la cola de ingesta) y
+comprueba que las filas guardadas coinciden con los ACK recibidos; si no,
+lo marca en el informe y termina con código 1.
+
+Ejemplos:
+    python bench/loadgen.py --servidor-local --clientes 200 --duracion 10
+    python bench/loadgen.py --port 5000 --clientes 1000 --rate 2000 --salida informe.json
+"""
+import argparse
+import json
+import math
+import os
+import random
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from itertools import count
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from clients.common.network import TIMEOUT, Client
+from clients.caballo.engine import KnightEngine
+from clients.caballo.solver import warnsdorff_tour
+from clients.hanoi.engine import HanoiEngine
+from clients.hanoi.solver import generar_movimientos
+from clients.nreinas.engine import QueensEngine
+from clients.nreinas.solver import primera_solucion
+
+SERVER_DIR = os.path.join(PROJECT_ROOT, 'server')
+TABLAS = ('reinas_results', 'caballo_results', 'hanoi_results')
+
+# Espera tras un error de conexión (s): se duplica con cada fallo seguido
+BACKOFF_MIN = 0.05
+BACKOFF_MAX = 1.0
+
+# --- payloads ---------------------------------------------------------------
+
+def partida_nreinas(rng):
+    N = rng.randint(4, 12)
+    engine = QueensEngine(N)
+    # Algunos clics equivocados: poner una reina y volver a quitarla
+    for _ in range(rng.randrange(0, 2 * N)):
+        move = (rng.randrange(N), rng.randrange(N))
+        engine.apply(move)
+        engine.apply(move)
+    _, _, tablero = primera_solucion(N)
+    for fila, columna in enumerate(tablero):
+        engine.apply((fila, columna))
+    return engine.result()
+
+def partida_caballo(rng):
+    N = rng.randint(5, 8)
+    engine = KnightEngine(N)
+    _, recorrido = warnsdorff_tour(N, (rng.randrange(N), rng.randrange(N)))
+    # Las partidas a medias también se registran
+    corte = len(recorrido) if rng.random() < 0.7 else rng.randint(1, len(recorrido))
+    for sq in recorrido[:corte]:
+        engine.apply(sq)
+    # El CLI envía el recorrido completo; la UI no
+    return engine.result(include_path=rng.random() < 0.3)
+
+def partida_hanoi(rng):
+    n = rng.randint(3, 10)
+    engine = HanoiEngine(n)
+    # Rodeos: mover el disco pequeño y devolverlo
+    for _ in range(rng.randrange(0, 4)):
+        engine.apply((0, 1))
+        engine.apply((1, 0))
+    for move in generar_movimientos(n):
+        engine.apply(move)
+    return engine.result()
+
+PARTIDAS = {
+    'nreinas': partida_nreinas,
+    'caballo': partida_caballo,
+    'hanoi': partida_hanoi,
+}
+
+def parse_mezcla(texto):
+    """'nreinas=2,hanoi=1' -> {'nreinas': 2.0, 'hanoi': 1.0}"""
+    mezcla = {}
+    for parte in texto.split(','):
+        juego, _, peso = parte.partition('=')
+        juego = juego.strip()
+        if juego not in PARTIDAS:
+            raise argparse.ArgumentTypeError(f'juego desconocido: {juego}')
+        mezcla[juego] = float(peso or 1)
+    return mezcla
+
+def generar_payloads(mezcla, total, seed):
+    """Lista de (juego, JSON) con `total` partidas según los pesos de `mezcla`."""
+    rng = random.Random(seed)
+    juegos = rng.choices(list(mezcla), weights=list(mezcla.values()), k=total)
+    return [(juego, json.dumps(PARTIDAS[juego](rng))) for juego in juegos]
+
+# --- servidor local ---------------------------------------------------------
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+class ServidorLocal:
+    """server/main.py en un subproceso, con BD temporal propia."""
+
+    def __init__(self, argumentos=(), arranque=15):
+        self.port = puerto_libre()
+        self.dir = tempfile.TemporaryDirectory(prefix='arcade-loadgen-')
+        self.db = os.path.join(self.dir.name, 'resultados.db')
+        self.argumentos = list(argumentos)
+        self.arranque = arranque
+        self.proc = None
+
+    def __enter__(self):
+        cmd = [sys.executable, 'main.py', '--port', str(self.port), '--db', self.db] + self.argumentos
+        # El servidor imprime cada mensaje: se descarta la salida para no medir la consola
+        self.proc = subprocess.Popen(cmd, cwd=SERVER_DIR,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        limite = time.monotonic() + self.arranque
+        while time.monotonic() < limite:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f'el servidor terminó al arrancar (código {self.proc.returncode})')
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=0.5).close()
+                return self
+            except OSError:
+                time.sleep(0.05)
+        self.parar()
+        raise RuntimeError('el servidor no aceptó conexiones a tiempo')
+
+    def parar(self):
+        if self.proc is not None and self.proc.poll() is None:
+            # SIGINT -> KeyboardInterrupt: main.py vacía la cola de ingesta antes de salir
+            self.proc.send_signal(signal.SIGINT)
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+    def filas(self):
+        with sqlite3.connect(self.db) as conn:
+            return sum(conn.execute(f'SELECT COUNT(*) FROM {t}').fetchone()[0] for t in TABLAS)
+
+    def __exit__(self, *exc):
+        self.parar()
+        self.dir.cleanup()
+
+# --- carga ------------------------------------------------------------------
+
+def clasificar_error(exc):
+    if isinstance(exc, ConnectionRefusedError):
+        return 'rechazada'
+    if isinstance(exc, socket.timeout):
+        return 'timeout'
+    if isinstance(exc, (ConnectionResetError, BrokenPipeError, ConnectionError)):
+        return 'cerrada'
+    return type(exc).__name__
+
+class Resultados:
+    """Acumulador compartido por los hilos de los clientes."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencias = defaultdict(list)   # juego -> [segundos] de los ACK
+        self.respuestas = defaultdict(Counter)  # juego -> {'ACK': n, 'NACK': n, error: n}
+
+    def anotar(self, juego, respuesta, latencia=None):
+        with self.lock:
+            self.respuestas[juego][respuesta] += 1
+            if latencia is not None:
+                self.latencias[juego].append(latencia)
+
+def cliente(args, payloads, turnos, limite, inicio, fin, periodo, desfase, resultados):
+    """
+    Bucle de un jugador. Con `periodo` (segundos entre envíos de este
+    cliente) sigue un calendario fijo; sin él envía en cuanto recibe el ACK.
+    """
+    rng = random.Random()
+    conexion = Client(args.host, args.port, timeout=args.timeout)
+    programado = inicio + desfase
+    backoff = BACKOFF_MIN
+    # Todos los clientes arrancan a la vez, cuando ya están creados los hilos
+    time.sleep(max(0.0, inicio - time.perf_counter()))
+    try:
+        while True:
+            if periodo:
+                espera = programado - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+            t0 = programado if periodo else time.perf_counter()
+            if t0 >= fin:
+                return
+            # El último lote puede quedar incompleto para no pasar de --peticiones
+            tamano = min(args.lote, limite - next(turnos) * args.lote)
+            if tamano <= 0:
+                return
+            lote = [rng.choice(payloads) for _ in range(tamano)]
+            try:
+                respuestas = conexion.send_many([mensaje for _, mensaje in lote])
+            except OSError as e:
+                conexion.close()
+                error = clasificar_error(e)
+                for juego, _ in lote:
+                    resultados.anotar(juego, error)
+                time.sleep(max(0.0, min(backoff, fin - time.perf_counter())))
+                backoff = min(backoff * 2, BACKOFF_MAX)
+            else:
+                backoff = BACKOFF_MIN
+                latencia = time.perf_counter() - t0
+                for (juego, _), respuesta in zip(lote, respuestas):
+                    resultados.anotar(juego, respuesta, latencia if respuesta == 'ACK' else None)
+            if periodo:
+                programado += periodo
+    finally:
+        conexion.close()
+
+def percentil(ordenados, p):
+    if not ordenados:
+        return None
+    # Rango más cercano: el menor valor con al menos el p % de las muestras por debajo
+    k = max(0, math.ceil(p / 100 * len(ordenados)) - 1)
+    return ordenados[k]
+
+def resumen_latencias(latencias):
+    ordenadas = sorted(latencias)
+    ms = lambda v: None if v is None else round(v * 1000, 3)
+    return {
+        'p50': ms(percentil(ordenadas, 50)),
+        'p95': ms(percentil(ordenadas, 95)),
+        'p99': ms(percentil(ordenadas, 99)),
+        'max': ms(ordenadas[-1] if ordenadas else None),
+        'media': ms(sum(ordenadas) / len(ordenadas) if ordenadas else None),
+    }
+
+def resumen(respuestas, latencias, segundos):
+    intentos = sum(respuestas.values())
+    ack = respuestas.get('ACK', 0)
+    nack = respuestas.get('NACK', 0)
+    errores = {k: v for k, v in respuestas.items() if k not in ('ACK', 'NACK')}
+    return {
+        'intentos': intentos,
+        'enviados': ack + nack,
+        'ack': ack,
+        'nack': nack,
+        'errores': errores,
+        'tasa_error': (intentos - ack) / intentos if intentos else 0.0,
+        'throughput_ack_s': ack / segundos if segundos else 0.0,
+        'latencia_ms': resumen_latencias(latencias),
+    }
+
+def lanzar(args, payloads):
+    resultados = Resultados()
+    # Lotes enviados entre todos los clientes; next() sobre count() es atómico con el GIL
+    turnos = count()
+    limite = args.peticiones or float('inf')
+    periodo = args.clientes * args.lote / args.rate if args.rate else None
+    inicio = time.perf_counter() + 0.2
+    fin = inicio + args.duracion if args.duracion else float('inf')
+    hilos = []
+    for i in range(args.clientes):
+        # Desfase para repartir los envíos de un mismo periodo en el tiempo
+        desfase = periodo * i / args.clientes if periodo else 0.0
+        t = threading.Thread(target=cliente, daemon=True,
+                             args=(args, payloads, turnos, limite, inicio, fin, periodo, desfase, resultados))
+        t.start()
+        hilos.append(t)
+    for t in hilos:
+        t.join()
+    segundos = time.perf_counter() - inicio
+
+    total = Counter()
+    for contador in resultados.respuestas.values():
+        total.update(contador)
+    informe = resumen(total, [l for ls in resultados.latencias.values() for l in ls], segundos)
+    informe['segundos'] = round(segundos, 3)
+    informe['por_juego'] = {
+        juego: resumen(resultados.respuestas[juego], resultados.latencias[juego], segundos)
+        for juego in sorted(resultados.respuestas)
+    }
+    return informe
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generador de carga para el servidor de resultados')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--clientes', type=int, default=100,
+                        help='jugadores concurrentes (un hilo y una conexión cada uno)')
+    parser.add_argument('--rate', type=float, default=0,
+                        help='mensajes/s en total; 0 = sin límite (cada cliente espera su ACK)')
+    parser.add_argument('--duracion', type=float, default=10,
+                        help='segundos de prueba; 0 = hasta completar --peticiones')
+    parser.add_argument('--peticiones', type=int, default=None,
+                        help='mensajes totales como máximo')
+    parser.add_argument('--lote', type=int, default=1,
+                        help='mensajes por send_many (tramas encadenadas sin esperar cada ACK)')
+    parser.add_argument('--mezcla', type=parse_mezcla, default='nreinas=1,caballo=1,hanoi=1',
+                        help='pesos de cada juego, p. ej. nreinas=2,caballo=1,hanoi=1')
+    parser.add_argument('--payloads', type=int, default=500,
+                        help='partidas distintas generadas al arrancar')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=TIMEOUT,
+                        help='timeout de socket de cada cliente (s)')
+    parser.add_argument('--servidor-local', action='store_true',
+                        help='arranca server/main.py en un puerto libre con una BD temporal')
+    parser.add_argument('--servidor-args', default='',
+                        help="argumentos extra para el servidor local, p. ej. '--engine async'")
+    parser.add_argument('--salida', default=None,
+                        help='fichero donde guardar el informe JSON (por defecto solo se imprime)')
+    args = parser.parse_args()
+    if not args.duracion and not args.peticiones:
+        parser.error('indica --duracion o --peticiones')
+    return args
+
+def ejecutar(args):
+    payloads = generar_payloads(args.mezcla, args.payloads, args.seed)
+    config = {k: v for k, v in vars(args).items() if k != 'salida'}
+    if not args.servidor_local:
+        informe = lanzar(args, payloads)
+    else:
+        with ServidorLocal(args.servidor_args.split()) as servidor:
+            args.host, args.port = '127.0.0.1', servidor.port
+            informe = lanzar(args, payloads)
+            servidor.parar()
+            # Todo ACK debe corresponder a una fila guardada, y viceversa
+            informe['filas_guardadas'] = servidor.filas()
+            informe['filas_coinciden'] = informe['filas_guardadas'] == informe['ack']
+    informe['config'] = config
+    return informe
+
+def main():
+    args = parse_args()
+    informe = ejecutar(args)
+    lat = informe['latencia_ms']
+    print(f"📊 {informe['intentos']} intentos y {informe['enviados']} enviados en {informe['segundos']} s: "
+          f"{informe['ack']} ACK, {informe['nack']} NACK, errores {informe['errores'] or 0}")
+    print(f"   throughput {informe['throughput_ack_s']:.1f} ACK/s, "
+          f"latencia p50 {lat['p50']} ms, p95 {lat['p95']} ms, p99 {lat['p99']} ms")
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(texto + '\n')
+        print(f'💾 Informe guardado en {args.salida}')
+    else:
+        print(texto)
+    if informe.get('filas_coinciden') is False:
+        print(f"❌ {informe['filas_guardadas']} filas guardadas para {informe['ack']} ACK")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de los solvers con seguimiento de regresiones.
+
+Cronometra solve_n_reinas y hanoi (los de clients/<juego>/game.py) y
+buscar_recorrido (el solver tras knight_tour) sobre una rejilla de
+parámetros: N, casilla inicial y número de discos. Para cada caso mide:
+
+- tiempo de pared: mínimo y mediana de al menos `--repeticiones` ejecuciones;
+  los casos rápidos se repiten hasta sumar ~OBJETIVO_S segundos, porque con
+  pocas muestras de milisegundos el ruido del sistema domina, y las
+  repeticiones se intercalan entre casos en varias rondas;
+- pico de memoria con tracemalloc, en una ejecución aparte (tracemalloc
+  ralentiza el código y falsearía los tiempos);
+- pasos: nodos explorados (N-Reinas y caballo, contando los reintentos) o
+  movimientos generados (Hanói). Son deterministas, así que cualquier cambio
+  delata un cambio de algoritmo.
+
+Con `--guardar` los resultados se escriben como línea base JSON (la del repo
+está en bench/baselines/solvers.json). Con `--comparar` se contrastan con una
+línea base y se marca como regresión todo caso cuyo tiempo mínimo (el menos
+afectado por interrupciones y otros procesos) o pico de memoria empeore más
+de `--umbral` (25 % por defecto), o cuyos pasos aumenten; en ese
+caso el proceso termina con código 1. Una diferencia de tiempo solo cuenta si
+además supera el ruido del caso: MIN_MS o, si es mayor, la dispersión entre
+mínimo y mediana observada en cualquiera de las dos mediciones, y si se
+mantiene al repetir el caso. Los tiempos dependen de la máquina: conviene
+regenerar la línea base en el mismo equipo antes de comparar.
+
+Ejemplos:
+    python bench/solvers.py
+    python bench/solvers.py --comparar
+    python bench/solvers.py --juegos nreinas hanoi --guardar /tmp/base.json
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from clients.caballo.geometry import get_geometry
+from clients.caballo.solver import buscar_recorrido
+from clients.hanoi.game import hanoi
+from clients.nreinas.game import solve_n_reinas
+
+BASELINE = os.path.join(THIS_DIR, 'baselines', 'solvers.json')
+
+# Por debajo de estas diferencias absolutas no se considera regresión (ruido)
+MIN_MS = 0.5
+MIN_KB = 64
+
+# Tiempo cronometrado mínimo por caso, tope de repeticiones de los rápidos y
+# rondas en que se reparten
+OBJETIVO_S = 0.25
+MAX_REPETICIONES = 500
+RONDAS = 5
+
+# --- casos ------------------------------------------------------------------
+
+def caso_nreinas(N):
+    resuelto, pasos = solve_n_reinas(N)
+    return resuelto, pasos
+
+def caso_caballo(N, inicio):
+    # Sin la geometría cacheada, como en una ejecución nueva del CLI
+    get_geometry.cache_clear()
+    completado, _, nodos = buscar_recorrido(N, inicio)
+    return completado, nodos
+
+def caso_hanoi(n):
+    moves = []
+    hanoi(n, 'A', 'C', 'B', moves)
+    return len(moves) == (1 << n) - 1, len(moves)
+
+REJILLA = {
+    'nreinas': [((N,), f'N={N}') for N in (8, 12, 16, 20, 24)],
+    'caballo': [
+        ((N, inicio), f'N={N} inicio={inicio[0]},{inicio[1]}')
+        # 7 (2,2) y 30 (0,29) retroceden: el greedy puro no basta
+        for N, inicio in ((7, (2, 2)), (8, (0, 0)), (8, (3, 3)), (16, (0, 0)), (30, (0, 29)),
+                          (32, (0, 0)), (64, (0, 0)), (64, (0, 31)), (100, (50, 50)))
+    ],
+    'hanoi': [((n,), f'discos={n}') for n in (10, 14, 18)],
+}
+
+CASOS = {
+    'nreinas': caso_nreinas,
+    'caballo': caso_caballo,
+    'hanoi': caso_hanoi,
+}
+
+# --- medición ---------------------------------------------------------------
+
+def preparar(funcion, argumentos, repeticiones):
+    """
+    Ejecución de calentamiento (que también estima cuántas repeticiones hacen
+    falta para llegar a OBJETIVO_S) y otra con tracemalloc para el pico.
+    """
+    t0 = time.perf_counter()
+    ok, pasos = funcion(*argumentos)
+    primera = time.perf_counter() - t0
+    if primera > 0:
+        repeticiones = max(repeticiones, min(MAX_REPETICIONES, math.ceil(OBJETIVO_S / primera)))
+
+    tracemalloc.start()
+    try:
+        funcion(*argumentos)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'ok': ok, 'pasos': pasos, 'repeticiones': repeticiones,
+            'memoria_pico_kb': round(pico / 1024, 1)}
+
+def cronometrar(funcion, argumentos, veces, tiempos):
+    for _ in range(veces):
+        t0 = time.perf_counter()
+        funcion(*argumentos)
+        tiempos.append(time.perf_counter() - t0)
+
+def ejecutar(juegos, repeticiones, verbose=True, solo=None):
+    """Mide los casos de `juegos` (con `solo`, únicamente esas claves de caso)."""
+    casos = [(juego, argumentos, parametro)
+             for juego in juegos for argumentos, parametro in REJILLA[juego]
+             if solo is None or f'{juego} {parametro}' in solo]
+    medidas = [preparar(CASOS[juego], argumentos, repeticiones)
+               for juego, argumentos, _ in casos]
+
+    # Las repeticiones se reparten en RONDAS que recorren todos los casos: si
+    # la máquina pasa por una fase lenta (otro proceso, CPU compartida), la
+    # sufren todos un poco en lugar de uno entero, y el mínimo la esquiva
+    tiempos = [[] for _ in casos]
+    for _ in range(RONDAS):
+        for (juego, argumentos, _), medida, t in zip(casos, medidas, tiempos):
+            cronometrar(CASOS[juego], argumentos, math.ceil(medida['repeticiones'] / RONDAS), t)
+
+    resultados = {}
+    for (juego, _, parametro), r, t in zip(casos, medidas, tiempos):
+        r = dict(r, juego=juego, parametro=parametro, repeticiones=len(t), tiempo_ms={
+            'min': round(min(t) * 1000, 3),
+            'mediana': round(statistics.median(t) * 1000, 3),
+        })
+        resultados[f'{juego} {parametro}'] = r
+        if verbose:
+            print(f"  {juego:8} {parametro:22} {r['tiempo_ms']['min']:10.3f} ms "
+                  f"{r['memoria_pico_kb']:10.1f} KB {r['pasos']:>10} pasos ×{r['repeticiones']}"
+                  f"{'' if r['ok'] else '  (sin resolver)'}")
+    return resultados
+
+# --- líneas base ------------------------------------------------------------
+
+def metadatos(repeticiones):
+    return {
+        'fecha': datetime.datetime.utcnow().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+        'repeticiones': repeticiones,
+    }
+
+def guardar(ruta, resultados, repeticiones):
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({'meta': metadatos(repeticiones), 'casos': resultados}, f,
+                  indent=2, ensure_ascii=False, sort_keys=True)
+        f.write('\n')
+
+def cargar(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+def _empeora(actual, base, umbral, minimo):
+    return actual > base * (1 + umbral) and actual - base > minimo
+
+def _ruido_ms(*medidas):
+    # Lo que se movió el propio caso entre repeticiones, con MIN_MS como suelo
+    return max(MIN_MS, *(m['tiempo_ms']['mediana'] - m['tiempo_ms']['min'] for m in medidas))
+
+def comparar(resultados, base, umbral):
+    """
+    Lista de (caso, métrica, base, actual, 'regresión' | 'mejora' | 'cambio')
+    para los casos presentes en ambos lados.
+    """
+    cambios = []
+    for caso, actual in resultados.items():
+        anterior = base['casos'].get(caso)
+        if anterior is None:
+            continue
+        t_base, t_act = anterior['tiempo_ms']['min'], actual['tiempo_ms']['min']
+        ruido = _ruido_ms(anterior, actual)
+        if _empeora(t_act, t_base, umbral, ruido):
+            cambios.append((caso, 'tiempo_ms', t_base, t_act, 'regresión'))
+        elif _empeora(t_base, t_act, umbral, ruido):
+            cambios.append((caso, 'tiempo_ms', t_base, t_act, 'mejora'))
+        m_base, m_act = anterior['memoria_pico_kb'], actual['memoria_pico_kb']
+        if _empeora(m_act, m_base, umbral, MIN_KB):
+            cambios.append((caso, 'memoria_pico_kb', m_base, m_act, 'regresión'))
+        elif _empeora(m_base, m_act, umbral, MIN_KB):
+            cambios.append((caso, 'memoria_pico_kb', m_base, m_act, 'mejora'))
+        if actual['pasos'] != anterior['pasos']:
+            tipo = 'regresión' if actual['pasos'] > anterior['pasos'] else 'cambio'
+            cambios.append((caso, 'pasos', anterior['pasos'], actual['pasos'], tipo))
+        if anterior['ok'] and not actual['ok']:
+            cambios.append((caso, 'ok', True, False, 'regresión'))
+    return cambios
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmarks de los solvers')
+    parser.add_argument('--juegos', nargs='+', choices=sorted(CASOS), default=list(CASOS),
+                        help='juegos a medir (por defecto todos)')
+    parser.add_argument('--repeticiones', type=int, default=5,
+                        help='ejecuciones cronometradas mínimas por caso (los rápidos se repiten más)')
+    parser.add_argument('--guardar', nargs='?', const=BASELINE, default=None, metavar='RUTA',
+                        help=f'guarda los resultados como línea base (por defecto {os.path.relpath(BASELINE)})')
+    parser.add_argument('--comparar', nargs='?', const=BASELINE, default=None, metavar='RUTA',
+                        help='compara con una línea base y termina con código 1 si hay regresiones')
+    parser.add_argument('--umbral', type=float, default=0.25,
+                        help='empeoramiento relativo tolerado en tiempo y memoria (0.25 = 25 %%)')
+    parser.add_argument('--salida', default=None,
+                        help='fichero donde guardar los resultados (y la comparación) en JSON')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    print(f"⏱️  Midiendo {', '.join(args.juegos)} (al menos {args.repeticiones} repeticiones)")
+    resultados = ejecutar(args.juegos, args.repeticiones)
+    informe = {'meta': metadatos(args.repeticiones), 'casos': resultados}
+
+    regresiones = []
+    if args.comparar:
+        base = cargar(args.comparar)
+        cambios = comparar(resultados, base, args.umbral)
+        dudosos = {c for c, metrica, _, _, tipo in cambios
+                   if metrica == 'tiempo_ms' and tipo == 'regresión'}
+        if dudosos:
+            # En una máquina compartida la CPU puede ir lenta decenas de
+            # segundos seguidos: se repiten esos casos y se queda el mejor
+            # mínimo, así que solo cuenta la regresión que se mantiene
+            print(f"\n🔁 Repitiendo {len(dudosos)} casos más lentos que la base para confirmarlo")
+            for caso, r in ejecutar(args.juegos, args.repeticiones, solo=dudosos).items():
+                if r['tiempo_ms']['min'] < resultados[caso]['tiempo_ms']['min']:
+                    resultados[caso] = r
+            cambios = comparar(resultados, base, args.umbral)
+        informe['comparacion'] = [
+            {'caso': c, 'metrica': m, 'base': b, 'actual': a, 'tipo': t}
+            for c, m, b, a, t in cambios
+        ]
+        regresiones = [c for c in cambios if c[4] == 'regresión']
+        print(f"\n📏 Comparación con {args.comparar} (umbral {args.umbral:.0%}):")
+        for caso, metrica, base, actual, tipo in cambios:
+            print(f"  {'❌' if tipo == 'regresión' else 'ℹ️ '} {caso}: {metrica} {base} → {actual} ({tipo})")
+        if not cambios:
+            print("  sin cambios significativos")
+
+    if args.guardar:
+        guardar(args.guardar, resultados, args.repeticiones)
+        print(f"💾 Línea base guardada en {args.guardar}")
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"💾 Informe guardado en {args.salida}")
+
+    if regresiones:
+        print(f"\n❌ {len(regresiones)} regresiones")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Motor del Knight's Tour sin interfaz gráfica.
+
+Estado compacto: las casillas visitadas son un bytearray de N² bytes y el
+recorrido un array('i') de índices (fila*N + columna), así que incluso con
+N=200 la partida ocupa unas decenas de KB. La validación de saltos usa las
+tablas precalculadas de geometry.get_geometry(N).
+
+Misma API que los demás motores: apply(move) / undo(), legal_moves(),
+is_legal(move), solved, moves, hint_state() y result().
+"""
+from array import array
+from datetime import datetime
+
+from clients.caballo.geometry import get_geometry
+
+def pos_to_coord(pos):
+    # "fila,columna" (1-based) para tableros de más de 26 columnas
+    if ',' in pos:
+        row, col = (int(x) - 1 for x in pos.split(','))
+        return row, col
+    col = ord(pos[0].upper()) - ord('A')
+    row = int(pos[1:]) - 1
+    return row, col
+
+def coord_to_pos(N, row, col):
+    # Inversa de pos_to_coord: letra+fila mientras las columnas quepan en A-Z
+    if N <= 26:
+        return f"{chr(col + ord('A'))}{row + 1}"
+    return f"{row + 1},{col + 1}"
+
+class KnightEngine:
+    __slots__ = ('N', 'geo', 'visited', 'path')
+
+    def __init__(self, N):
+        self.N = N
+        self.geo = get_geometry(N)
+        self.visited = bytearray(N * N)
+        self.path = array('i')
+
+    @property
+    def knight(self):
+        """Casilla (fila, columna) del caballo, o None antes de colocarlo."""
+        return self.geo.coords[self.path[-1]] if self.path else None
+
+    @property
+    def start(self):
+        return self.geo.coords[self.path[0]] if self.path else None
+
+    @property
+    def moves(self):
+        """Saltos realizados (la casilla inicial no cuenta)."""
+        return max(0, len(self.path) - 1)
+
+    @property
+    def solved(self):
+        return len(self.path) == self.geo.size
+
+    def is_visited(self, r, c):
+        return bool(self.visited[r * self.N + c])
+
+    def is_legal(self, move):
+        r, c = move
+        if not self.geo.inside(r, c) or self.visited[r * self.N + c]:
+            return False
+        # La primera jugada coloca el caballo en cualquier casilla
+        return not self.path or r * self.N + c in self.geo.neighbor_sets[self.path[-1]]
+
+    def legal_moves(self):
+        if not self.path:
+            return list(self.geo.coords)
+        coords, visited = self.geo.coords, self.visited
+        return [coords[v] for v in self.geo.neighbors[self.path[-1]] if not visited[v]]
+
+    def apply(self, move):
+        if not self.is_legal(move):
+            raise ValueError(f'jugada ilegal: {move}')
+        sq = move[0] * self.N + move[1]
+        self.visited[sq] = 1
+        self.path.append(sq)
+
+    def undo(self):
+        """Deshace el último salto (o la colocación inicial) y devuelve la casilla."""
+        if not self.path:
+            raise ValueError('no hay jugadas que deshacer')
+        sq = self.path.pop()
+        self.visited[sq] = 0
+        return self.geo.coords[sq]
+
+    def visited_squares(self):
+        """Casillas visitadas en orden de recorrido."""
+        coords = self.geo.coords
+        return [coords[sq] for sq in self.path]
+
+    def hint_state(self):
+        return {
+            "N": self.N,
+            "inicio": coord_to_pos(self.N, *self.start) if self.path else None,
+            "visitadas": self.visited_squares(),
+            "actual": self.knight
+        }
+
+    def result(self, include_path=False):
+        payload = {
+            'juego': 'caballo',
+            'N': self.N,
+            'inicio': coord_to_pos(self.N, *self.start) if self.path else None,
+            'movimientos': self.moves,
+            'completado': self.solved,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        if include_path:
+            payload['recorrido'] = [list(sq) for sq in self.visited_squares()]
+        return payload
@@ -1,52 +1,41 @@
 #!/usr/bin/env python3
 import json
+import sys
 from clients.common.network import Client
-
-# Movimientos legales del caballo
-MOVES = [(2,1),(1,2),(-1,2),(-2,1),(-2,-1),(-1,-2),(1,-2),(2,-1)]
+from clients.caballo.engine import KnightEngine, pos_to_coord
+from clients.caballo.solver import verificar_recorrido, warnsdorff_tour
 
 def knight_tour(N, start):
-    board = [[False]*N for _ in range(N)]
-    path = []
-
-    def backtrack(r, c, step):
-        board[r][c] = True
-        path.append((r,c))
-        if step == N*N:
-            return True
-        for dr,dc in MOVES:
-            nr, nc = r+dr, c+dc
-            if 0 <= nr < N and 0 <= nc < N and not board[nr][nc]:
-                if backtrack(nr, nc, step+1):
-                    return True
-        board[r][c] = False
-        path.pop()
-        return False
-
-    r0, c0 = start
-    found = backtrack(r0, c0, 1)
-    return found, len(path)
-
-def pos_to_coord(pos):
-    col = ord(pos[0].upper()) - ord('A')
-    row = int(pos[1:]) - 1
-    return row, col
+    """
+    Recorrido del caballo desde `start` (fila, columna) en un tablero N×N.
+    Devuelve (completado, recorrido) con el recorrido completo como lista de
+    (fila, columna), para poder verificarlo y guardarlo.
+    """
+    return warnsdorff_tour(N, start)
 
 def main():
-    N = 8
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 8
     pos = input("▶️  Posición inicial (ej. A1): ")
     start = pos_to_coord(pos)
-    print(f"🔍 Buscando Knight’s Tour desde {pos} (esto puede tardar)…")
-    completado, movs = knight_tour(N, start)
-    print(f"🏁 Completado: {completado}, movimientos: {movs}")
-
-    payload = {
-        'juego': 'caballo',
-        'inicio': pos.upper(),
-        'movimientos': movs,
-        'completado': completado
-    }
-    Client().send(json.dumps(payload))
+    print(f"🔍 Buscando Knight’s Tour de {N}×{N} desde {pos}…")
+    completado, recorrido = knight_tour(N, start)
+    # El motor valida cada salto del solver y construye el resultado
+    engine = KnightEngine(N)
+    for sq in recorrido:
+        engine.apply(sq)
+    # El CLI siempre ha enviado las casillas recorridas (N² si completa), no
+    # los saltos del motor; se mantiene para no mezclar marcas en la BD
+    movs = len(recorrido)
+    payload = engine.result(include_path=True)
+    payload['movimientos'] = movs
+    # Solo se marca completado si el recorrido que se envía es un tour válido
+    payload['completado'] = verificar_recorrido(N, payload['recorrido'])
+    if engine.solved and not payload['completado']:
+        print("⚠️ El recorrido no supera la verificación; se envía como incompleto")
+    print(f"🏁 Completado: {payload['completado']}, movimientos: {movs}")
+
+    with Client() as client:
+        client.send(json.dumps(payload))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,53 @@
+"""
+Geometría del caballo precalculada por tamaño de tablero.
+
+Para cada casilla (índice sq = fila*N + columna) se guardan una sola vez sus
+vecinos a un salto, ya filtrados por los bordes, su grado y las mismas
+casillas como tuplas (fila, columna). Solvers, validación de jugadas y el
+resaltado de la UI leen estas tablas en lugar de recalcular desplazamientos
+y comprobar límites en cada paso. get_geometry(N) cachea una instancia por N.
+"""
+from functools import lru_cache
+
+MOVES = ((2,1),(1,2),(-1,2),(-2,1),(-2,-1),(-1,-2),(1,-2),(2,-1))
+
+class KnightGeometry:
+    def __init__(self, N):
+        self.N = N
+        self.size = N * N
+        self.coords = tuple((r, c) for r in range(N) for c in range(N))
+        self.neighbors = tuple(
+            tuple((r + dr) * N + (c + dc)
+                  for dr, dc in MOVES
+                  if 0 <= r + dr < N and 0 <= c + dc < N)
+            for r, c in self.coords
+        )
+        self.neighbor_coords = tuple(
+            tuple(self.coords[v] for v in vs) for vs in self.neighbors
+        )
+        self.neighbor_sets = tuple(frozenset(vs) for vs in self.neighbors)
+        self.degree = tuple(len(vs) for vs in self.neighbors)
+        # Distancia al centro al cuadrado, en medios escaques para que sea entera
+        self.center_distance = tuple(
+            (2 * r - (N - 1)) ** 2 + (2 * c - (N - 1)) ** 2 for r, c in self.coords
+        )
+
+    def index(self, r, c):
+        return r * self.N + c
+
+    def inside(self, r, c):
+        return 0 <= r < self.N and 0 <= c < self.N
+
+    def is_move(self, frm, to):
+        """True si (fila, col) `frm` -> `to` es un salto de caballo dentro del tablero."""
+        if not (self.inside(*frm) and self.inside(*to)):
+            return False
+        return self.index(*to) in self.neighbor_sets[self.index(*frm)]
+
+    def free_moves(self, r, c, visited):
+        """Casillas (fila, col) a un salto de (r, c) que no están en `visited`."""
+        return [v for v in self.neighbor_coords[self.index(r, c)] if v not in visited]
+
+@lru_cache(maxsize=16)
+def get_geometry(N):
+    return KnightGeometry(N)
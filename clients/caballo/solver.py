@@ -0,0 +1,128 @@
+"""
+Knight's Tour con la regla de Warnsdorff y backtracking acotado.
+
+En cada paso se salta a la casilla libre con menos salidas libres (regla de
+Warnsdorff); los empates se rompen eligiendo la casilla más alejada del centro,
+que es la que antes se quedaría aislada. La búsqueda es un DFS iterativo que
+prueba los candidatos en ese orden: el primer descenso es exactamente el
+recorrido greedy de Warnsdorff y, si se atasca, retrocede con un presupuesto
+de nodos acotado y después reintenta con desempates aleatorios. Funciona en
+tableros grandes (p. ej. 100×100) porque no usa recursión y mantiene los
+grados de forma incremental.
+"""
+
+import random
+
+from clients.caballo.geometry import get_geometry
+
+def _buscar(geo, sq0, max_nodos, azar=None):
+    """
+    DFS iterativo ordenado por Warnsdorff desde `sq0`, limitado a `max_nodos`.
+    Sin `azar` los empates se rompen por lejanía al centro; con un
+    random.Random, al azar (para los reintentos).
+    Devuelve (completado, casillas del recorrido más largo encontrado, nodos
+    expandidos).
+    """
+    vecinos = geo.neighbors
+    lejania = geo.center_distance
+    total = geo.size
+    grado = list(geo.degree)
+    visitada = [False] * total
+
+    def visitar(sq):
+        visitada[sq] = True
+        for v in vecinos[sq]:
+            grado[v] -= 1
+
+    def desvisitar(sq):
+        visitada[sq] = False
+        for v in vecinos[sq]:
+            grado[v] += 1
+
+    if azar is None:
+        # Menos salidas primero; a igualdad, la más lejana del centro
+        clave = lambda v: (grado[v], -lejania[v])
+    else:
+        clave = lambda v: (grado[v], azar.random())
+
+    def candidatos(sq):
+        libres = [v for v in vecinos[sq] if not visitada[v]]
+        libres.sort(key=clave)
+        # Se consumen con pop(), así que se guardan al revés
+        libres.reverse()
+        return libres
+
+    camino = [sq0]
+    visitar(sq0)
+    pendientes = [candidatos(sq0)]
+    mejor = list(camino)
+    nodos = 1
+
+    while len(camino) < total:
+        if not pendientes:
+            break
+        if not pendientes[-1]:
+            # Sin salidas: retrocedemos
+            pendientes.pop()
+            desvisitar(camino.pop())
+            continue
+        if nodos >= max_nodos:
+            break
+        sq = pendientes[-1].pop()
+        visitar(sq)
+        camino.append(sq)
+        nodos += 1
+        if len(camino) > len(mejor):
+            mejor = list(camino)
+        pendientes.append(candidatos(sq))
+
+    if len(camino) == total:
+        return True, camino, nodos
+    return False, mejor, nodos
+
+def buscar_recorrido(N, start, max_nodos=200000, reintentos=20):
+    """
+    Busca un recorrido del caballo que visite las N×N casillas desde `start`
+    (fila, columna). Devuelve (completado, recorrido, nodos) con el recorrido
+    como lista de (fila, columna) —si no se completa, el más largo hallado— y
+    los nodos expandidos entre todos los intentos.
+
+    Primero se gasta la mitad de `max_nodos` en el DFS determinista; si no
+    basta, el resto se reparte en `reintentos` búsquedas con desempates al azar
+    (semilla fija por casilla, así que el resultado es reproducible).
+    """
+    sq0 = start[0] * N + start[1]
+    if N % 2 and (start[0] + start[1]) % 2:
+        # En tableros impares el recorrido debe empezar en el color mayoritario:
+        # desde aquí no existe, basta con el descenso greedy
+        max_nodos, reintentos = N * N, 0
+    geo = get_geometry(N)
+
+    presupuesto = max_nodos // 2 if reintentos else max_nodos
+    completado, camino, nodos = _buscar(geo, sq0, presupuesto)
+    if not completado and reintentos:
+        azar = random.Random(sq0)
+        por_intento = max(4 * N * N, (max_nodos - presupuesto) // reintentos)
+        for _ in range(reintentos):
+            completado, otro, n = _buscar(geo, sq0, por_intento, azar)
+            nodos += n
+            if completado or len(otro) > len(camino):
+                camino = otro
+            if completado:
+                break
+    return completado, [geo.coords[sq] for sq in camino], nodos
+
+def warnsdorff_tour(N, start, max_nodos=200000, reintentos=20):
+    """buscar_recorrido sin el recuento de nodos: (completado, recorrido)."""
+    completado, recorrido, _ = buscar_recorrido(N, start, max_nodos, reintentos)
+    return completado, recorrido
+
+def verificar_recorrido(N, recorrido):
+    """True si `recorrido` son saltos de caballo válidos que cubren todo el tablero sin repetir."""
+    if len(recorrido) != N * N or len(set(map(tuple, recorrido))) != N * N:
+        return False
+    geo = get_geometry(N)
+    for a, b in zip(recorrido, recorrido[1:]):
+        if not geo.is_move(tuple(a), tuple(b)):
+            return False
+    return N > 0 and geo.inside(*recorrido[0])
@@ -3,8 +3,6 @@ import sys
 import threading
 import json
 import os
-import re
-from datetime import datetime
 
 # Path setup so we can import from project root
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -14,73 +12,59 @@ if PROJECT_ROOT not in sys.path:
 
 import pygame
 from clients.common.network import Client
-from clients.common.ia_client import solicitar_sugerencia
+from clients.common.hints import sugerir
+from clients.common.text import render_text, wrap_text
+from clients.common.render import REDRAW, DirtyRenderer, request_redraw, translucent
+from clients.common.boardview import BoardView
+from clients.caballo.engine import KnightEngine
 
 # Visual parameters
 SIZE = 500
 INFO_HEIGHT = 80
 MARGIN = 40
-N = 8
-CELL = (SIZE - 2 * MARGIN) // N
 
 # Globals for IA help
 help_text = ""
 suggested_move = None    # tuple (r, c)
 possible_moves = []      # list of (r, c)
 
-def wrap_text(text, font, max_width):
-    """Split `text` into lines that fit within `max_width` pixels."""
-    words = text.split(' ')
-    lines, current = [], ''
-    for w in words:
-        test = (current + ' ' + w).strip()
-        if font.size(test)[0] <= max_width:
-            current = test
-        else:
-            lines.append(current)
-            current = w
-    if current:
-        lines.append(current)
-    return lines
-
-def send_result(start, moves, completed):
-    payload = {
-        'juego': 'caballo',
-        'inicio': start,
-        'movimientos': moves,
-        'completado': completed,
-        'timestamp': datetime.utcnow().isoformat()
-    }
+def send_result(payload):
     try:
-        Client().send(json.dumps(payload))
+        with Client() as client:
+            client.send(json.dumps(payload))
     except Exception as e:
         print(f"⚠️ Error sending result: {e}")
 
 def fetch_help(state):
     global help_text, suggested_move
-    try:
-        suggestion = solicitar_sugerencia("caballo", state)
-    except Exception as e:
-        suggestion = f"Error IA: {e}"
-    help_text = suggestion
-    # parse "(row, col)"
-    m = re.search(r"\(?\s*(\d+)\s*,\s*(\d+)\s*\)?", suggestion)
-    if m:
-        suggested_move = (int(m.group(1)) - 1, int(m.group(2)) - 1)
-    else:
-        suggested_move = None
+    hint = sugerir("caballo", state)
+    help_text = hint['texto']
+    suggested_move = hint['movimiento']
+    request_redraw()
+
+def build_background(view, btn, font_h):
+    """Fondo estático: tablero visible, panel de ayuda y botón; se rehace al hacer zoom/pan."""
+    bg = pygame.Surface((SIZE, SIZE + INFO_HEIGHT))
+    bg.fill((255,255,255))
+    view.draw_board(bg)
+    bg.blit(translucent((SIZE-20, INFO_HEIGHT), (240,240,240), 200), (10, SIZE))
+    pygame.draw.rect(bg, (70,130,180), btn)
+    bg.blit(font_h.render("IA Help", True, (255,255,255)), (btn.x+10, btn.y+5))
+    return bg
 
 def main():
+    # read N from command line
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    BOARD = SIZE - 2 * MARGIN
+
     pygame.init()
     screen = pygame.display.set_mode((SIZE, SIZE + INFO_HEIGHT))
-    pygame.display.set_caption("Knight’s Tour")
+    pygame.display.set_caption(f"Knight’s Tour (N={N})")
     font = pygame.font.SysFont(None, 20)
     font_h = pygame.font.SysFont(None, 18)
 
-    knight = None
-    start = None
-    visited = set()
-    moves = 0
+    # game rules and state (visited squares, path, moves) live in the engine
+    engine = KnightEngine(N)
     solved = False
     solved_time = 0
 
@@ -90,118 +74,101 @@ def main():
     possible_moves = []
 
     btn = pygame.Rect(SIZE - 120, SIZE + INFO_HEIGHT - 50, 100, 25)
-    btn_color = (70, 130, 180)
-    clock = pygame.time.Clock()
+    # zoomable viewport: wheel / +- to zoom, right or middle drag / arrows to pan
+    view = BoardView(N, (MARGIN, MARGIN, BOARD, BOARD), (240,240,240), (160,160,160))
+    panel_rect = pygame.Rect(0, SIZE, SIZE, INFO_HEIGHT)
+    renderer = DirtyRenderer(screen, build_background(view, btn, font_h))
+    # visited squares live in a 1px-per-cell layer: one set_at per move
+    visited_layer = view.new_layer()
+    layer_version = 0
+
+    def paint(screen):
+        # draw visited
+        view.draw_layer(screen, visited_layer, layer_version)
 
-    offsets = [(2,1),(1,2),(-1,2),(-2,1),(-2,-1),(-1,-2),(1,-2),(2,-1)]
+        # highlight possible moves in yellow
+        view.draw_squares(screen, possible_moves, (255,255,0), 150)
+
+        # draw knight
+        if engine.knight:
+            view.draw_pieces(screen, [engine.knight], (0,0,255))
+
+        # highlight IA suggestion
+        if suggested_move:
+            view.outline(screen, *suggested_move, (0,255,0))
+
+        # moves count and solved message
+        screen.blit(render_text(f"Moves: {engine.moves}", font, (0,0,0)), (10, SIZE))
+        if solved:
+            screen.blit(render_text("Completed!", font, (0,128,0)), (MARGIN, SIZE+5))
+
+        # help text
+        lines = wrap_text(help_text, font_h, SIZE-40)
+        for i, line in enumerate(lines[:4]):
+            screen.blit(render_text(line, font_h, (0,0,0)), (15, SIZE+5 + i*18))
 
     while True:
-        for e in pygame.event.get():
+        # sleep until something happens; once solved, wake up to close the window
+        for e in renderer.events(100 if solved else None):
             if e.type == pygame.QUIT:
                 pygame.quit()
                 return
-            if e.type == pygame.MOUSEBUTTONDOWN:
+            if e.type == REDRAW:
+                # a hint arrived: suggestion and help text changed
+                if suggested_move and view.center_on(*suggested_move):
+                    renderer.set_background(build_background(view, btn, font_h))
+                renderer.invalidate(view.viewport, panel_rect)
+            if view.handle_event(e):
+                renderer.set_background(build_background(view, btn, font_h))
+            # wheel events also arrive as buttons 4/5: only the left button plays
+            if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1:
                 x, y = e.pos
                 # clear previous highlights
+                renderer.invalidate(*(view.dirty_rect(r, c) for r, c in possible_moves))
+                if suggested_move:
+                    renderer.invalidate(view.dirty_rect(*suggested_move))
                 possible_moves = []
                 suggested_move = None
 
                 # click on board
-                if not solved and MARGIN <= x < MARGIN + CELL * N and MARGIN <= y < MARGIN + CELL * N:
-                    c = (x - MARGIN) // CELL
-                    r = (y - MARGIN) // CELL
-                    if knight is None:
-                        knight = (r, c)
-                        start = (r, c)
-                        visited.add((r, c))
-                    else:
-                        dr, dc = r - knight[0], c - knight[1]
-                        if (dr, dc) in offsets and (r, c) not in visited:
-                            knight = (r, c)
-                            visited.add((r, c))
-                            moves += 1
-                            if len(visited) == N * N:
-                                solved = True
-                                solved_time = pygame.time.get_ticks()
-                                ini_str = f"{chr(start[1]+65)}{start[0]+1}"
-                                threading.Thread(
-                                    target=send_result,
-                                    args=(ini_str, moves, True),
-                                    daemon=True
-                                ).start()
+                cell = view.cell_at((x, y))
+                if not solved and cell:
+                    r, c = cell
+                    # the first click places the knight, then only free knight jumps
+                    if engine.is_legal((r, c)):
+                        previous = engine.knight
+                        engine.apply((r, c))
+                        visited_layer.set_at((c, r), (100,200,100))
+                        layer_version += 1
+                        renderer.invalidate(view.dirty_rect(r, c), panel_rect)
+                        if previous:
+                            renderer.invalidate(view.dirty_rect(*previous))
+                        if engine.solved:
+                            solved = True
+                            solved_time = pygame.time.get_ticks()
+                            threading.Thread(
+                                target=send_result,
+                                args=(engine.result(),),
+                                daemon=True
+                            ).start()
 
                 # click on IA help button
                 if btn.collidepoint(x, y):
                     help_text = "<waiting for IA>"
-                    suggested_move = None
+                    renderer.invalidate(panel_rect)
                     # compute possible knight moves
-                    if knight:
-                        for dr, dc in offsets:
-                            nr, nc = knight[0] + dr, knight[1] + dc
-                            if 0 <= nr < N and 0 <= nc < N and (nr, nc) not in visited:
-                                possible_moves.append((nr, nc))
+                    if engine.knight:
+                        possible_moves = engine.legal_moves()
+                        renderer.invalidate(*(view.dirty_rect(r, c) for r, c in possible_moves))
                     # call IA
-                    state = {
-                        "N": N,
-                        "inicio": f"{chr(start[1]+65)}{start[0]+1}" if start else None,
-                        "visitadas": list(visited)
-                    }
+                    state = engine.hint_state()
                     threading.Thread(target=lambda: fetch_help(state), daemon=True).start()
 
-        # draw board
-        screen.fill((255, 255, 255))
-        for r in range(N):
-            for c in range(N):
-                col = (240,240,240) if (r + c) % 2 == 0 else (160,160,160)
-                pygame.draw.rect(screen, col, (MARGIN + c*CELL, MARGIN + r*CELL, CELL, CELL))
-
-        # draw visited
-        for (r, c) in visited:
-            pygame.draw.rect(screen, (100,200,100), (MARGIN + c*CELL, MARGIN + r*CELL, CELL, CELL))
-
-        # highlight possible moves in yellow
-        for (r, c) in possible_moves:
-            overlay = pygame.Surface((CELL, CELL))
-            overlay.set_alpha(150)
-            overlay.fill((255,255,0))
-            screen.blit(overlay, (MARGIN + c*CELL, MARGIN + r*CELL))
-
-        # draw knight
-        if knight:
-            center = (MARGIN + knight[1]*CELL + CELL//2, MARGIN + knight[0]*CELL + CELL//2)
-            pygame.draw.circle(screen, (0,0,255), center, CELL//3)
-
-        # highlight IA suggestion
-        if suggested_move:
-            r, c = suggested_move
-            pygame.draw.rect(
-                screen, (0,255,0),
-                (MARGIN + c*CELL, MARGIN + r*CELL, CELL, CELL), 3
-            )
-
-        # moves count and solved message
-        screen.blit(font.render(f"Moves: {moves}", True, (0,0,0)), (10, SIZE))
-        if solved:
-            screen.blit(font.render("Completed!", True, (0,128,0)), (MARGIN, SIZE+5))
-            if pygame.time.get_ticks() - solved_time > 1500:
-                pygame.quit()
-                return
-
-        # IA button
-        pygame.draw.rect(screen, btn_color, btn)
-        screen.blit(font_h.render("IA Help", True, (255,255,255)), (btn.x+10, btn.y+5))
-
-        # help text box
-        bg = pygame.Surface((SIZE-20, INFO_HEIGHT))
-        bg.set_alpha(200)
-        bg.fill((240,240,240))
-        screen.blit(bg, (10, SIZE))
-        lines = wrap_text(help_text, font_h, SIZE-40)
-        for i, line in enumerate(lines[:4]):
-            screen.blit(font_h.render(line, True, (0,0,0)), (15, SIZE+5 + i*18))
+        if solved and pygame.time.get_ticks() - solved_time > 1500:
+            pygame.quit()
+            return
 
-        pygame.display.flip()
-        clock.tick(30)
+        renderer.draw(paint)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,256 @@
+"""
+Vista escalable de un tablero N×N con zoom y desplazamiento.
+
+Con CELL = BOARD // N las casillas desaparecen en cuanto N supera el ancho en
+píxeles, y pintar N² rectángulos por fotograma se vuelve el cuello de botella
+mucho antes. BoardView:
+
+- guarda el tablero de ajedrez como una superficie de 1 píxel por casilla y,
+  para la vista actual, escala solo la parte visible (tamaño de casilla
+  entero, así que el escalado coincide exactamente con cell_rect);
+- ofrece capas de 1 píxel por casilla (p. ej. casillas visitadas) que se
+  actualizan con un set_at por jugada y se escalan igual que el tablero;
+- dibuja piezas con un sprite cacheado por tamaño de casilla y screen.blits;
+- admite zoom con la rueda del ratón (centrado en el cursor) y desplazamiento
+  arrastrando con el botón central o derecho o con las flechas.
+
+`version` cambia con cada zoom o desplazamiento: la UI rehace entonces su
+fondo cacheado (ver render.DirtyRenderer).
+"""
+import pygame
+
+MAX_CELL = 64
+PAN_STEP = 40
+LAYER_KEY = (255, 0, 255)
+
+class BoardView:
+    def __init__(self, N, area, light, dark):
+        self.N = N
+        self.area = pygame.Rect(area)
+        self.fit = max(1, min(self.area.w, self.area.h) // N)
+        self.cell = self.fit
+        self.ox = 0
+        self.oy = 0
+        self.version = 0
+        self.base = pygame.Surface((N, N))
+        self.base.fill(light)
+        dark_px = self.base.map_rgb(dark)
+        with pygame.PixelArray(self.base) as px:
+            for r in range(N):
+                for c in range(r % 2 ^ 1, N, 2):
+                    px[c, r] = dark_px
+        self._scaled = {}
+        self._sprites = {}
+
+    # --- geometría -------------------------------------------------------
+
+    @property
+    def size(self):
+        """Ancho y alto en píxeles del tablero completo con el zoom actual."""
+        return self.N * self.cell
+
+    @property
+    def viewport(self):
+        """Rectángulo de pantalla que ocupa el tablero visible."""
+        return pygame.Rect(self.area.x, self.area.y,
+                           min(self.area.w, self.size), min(self.area.h, self.size))
+
+    def visible_cells(self):
+        """(r0, r1, c0, c1): filas y columnas visibles, con r1/c1 exclusivos."""
+        vp = self.viewport
+        c0, r0 = self.ox // self.cell, self.oy // self.cell
+        c1 = min(self.N, -(-(self.ox + vp.w) // self.cell))
+        r1 = min(self.N, -(-(self.oy + vp.h) // self.cell))
+        return r0, r1, c0, c1
+
+    def cell_rect(self, r, c):
+        return pygame.Rect(self.area.x + c * self.cell - self.ox,
+                           self.area.y + r * self.cell - self.oy,
+                           self.cell, self.cell)
+
+    def cell_at(self, pos):
+        """Casilla (fila, columna) bajo el punto de pantalla `pos`, o None."""
+        if not self.viewport.collidepoint(pos):
+            return None
+        c = (pos[0] - self.area.x + self.ox) // self.cell
+        r = (pos[1] - self.area.y + self.oy) // self.cell
+        return r, c
+
+    def dirty_rect(self, r, c):
+        """cell_rect recortado a la vista, o None si la casilla no se ve."""
+        rect = self.cell_rect(r, c).clip(self.viewport)
+        return rect if rect.w and rect.h else None
+
+    def is_visible(self, r, c):
+        r0, r1, c0, c1 = self.visible_cells()
+        return r0 <= r < r1 and c0 <= c < c1
+
+    # --- navegación ------------------------------------------------------
+
+    def _clamp(self):
+        self.ox = max(0, min(self.ox, self.size - self.viewport.w))
+        self.oy = max(0, min(self.oy, self.size - self.viewport.h))
+
+    def _moved(self, ox, oy, cell):
+        self._clamp()
+        if (ox, oy, cell) == (self.ox, self.oy, self.cell):
+            return False
+        self.version += 1
+        self._scaled.clear()
+        return True
+
+    def zoom_at(self, pos, steps):
+        """Acerca (steps > 0) o aleja manteniendo fija la casilla bajo `pos`."""
+        cell = self.cell
+        for _ in range(abs(steps)):
+            delta = max(1, cell // 4)
+            cell = cell + delta if steps > 0 else cell - delta
+        cell = max(self.fit, min(MAX_CELL, cell))
+        if cell == self.cell:
+            return False
+        before = (self.ox, self.oy, self.cell)
+        x = pos[0] - self.area.x
+        y = pos[1] - self.area.y
+        bx = (x + self.ox) / self.cell
+        by = (y + self.oy) / self.cell
+        self.cell = cell
+        self.ox = int(bx * cell - x)
+        self.oy = int(by * cell - y)
+        return self._moved(*before)
+
+    def pan(self, dx, dy):
+        """Desplaza la vista `dx`, `dy` píxeles (positivo: hacia abajo/derecha)."""
+        before = (self.ox, self.oy, self.cell)
+        self.ox += dx
+        self.oy += dy
+        return self._moved(*before)
+
+    def center_on(self, r, c):
+        """Centra la vista en (r, c) si la casilla no está visible."""
+        if self.is_visible(r, c):
+            return False
+        before = (self.ox, self.oy, self.cell)
+        vp = self.viewport
+        self.ox = c * self.cell + self.cell // 2 - vp.w // 2
+        self.oy = r * self.cell + self.cell // 2 - vp.h // 2
+        return self._moved(*before)
+
+    def handle_event(self, e):
+        """
+        Procesa rueda, arrastre con botón central o derecho, flechas y +/-. Devuelve True si
+        la vista ha cambiado (hay que rehacer el fondo).
+        """
+        if e.type == pygame.MOUSEWHEEL:
+            return self.zoom_at(pygame.mouse.get_pos(), e.y)
+        if e.type == pygame.MOUSEMOTION and (e.buttons[1] or e.buttons[2]):
+            return self.pan(-e.rel[0], -e.rel[1])
+        if e.type == pygame.KEYDOWN:
+            moves = {
+                pygame.K_LEFT: (-PAN_STEP, 0), pygame.K_RIGHT: (PAN_STEP, 0),
+                pygame.K_UP: (0, -PAN_STEP), pygame.K_DOWN: (0, PAN_STEP),
+            }
+            if e.key in moves:
+                return self.pan(*moves[e.key])
+            if e.key in (pygame.K_PLUS, pygame.K_KP_PLUS, pygame.K_EQUALS):
+                return self.zoom_at(self.viewport.center, 1)
+            if e.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                return self.zoom_at(self.viewport.center, -1)
+        return False
+
+    # --- dibujo ----------------------------------------------------------
+
+    def _scale_visible(self, surface, key):
+        # Escala la parte visible de una superficie de 1 px por casilla
+        cached = self._scaled.get(key)
+        if cached is None:
+            r0, r1, c0, c1 = self.visible_cells()
+            sub = surface.subsurface((c0, r0, c1 - c0, r1 - r0))
+            scaled = pygame.transform.scale(sub, ((c1 - c0) * self.cell, (r1 - r0) * self.cell))
+            pos = (self.area.x + c0 * self.cell - self.ox, self.area.y + r0 * self.cell - self.oy)
+            cached = self._scaled[key] = (scaled, pos)
+        return cached
+
+    def draw_board(self, surface):
+        """Pinta el tablero visible (para el fondo cacheado de la UI)."""
+        scaled, pos = self._scale_visible(self.base, 'board')
+        prev = surface.get_clip()
+        surface.set_clip(self.viewport.clip(prev))
+        surface.blit(scaled, pos)
+        surface.set_clip(prev)
+
+    def new_layer(self):
+        """Capa transparente de 1 px por casilla para marcar casillas con set_at((c, r), color)."""
+        layer = pygame.Surface((self.N, self.N))
+        layer.fill(LAYER_KEY)
+        layer.set_colorkey(LAYER_KEY)
+        return layer
+
+    def draw_layer(self, surface, layer, layer_version):
+        """Pinta la parte visible de una capa; se reescala solo si cambió la capa o la vista."""
+        key = ('layer', id(layer), layer_version)
+        if key not in self._scaled:
+            # Solo se conserva la última escala de cada capa
+            for k in [k for k in self._scaled if k[:2] == key[:2]]:
+                del self._scaled[k]
+        scaled, pos = self._scale_visible(layer, key)
+        scaled.set_colorkey(LAYER_KEY)
+        prev = surface.get_clip()
+        surface.set_clip(self.viewport.clip(prev))
+        surface.blit(scaled, pos)
+        surface.set_clip(prev)
+
+    def _sprite(self, key, make):
+        # Un sprite por tamaño de casilla; los de zooms anteriores se conservan
+        key = (self.cell,) + key
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            sprite = self._sprites[key] = make(self.cell)
+        return sprite
+
+    @staticmethod
+    def _piece(color, radius_ratio):
+        def make(cell):
+            sprite = pygame.Surface((cell, cell), pygame.SRCALPHA)
+            radius = int(cell * radius_ratio)
+            if radius >= 2:
+                pygame.draw.circle(sprite, color, (cell // 2, cell // 2), radius)
+            else:
+                # Casillas diminutas: la pieza ocupa la casilla entera
+                sprite.fill(color)
+            return sprite
+        return make
+
+    def draw_pieces(self, surface, squares, color, radius_ratio=1/3):
+        """Dibuja una pieza circular en cada casilla visible de `squares`."""
+        sprite = self._sprite(('piece', color, radius_ratio), self._piece(color, radius_ratio))
+        self._blit_cells(surface, sprite, squares)
+
+    def draw_squares(self, surface, squares, color, alpha=255):
+        """Rellena (opcionalmente con transparencia) cada casilla visible de `squares`."""
+        def make(cell):
+            sprite = pygame.Surface((cell, cell))
+            sprite.fill(color)
+            sprite.set_alpha(alpha)
+            return sprite
+        self._blit_cells(surface, self._sprite(('square', color, alpha), make), squares)
+
+    def _blit_cells(self, surface, sprite, squares):
+        # Un único blits() con las casillas visibles, recortado a la vista
+        r0, r1, c0, c1 = self.visible_cells()
+        x0 = self.area.x - self.ox
+        y0 = self.area.y - self.oy
+        cell = self.cell
+        prev = surface.get_clip()
+        surface.set_clip(self.viewport.clip(prev))
+        surface.blits([
+            (sprite, (x0 + c * cell, y0 + r * cell))
+            for r, c in squares if r0 <= r < r1 and c0 <= c < c1
+        ], doreturn=False)
+        surface.set_clip(prev)
+
+    def outline(self, surface, r, c, color, width=3):
+        """Borde de una casilla (p. ej. la sugerencia de la IA)."""
+        prev = surface.get_clip()
+        surface.set_clip(self.viewport.clip(prev))
+        pygame.draw.rect(surface, color, self.cell_rect(r, c), min(width, max(1, self.cell // 3)))
+        surface.set_clip(prev)
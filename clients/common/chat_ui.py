@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import os
+import queue
 import sys
 import threading
 import tkinter as tk
@@ -11,7 +12,10 @@ PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, os.pardir, os.pardir))
 if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
-from clients.common.ia_client import consultar_chatbot
+from clients.common.ia_client import ChatSession
+
+# Cada cuánto (ms) el hilo de Tk recoge los trozos de respuesta pendientes
+POLL_MS = 30
 
 class ChatUI:
     def __init__(self):
@@ -39,35 +43,81 @@ class ChatUI:
         send_btn = tk.Button(bottom, text="Enviar", command=self.on_send)
         send_btn.pack(side='right')
 
+        new_btn = tk.Button(bottom, text="Nueva", command=self.on_reset)
+        new_btn.pack(side='right', padx=(0,5))
+
+        # Los hilos de generación solo escriben en esta cola; el widget lo toca
+        # únicamente el hilo de Tk desde _poll_stream (vía root.after)
+        self.stream = queue.Queue()
+        # Conversación con memoria: cada turno reutiliza la caché KV del anterior
+        self.session = ChatSession()
+        self.respuestas = {}
+        self.turnos = 0
+        self.root.after(POLL_MS, self._poll_stream)
+
     def on_send(self, event=None):
         user_msg = self.entry.get().strip()
         if not user_msg:
             return
         self._append(f"Tú: {user_msg}\n")
         self.entry.delete(0, tk.END)
-        threading.Thread(target=self._fetch_response, args=(user_msg,), daemon=True).start()
+        # Línea provisional; la respuesta se localiza por su tag aunque
+        # después se añadan más mensajes
+        self.turnos += 1
+        turno = self.turnos
+        self.respuestas[turno] = ''
+        self._append("\n")
+        self._append("IA: …\n", f"ia{turno}")
+        threading.Thread(target=self._fetch_response, args=(turno, user_msg), daemon=True).start()
 
-    def _fetch_response(self, prompt):
-        self._append("\nIA: …\n")
+    def on_reset(self):
+        # Sesión nueva en lugar de reset(): no espera a la respuesta en curso
+        self.session = ChatSession(self.session.max_tokens)
+        self._append("\n— Nueva conversación —\n")
+
+    def _fetch_response(self, turno, prompt):
         try:
-            resp = consultar_chatbot(prompt)
+            for delta in self.session.responder_stream(prompt):
+                self.stream.put((turno, 'delta', delta))
         except Exception as e:
-            resp = f"Error IA: {e}"
-        # Reemplazamos la línea provisional
-        self._replace_last_line(f"IA: {resp}\n")
+            self.stream.put((turno, 'error', f"Error IA: {e}"))
+        self.stream.put((turno, 'fin', None))
+
+    def _poll_stream(self):
+        cambiados = set()
+        while True:
+            try:
+                turno, tipo, texto = self.stream.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == 'delta':
+                self.respuestas[turno] += texto
+            elif tipo == 'error':
+                self.respuestas[turno] = texto
+            elif tipo == 'fin' and not self.respuestas[turno].strip():
+                self.respuestas[turno] = "<no response available>"
+            cambiados.add(turno)
+            if tipo == 'fin':
+                cambiados.discard(turno)
+                self._replace_response(turno, self.respuestas.pop(turno))
+        for turno in cambiados:
+            self._replace_response(turno, self.respuestas[turno])
+        self.root.after(POLL_MS, self._poll_stream)
 
-    def _append(self, text):
+    def _append(self, text, tag=None):
         self.history.configure(state='normal')
-        self.history.insert(tk.END, text)
+        self.history.insert(tk.END, text, tag)
         self.history.configure(state='disabled')
         self.history.yview(tk.END)
 
-    def _replace_last_line(self, text):
+    def _replace_response(self, turno, respuesta):
+        tag = f"ia{turno}"
+        rango = self.history.tag_ranges(tag)
+        if not rango:
+            return
         self.history.configure(state='normal')
-        # Borra la última línea (la provisional)
-        last_index = self.history.index('end-2l linestart')
-        self.history.delete(last_index, tk.END)
-        self.history.insert(tk.END, text)
+        self.history.delete(rango[0], rango[-1])
+        self.history.insert(rango[0], f"IA: {respuesta.strip()}\n", tag)
         self.history.configure(state='disabled')
         self.history.yview(tk.END)
 
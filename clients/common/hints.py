@@ -0,0 +1,127 @@
+"""
+Pistas para el botón "IA Help" calculadas con los solvers de cada juego.
+
+sugerir(juego, estado) devuelve un dict estructurado en lugar de texto libre:
+
+    {
+        'fuente': 'solver' | 'llm' | None,
+        'texto': mensaje para mostrar en la UI,
+        'movimiento': jugada 0-based o None
+                      (nreinas/caballo: (fila, columna); hanoi: (desde, hasta)),
+        ...campos propios del juego (conflictos, restantes, ...)
+    }
+
+Las jugadas del solver son siempre legales y se calculan en micro/milisegundos.
+Solo si el solver no sabe responder (estado incompleto, juego desconocido o sin
+completación dentro del presupuesto) se recurre al modelo de lenguaje, que se
+importa de forma perezosa para no cargar torch si nunca hace falta.
+"""
+import re
+
+from clients.caballo.geometry import get_geometry
+from clients.hanoi.solver import movimientos_restantes, siguiente_movimiento
+from clients.nreinas.board import QueensBoard
+from clients.nreinas.solver import completar
+
+# Nodos máximos de la búsqueda de completación de N-Reinas por pista
+MAX_NODOS_REINAS = 20000
+
+def _pista(texto, movimiento=None, fuente='solver', **extra):
+    return dict(extra, fuente=fuente, texto=texto, movimiento=movimiento)
+
+def _pista_nreinas(estado):
+    N = estado['N']
+    reinas = [tuple(q) for q in estado.get('reinas', [])]
+    tablero = QueensBoard(N, reinas)
+    if tablero.conflicts:
+        # Se propone quitar la reina más atacada
+        r, c = max(sorted(tablero.conflicts), key=lambda q: tablero.attacks(*q))
+        return _pista(
+            f"The queen at ({r + 1}, {c + 1}) is under attack: remove it.",
+            (r, c), accion='quitar', conflictos=set(tablero.conflicts)
+        )
+    if len(reinas) == N:
+        return _pista("The board is already solved.", accion=None, conflictos=set())
+    solucion = completar(N, reinas, MAX_NODOS_REINAS)
+    if solucion is None:
+        # Presupuesto agotado: el solver no sabe, que responda el modelo
+        return None
+    if solucion is False:
+        # Callejón sin salida demostrado: se propone quitar la última reina
+        # colocada (`reinas` va en orden de colocación)
+        r, c = reinas[-1]
+        return _pista(
+            f"These queens cannot be completed: remove the queen at ({r + 1}, {c + 1}).",
+            (r, c), accion='quitar', conflictos=set()
+        )
+    ocupadas = {r for r, _ in reinas}
+    r = next(r for r in range(N) if r not in ocupadas)
+    return _pista(
+        f"Place the next queen at ({r + 1}, {solucion[r] + 1}).",
+        (r, solucion[r]), accion='colocar', conflictos=set()
+    )
+
+def _pista_caballo(estado):
+    N = estado['N']
+    visitadas = {tuple(v) for v in estado.get('visitadas', [])}
+    actual = estado.get('actual')
+    if actual is None:
+        if visitadas:
+            # Sin la casilla actual no se sabe desde dónde saltar
+            return None
+        return _pista("Start in a corner, e.g. (1, 1).", (0, 0))
+    geo = get_geometry(N)
+    libres = geo.free_moves(actual[0], actual[1], visitadas)
+    if not libres:
+        return _pista("No moves left: the knight is stuck.", opciones=[])
+    visitadas.add(tuple(actual))
+    # Warnsdorff: la casilla con menos salidas libres; a igualdad, la más alejada del centro
+    r, c = min(
+        libres,
+        key=lambda v: (len(geo.free_moves(v[0], v[1], visitadas)),
+                       -geo.center_distance[geo.index(*v)])
+    )
+    return _pista(f"Jump to ({r + 1}, {c + 1}).", (r, c), opciones=libres)
+
+def _pista_hanoi(estado):
+    pegs = estado['pegs']
+    jugada = siguiente_movimiento(pegs)
+    restantes = movimientos_restantes(pegs)
+    if jugada is None:
+        return _pista("All disks are already on the last rod.", restantes=0)
+    desde, hasta = jugada
+    return _pista(
+        f"Move the top disk from rod {desde + 1} to rod {hasta + 1} "
+        f"({restantes} moves left).",
+        jugada, restantes=restantes
+    )
+
+PROVEEDORES = {
+    'nreinas': _pista_nreinas,
+    'caballo': _pista_caballo,
+    'hanoi': _pista_hanoi,
+}
+
+def _pista_llm(juego, estado):
+    from clients.common.ia_client import solicitar_sugerencia
+    texto = solicitar_sugerencia(juego, estado)
+    # El modelo responde en 1-based: "(r, c)" o "(desde, hasta)"
+    m = re.search(r"\(?\s*(\d+)\s*,\s*(\d+)\s*\)?", texto)
+    movimiento = (int(m.group(1)) - 1, int(m.group(2)) - 1) if m else None
+    return _pista(texto, movimiento, fuente='llm')
+
+def sugerir(juego, estado, usar_llm=True):
+    """
+    Pista para `juego` en el estado dado (el mismo dict que recibía
+    solicitar_sugerencia). Con usar_llm=False nunca se carga el modelo.
+    """
+    proveedor = PROVEEDORES.get(juego)
+    pista = proveedor(estado) if proveedor else None
+    if pista is not None:
+        return pista
+    if usar_llm:
+        try:
+            return _pista_llm(juego, estado)
+        except Exception as e:
+            return _pista(f"Error IA: {e}", fuente=None)
+    return _pista("No hint available for this position.", fuente=None)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Modos de inferencia en CPU para DialoGPT.
+
+    fp32  pesos tal cual (por defecto)
+    int8  cuantización dinámica int8 de las capas lineales
+    bf16  pesos y activaciones en bfloat16, si la CPU lo soporta
+
+El modo se elige con ARCADE_IA_BACKEND y el número de hilos de torch con
+ARCADE_IA_THREADS, sin tocar código. GPT-2 (y por tanto DialoGPT) implementa
+sus proyecciones con Conv1D de transformers y no con nn.Linear, así que antes
+de cuantizar se convierten a nn.Linear para que quantize_dynamic las incluya.
+
+Para comparar memoria y tokens/s de cada modo en esta máquina:
+    python -m clients.common.ia_backend --modos fp32 int8 bf16
+
+El RSS máximo es el pico de todo el proceso: para aislar el de un modo,
+mídelo en una ejecución aparte (--modos int8).
+"""
+import argparse
+import os
+import sys
+import time
+
+# Ajuste de path para importar desde la raíz del proyecto
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, os.pardir, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+BACKEND_ENV = "ARCADE_IA_BACKEND"
+THREADS_ENV = "ARCADE_IA_THREADS"
+MODOS = ("fp32", "int8", "bf16")
+
+def modo_configurado():
+    modo = os.environ.get(BACKEND_ENV, "fp32").strip().lower() or "fp32"
+    if modo not in MODOS:
+        raise ValueError(f"{BACKEND_ENV} debe ser uno de {', '.join(MODOS)}, no '{modo}'")
+    return modo
+
+def hilos_configurados():
+    valor = os.environ.get(THREADS_ENV, "").strip()
+    return int(valor) if valor else None
+
+def configurar_hilos(hilos=None):
+    """Fija los hilos intra-op de torch (por defecto, lo que decida torch)."""
+    import torch
+
+    if hilos:
+        torch.set_num_threads(hilos)
+    return torch.get_num_threads()
+
+def bf16_soportado():
+    """True si la CPU ejecuta matmuls en bfloat16 sin error."""
+    import torch
+
+    try:
+        a = torch.ones(4, 4, dtype=torch.bfloat16)
+        (a @ a).sum().item()
+        return True
+    except RuntimeError:
+        return False
+
+def _conv1d_a_linear(model):
+    """Sustituye las Conv1D de transformers (peso nx×nf) por nn.Linear equivalentes."""
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    for modulo in list(model.modules()):
+        for hijo_nombre, hijo in list(modulo.named_children()):
+            if isinstance(hijo, Conv1D):
+                nx, nf = hijo.weight.shape
+                lineal = torch.nn.Linear(nx, nf)
+                lineal.weight.data = hijo.weight.data.t().contiguous()
+                lineal.bias.data = hijo.bias.data
+                setattr(modulo, hijo_nombre, lineal)
+    return model
+
+def preparar_modelo(model, modo):
+    """Devuelve `model` convertido al modo pedido (ya en eval)."""
+    import torch
+
+    if modo == "int8":
+        model = torch.quantization.quantize_dynamic(
+            _conv1d_a_linear(model), {torch.nn.Linear}, dtype=torch.qint8
+        )
+    elif modo == "bf16":
+        if bf16_soportado():
+            model = model.to(torch.bfloat16)
+        else:
+            print("⚠️ bf16 no soportado en esta CPU; se usa fp32")
+    return model.eval()
+
+def huella_mb(model):
+    """MB ocupados por parámetros y buffers (incluidos los pesos int8 empaquetados)."""
+    total = sum(t.numel() * t.element_size() for t in model.parameters())
+    total += sum(t.numel() * t.element_size() for t in model.buffers())
+    # Las capas cuantizadas guardan el peso empaquetado fuera de parameters()
+    for modulo in model.modules():
+        empaquetado = getattr(modulo, "_packed_params", None)
+        if empaquetado is not None and hasattr(modulo, "weight"):
+            peso = modulo.weight()
+            total += peso.numel() * peso.element_size()
+    return total / 2 ** 20
+
+def rss_max_mb():
+    """Pico de memoria residente del proceso (MB), o None fuera de Unix."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo da en KB y macOS en bytes
+    return rss / 2 ** 20 if sys.platform == "darwin" else rss / 2 ** 10
+
+def medir(modo, prompts, hilos=None, max_new_tokens=40):
+    """
+    Carga el modelo en `modo`, genera una respuesta por prompt y devuelve
+    memoria del modelo, tiempo de carga y tokens/s. Se usa greedy para que
+    todos los modos generen la misma longitud.
+    """
+    import torch
+    from clients.common.ia_client import initialize_model
+
+    inicio = time.perf_counter()
+    tokenizer, model = initialize_model(modo, hilos)
+    hilos = torch.get_num_threads()
+    carga = time.perf_counter() - inicio
+
+    tokens = 0
+    inicio = time.perf_counter()
+    for prompt in prompts:
+        encoded = tokenizer(prompt + tokenizer.eos_token, return_tensors="pt")
+        with torch.no_grad():
+            out = model.generate(
+                **encoded,
+                pad_token_id=tokenizer.pad_token_id,
+                max_new_tokens=max_new_tokens,
+                do_sample=False,
+            )
+        tokens += out.shape[-1] - encoded["input_ids"].shape[-1]
+    segundos = time.perf_counter() - inicio
+    return {
+        "modo": modo,
+        "hilos": hilos,
+        "modelo_mb": huella_mb(model),
+        "rss_max_mb": rss_max_mb(),
+        "carga_s": carga,
+        "tokens": tokens,
+        "tokens_s": tokens / segundos if segundos else 0.0,
+    }
+
+PROMPTS = [
+    "Where should I place the next queen on an 8x8 board?",
+    "What is the next move in the Towers of Hanoi with 3 disks?",
+    "Hello, how are you?",
+]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara memoria y tokens/s de los modos de inferencia")
+    parser.add_argument("--modos", nargs="+", choices=MODOS, default=list(MODOS))
+    parser.add_argument("--hilos", type=int, default=hilos_configurados())
+    parser.add_argument("--tokens", type=int, default=40, help="tokens nuevos por prompt")
+    args = parser.parse_args()
+
+    print(f"{'modo':<6} {'hilos':>5} {'modelo MB':>10} {'RSS máx MB':>11} {'carga s':>8} {'tokens/s':>9}")
+    for modo in args.modos:
+        r = medir(modo, PROMPTS, args.hilos, args.tokens)
+        rss = f"{r['rss_max_mb']:.0f}" if r["rss_max_mb"] is not None else "-"
+        print(f"{r['modo']:<6} {r['hilos']:>5} {r['modelo_mb']:>10.0f} {rss:>11} "
+              f"{r['carga_s']:>8.1f} {r['tokens_s']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
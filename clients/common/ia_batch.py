@@ -0,0 +1,83 @@
+"""
+Cola de inferencia con agrupación en lotes.
+
+Las peticiones que llegan dentro de una ventana corta (`max_delay`) se juntan
+en un único lote con padding y se resuelven con una sola llamada a
+`model.generate`, en lugar de un generate con batch 1 por clic compitiendo por
+la CPU. Cada petición recibe un Future con su texto.
+
+metrics() expone la profundidad de la cola y el histograma de tamaños de lote.
+"""
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+from server.batching import BatchQueue
+
+class InferenceQueue(BatchQueue):
+    """
+    Un único hilo consume la cola: toma la primera petición, espera hasta
+    `max_delay` segundos a que lleguen más (como mucho `max_batch`) y llama a
+    `generate_batch(prompts)`, que debe devolver un texto por prompt.
+    """
+
+    def __init__(self, generate_batch, max_batch=8, max_delay=0.03):
+        super().__init__(self._process, max_batch, max_delay, name='ia-batch')
+        self.generate_batch = generate_batch
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.batch_sizes = Counter()
+        self.wait_seconds = 0.0
+        self.generate_seconds = 0.0
+
+    def submit(self, prompt):
+        """Encola un prompt y devuelve un Future con el texto generado."""
+        fut = Future()
+        self.put((prompt, fut, time.monotonic()))
+        return fut
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'pendientes': self.queue.qsize(),
+                'en_curso': self.in_flight,
+                'peticiones': self.requests,
+                'lotes': self.batches,
+                'errores': self.errors,
+                'lote_medio': self.requests / self.batches if self.batches else 0.0,
+                'lote_max': max(self.batch_sizes, default=0),
+                'tamanos_lote': dict(sorted(self.batch_sizes.items())),
+                'espera_media_s': self.wait_seconds / self.requests if self.requests else 0.0,
+                'generate_medio_s': self.generate_seconds / self.batches if self.batches else 0.0,
+            }
+
+    def _process(self, batch):
+        inicio = time.monotonic()
+        with self._lock:
+            self.in_flight = len(batch)
+            self.wait_seconds += sum(inicio - t for _, _, t in batch)
+        try:
+            textos = self.generate_batch([prompt for prompt, _, _ in batch])
+            if len(textos) != len(batch):
+                raise ValueError(f'generate_batch devolvió {len(textos)} textos para {len(batch)} prompts')
+        except Exception as e:
+            print(f'⚠️ Error generando lote de {len(batch)}: {e}')
+            with self._lock:
+                self.in_flight = 0
+                self.errors += 1
+            for _, fut, _ in batch:
+                fut.set_exception(e)
+            return
+
+        with self._lock:
+            self.in_flight = 0
+            self.requests += len(batch)
+            self.batches += 1
+            self.batch_sizes[len(batch)] += 1
+            self.generate_seconds += time.monotonic() - inicio
+        for (_, fut, _), texto in zip(batch, textos):
+            fut.set_result(texto)
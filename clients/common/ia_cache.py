@@ -0,0 +1,212 @@
+"""
+Caché de sugerencias del asistente IA por estado canónico.
+
+El prompt de solicitar_sugerencia depende solo del estado del juego, así que la
+respuesta se guarda con una clave canónica:
+
+- nreinas: N y el conjunto ordenado de reinas.
+- caballo: N, casilla inicial y conjunto ordenado de casillas visitadas.
+- hanoi: discos y contenido de cada varilla.
+
+En los tableros se elige, de las 8 simetrías del cuadrado (giros y reflejos),
+la que da la clave mínima: posiciones simétricas comparten entrada. El prompt
+se construye con el estado canónico y las coordenadas de la respuesta se
+devuelven al marco original con la simetría inversa (desnormalizar).
+
+ResponseCache es un LRU en memoria con caducidad (TTL) y, opcionalmente, una
+copia en disco (SQLite) que sobrevive entre ejecuciones y procesos.
+"""
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from clients.caballo.engine import coord_to_pos, pos_to_coord
+
+# (r, c) -> (r', c') en un tablero N×N: identidad, giros de 90/180/270,
+# reflejo horizontal, vertical, diagonal principal y antidiagonal
+SIMETRIAS = (
+    lambda N, r, c: (r, c),
+    lambda N, r, c: (c, N - 1 - r),
+    lambda N, r, c: (N - 1 - r, N - 1 - c),
+    lambda N, r, c: (N - 1 - c, r),
+    lambda N, r, c: (r, N - 1 - c),
+    lambda N, r, c: (N - 1 - r, c),
+    lambda N, r, c: (c, r),
+    lambda N, r, c: (N - 1 - c, N - 1 - r),
+)
+# Índice de la simetría inversa de cada una (los giros de 90 y 270 se invierten entre sí)
+INVERSA = (0, 3, 2, 1, 4, 5, 6, 7)
+
+def _canon_nreinas(estado):
+    N = estado['N']
+    reinas = [tuple(q) for q in estado.get('reinas', [])]
+    mejor = None
+    for t, f in enumerate(SIMETRIAS):
+        cand = sorted(f(N, r, c) for r, c in reinas)
+        if mejor is None or cand < mejor[0]:
+            mejor = (cand, t)
+    reinas, t = mejor
+    return {'N': N, 'reinas': reinas}, t
+
+def _canon_caballo(estado):
+    N = estado['N']
+    visitadas = [tuple(v) for v in estado.get('visitadas', [])]
+    inicio = estado.get('inicio')
+    ini = pos_to_coord(inicio) if inicio else None
+    mejor = None
+    for t, f in enumerate(SIMETRIAS):
+        cand = (
+            f(N, *ini) if ini else (),
+            sorted(f(N, r, c) for r, c in visitadas),
+        )
+        if mejor is None or cand < mejor[0]:
+            mejor = (cand, t)
+    (ini, visitadas), t = mejor
+    return {
+        'N': N,
+        'inicio': coord_to_pos(N, *ini) if ini else None,
+        'visitadas': visitadas,
+    }, t
+
+def _canon_hanoi(estado):
+    pegs = {int(k): list(v) for k, v in estado['pegs'].items()}
+    return {'discos': estado['discos'], 'pegs': dict(sorted(pegs.items()))}, 0
+
+CANONIZADORES = {
+    'nreinas': _canon_nreinas,
+    'caballo': _canon_caballo,
+    'hanoi': _canon_hanoi,
+}
+
+def canonizar(juego, estado):
+    """
+    (clave, estado canónico, simetría aplicada). Para juegos sin canonizador
+    se usa el estado tal cual, serializado con las claves ordenadas.
+    """
+    canon = CANONIZADORES.get(juego)
+    canonico, t = canon(estado) if canon else (estado, 0)
+    clave = json.dumps([juego, canonico], sort_keys=True, default=str)
+    return clave, canonico, t
+
+_COORD = re.compile(r"\(\s*(\d+)\s*,\s*(\d+)\s*\)")
+
+def desnormalizar(juego, texto, estado, t):
+    """
+    Pasa las coordenadas "(fila, col)" 1-based de `texto`, escritas para el
+    estado canónico, al marco del estado original deshaciendo la simetría `t`.
+    """
+    if t == 0 or juego not in ('nreinas', 'caballo'):
+        return texto
+    N = estado['N']
+    f = SIMETRIAS[INVERSA[t]]
+
+    def mapear(m):
+        r, c = int(m.group(1)) - 1, int(m.group(2)) - 1
+        if not (0 <= r < N and 0 <= c < N):
+            return m.group(0)
+        r, c = f(N, r, c)
+        return f"({r + 1}, {c + 1})"
+
+    return _COORD.sub(mapear, texto)
+
+class ResponseCache:
+    """
+    LRU de `max_entries` respuestas que caducan a los `ttl` segundos. Con
+    `path`, cada respuesta se guarda también en una tabla SQLite y los fallos
+    en memoria se buscan allí antes de generar.
+    """
+
+    def __init__(self, max_entries=256, ttl=24 * 3600, path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._mem = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS ia_cache "
+                "(clave TEXT PRIMARY KEY, texto TEXT NOT NULL, creado REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def _vigente(self, creado, ahora):
+        return self.ttl is None or ahora - creado < self.ttl
+
+    def get(self, clave):
+        """Texto guardado para `clave`, o None."""
+        ahora = time.time()
+        with self._lock:
+            entrada = self._mem.get(clave)
+            if entrada is not None:
+                texto, creado = entrada
+                if self._vigente(creado, ahora):
+                    self._mem.move_to_end(clave)
+                    self.hits += 1
+                    return texto
+                del self._mem[clave]
+                self.expired += 1
+            if self._db is not None:
+                fila = self._db.execute(
+                    "SELECT texto, creado FROM ia_cache WHERE clave = ?", (clave,)
+                ).fetchone()
+                if fila is not None:
+                    texto, creado = fila
+                    if self._vigente(creado, ahora):
+                        self._guardar_mem(clave, texto, creado)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return texto
+                    self._db.execute("DELETE FROM ia_cache WHERE clave = ?", (clave,))
+                    self._db.commit()
+                    self.expired += 1
+            self.misses += 1
+            return None
+
+    def put(self, clave, texto):
+        creado = time.time()
+        with self._lock:
+            self._guardar_mem(clave, texto, creado)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO ia_cache (clave, texto, creado) VALUES (?, ?, ?)",
+                    (clave, texto, creado)
+                )
+                if self.ttl is not None:
+                    self._db.execute("DELETE FROM ia_cache WHERE creado < ?", (creado - self.ttl,))
+                self._db.commit()
+
+    def _guardar_mem(self, clave, texto, creado):
+        self._mem[clave] = (texto, creado)
+        self._mem.move_to_end(clave)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM ia_cache")
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                'entradas': len(self._mem),
+                'aciertos': self.hits,
+                'aciertos_disco': self.disk_hits,
+                'fallos': self.misses,
+                'expulsadas': self.evictions,
+                'caducadas': self.expired,
+                'tasa_acierto': self.hits / consultas if consultas else 0.0,
+            }
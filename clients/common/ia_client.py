@@ -1,19 +1,126 @@
 #!/usr/bin/env python3
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
+"""
+Cliente del asistente IA (DialoGPT-medium).
+
+El modelo no se carga al importar el módulo: get_model() lo inicializa la
+primera vez que se pide una respuesta, así que las UIs que nunca pulsan
+"IA Help" no pagan ni el arranque de torch ni la memoria de los pesos.
+
+Si la variable ARCADE_IA_DAEMON=host:puerto apunta a un ia_daemon.py en marcha,
+las consultas se envían por socket a ese proceso, que mantiene una única copia
+del modelo para todas las ventanas. Si el servicio no responde se usa el modelo
+local como hasta ahora.
+
+Las generaciones locales pasan por una InferenceQueue (ia_batch.py): las
+peticiones simultáneas se agrupan en un solo generate con padding. El tamaño
+máximo del lote y la ventana de espera se ajustan con ARCADE_IA_BATCH y
+ARCADE_IA_BATCH_MS.
+
+Las sugerencias se guardan en una ResponseCache (ia_cache.py) con clave el
+estado canónico del juego: ARCADE_IA_CACHE_SIZE entradas en memoria (0 la
+desactiva), caducidad ARCADE_IA_CACHE_TTL en segundos y, si se define
+ARCADE_IA_CACHE_PATH, copia persistente en ese fichero SQLite.
+
+El modo de inferencia (fp32, int8 o bf16) y los hilos de torch se eligen con
+ARCADE_IA_BACKEND y ARCADE_IA_THREADS (ver ia_backend.py); rendimiento()
+informa del modo, la memoria del modelo y los tokens/s medidos.
+
+consultar_chatbot_stream() devuelve la respuesta del chat trozo a trozo según
+se generan los tokens (TextIteratorStreamer), en local o desde el servicio.
+
+ChatSession mantiene una conversación de varios turnos: guarda los
+past_key_values entre turnos, así que cada respuesta solo codifica los tokens
+nuevos, y recorta el historial a ARCADE_IA_CHAT_TOKENS tokens.
+"""
+import concurrent.futures
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+
+MODEL_NAME = "microsoft/DialoGPT-medium"
+DAEMON_ENV = "ARCADE_IA_DAEMON"
+DAEMON_TIMEOUT = 120
+# Menor que DAEMON_TIMEOUT para que el servicio aún pueda responder (vacío)
+# antes de que el cliente corte el socket
+GENERATE_TIMEOUT = 90
+BATCH_ENV = "ARCADE_IA_BATCH"
+BATCH_MS_ENV = "ARCADE_IA_BATCH_MS"
+CACHE_SIZE_ENV = "ARCADE_IA_CACHE_SIZE"
+CACHE_TTL_ENV = "ARCADE_IA_CACHE_TTL"
+CACHE_PATH_ENV = "ARCADE_IA_CACHE_PATH"
+CHAT_TOKENS_ENV = "ARCADE_IA_CHAT_TOKENS"
+
+_model_lock = threading.Lock()
+# Un solo generate/forward a la vez sobre el modelo: los lotes, el streaming y
+# los turnos de chat se turnan en lugar de repartirse los hilos de la CPU
+_inferencia_lock = threading.Lock()
+_tokenizer = None
+_model = None
+_queue = None
+_queue_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"tokens": 0, "segundos": 0.0}
+
+def initialize_model(modo=None, hilos=None):
+    from transformers import AutoTokenizer, AutoModelForCausalLM
+    from clients.common.ia_backend import (
+        configurar_hilos, hilos_configurados, modo_configurado, preparar_modelo
+    )
+
+    modo = modo or modo_configurado()
+    configurar_hilos(hilos or hilos_configurados())
 
-def initialize_model():
-    MODEL_NAME = "microsoft/DialoGPT-medium"
     tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
     # Si no tiene pad_token, lo asignamos al eos_token
     if tokenizer.pad_token is None:
         tokenizer.pad_token = tokenizer.eos_token
+    # Modelo solo-decoder: en lotes el padding va a la izquierda para que todos
+    # los prompts terminen en la misma posición y la generación siga desde ahí
+    tokenizer.padding_side = "left"
     model = AutoModelForCausalLM.from_pretrained(MODEL_NAME)
-    model.eval()
+    model = preparar_modelo(model.eval(), modo)
+    model.modo_backend = modo
     return tokenizer, model
 
-# Inicializamos
-tokenizer, model = initialize_model()
+def get_model():
+    """(tokenizer, model), cargados una sola vez por proceso en el primer uso."""
+    global _tokenizer, _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _tokenizer, _model = initialize_model()
+    return _tokenizer, _model
+
+def model_loaded():
+    return _model is not None
+
+def rendimiento() -> dict:
+    """Modo, hilos, memoria del modelo y tokens/s de las generaciones locales."""
+    if _model is None:
+        return {}
+    import torch
+    from clients.common.ia_backend import huella_mb, rss_max_mb
+
+    with _stats_lock:
+        tokens, segundos = _stats["tokens"], _stats["segundos"]
+    return {
+        "modo": _model.modo_backend,
+        "hilos": torch.get_num_threads(),
+        "modelo_mb": huella_mb(_model),
+        "rss_max_mb": rss_max_mb(),
+        "tokens": tokens,
+        "tokens_s": tokens / segundos if segundos else 0.0,
+    }
+
+def _contar(tokens, segundos):
+    with _stats_lock:
+        _stats["tokens"] += tokens
+        _stats["segundos"] += segundos
 
 # Parámetros de generación
 GEN_PARAMS = {
@@ -26,46 +133,49 @@ GEN_PARAMS = {
     "do_sample": True,
 }
 
-def solicitar_sugerencia(juego: str, estado: dict) -> str:
-    """
-    Construye un prompt en inglés para el estado del juego y devuelve la sugerencia.
-    """
+def construir_prompt(juego: str, estado: dict) -> str:
+    """Prompt en inglés que describe el estado del juego."""
     if juego == "nreinas":
-        prompt = (
+        return (
             f"I'm playing the {estado['N']}-Queens puzzle on a {estado['N']}×{estado['N']} board. "
             f"The queens are at positions {estado['reinas']}. "
             "Where should I place the next queen? "
             "Please answer with coordinates (row, column), 1-based indexing."
         )
-    elif juego == "caballo":
-        prompt = (
+    if juego == "caballo":
+        return (
             f"I'm playing the Knight's Tour on a {estado['N']}×{estado['N']} chessboard. "
             f"The knight started at {estado.get('inicio')} and has visited {estado['visitadas']}. "
             "What is the next move? "
             "Provide the position as (row, column), 1-based indexing."
         )
-    elif juego == "hanoi":
-        prompt = (
+    if juego == "hanoi":
+        return (
             f"I'm solving the Towers of Hanoi puzzle with {estado['discos']} disks. "
             f"The rods configuration is {estado['pegs']}. "
             "What is the next move I should make? "
             "Please specify the move as (from_rod, to_rod), 1-based indexing."
         )
-    else:
-        prompt = (
-            f"Game state: {estado}. "
-            "What is the next move? Provide coordinates or appropriate format."
-        )
+    return (
+        f"Game state: {estado}. "
+        "What is the next move? Provide coordinates or appropriate format."
+    )
 
+def generar_lote(prompts: list) -> list:
+    """Genera con el modelo local la respuesta a cada prompt en un único generate."""
+    import torch
+
+    tokenizer, model = get_model()
     # Tokenización con padding confiable
-    encoded = tokenizer(prompt + tokenizer.eos_token,
+    encoded = tokenizer([p + tokenizer.eos_token for p in prompts],
                         return_tensors="pt",
                         padding=True,
                         truncation=True)
     input_ids = encoded["input_ids"]
     attention_mask = encoded["attention_mask"]
 
-    with torch.no_grad():
+    with _inferencia_lock, torch.no_grad():
+        inicio = time.perf_counter()
         outputs = model.generate(
             input_ids=input_ids,
             attention_mask=attention_mask,
@@ -73,31 +183,378 @@ def solicitar_sugerencia(juego: str, estado: dict) -> str:
             max_length=input_ids.shape[-1] + GEN_PARAMS["max_new_tokens"],
             **GEN_PARAMS
         )
-    # Extraemos solo la parte generada
-    generated = outputs[0][input_ids.shape[-1]:]
-    text = tokenizer.decode(generated, skip_special_tokens=True).strip()
-    return text or "<no suggestion available>"
+    # Extraemos solo la parte generada de cada fila
+    generados = outputs[:, input_ids.shape[-1]:]
+    _contar(int((generados != tokenizer.pad_token_id).sum()), time.perf_counter() - inicio)
+    return [
+        tokenizer.decode(out, skip_special_tokens=True).strip()
+        for out in generados
+    ]
 
-def consultar_chatbot(pregunta: str) -> str:
+def get_queue():
+    """Cola de inferencia del proceso; se crea y arranca en el primer uso."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                from clients.common.ia_batch import InferenceQueue
+                _queue = InferenceQueue(
+                    generar_lote,
+                    max_batch=int(os.environ.get(BATCH_ENV, 8)),
+                    max_delay=float(os.environ.get(BATCH_MS_ENV, 30)) / 1000,
+                ).start()
+    return _queue
+
+def metricas_cola() -> dict:
+    """Profundidad de la cola y tamaños de lote (vacío si aún no se ha usado)."""
+    return get_queue().metrics() if _queue is not None else {}
+
+def get_cache():
+    """Caché de sugerencias del proceso, o None si ARCADE_IA_CACHE_SIZE=0."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                from clients.common.ia_cache import ResponseCache
+                size = int(os.environ.get(CACHE_SIZE_ENV, 256))
+                _cache = ResponseCache(
+                    max_entries=size,
+                    ttl=float(os.environ.get(CACHE_TTL_ENV, 24 * 3600)),
+                    path=os.environ.get(CACHE_PATH_ENV) or None,
+                ) if size > 0 else False
+    return _cache or None
+
+def metricas_cache() -> dict:
+    cache = get_cache()
+    return cache.stats() if cache else {}
+
+def generar(prompt: str) -> str:
     """
-    Envía una pregunta libre al modelo y devuelve su respuesta.
+    Genera la respuesta del modelo local a `prompt` (cadena vacía si no hay o
+    si tarda más de GENERATE_TIMEOUT segundos).
     """
-    prompt = pregunta + tokenizer.eos_token
-    encoded = tokenizer(prompt,
+    try:
+        return get_queue().submit(prompt).result(timeout=GENERATE_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        print(f"⚠️ La generación superó {GENERATE_TIMEOUT} s; se descarta")
+        return ""
+
+def generar_stream(prompt: str):
+    """
+    Generador con los trozos de texto de la respuesta del modelo local según
+    se producen. generate corre en un hilo aparte y el streamer hace de cola;
+    no pasa por la cola de lotes porque cada petición lleva su streamer, pero
+    espera su turno en _inferencia_lock como los lotes.
+    """
+    import torch
+    from transformers import TextIteratorStreamer
+
+    tokenizer, model = get_model()
+    encoded = tokenizer(prompt + tokenizer.eos_token,
                         return_tensors="pt",
-                        padding=True,
                         truncation=True)
     input_ids = encoded["input_ids"]
-    attention_mask = encoded["attention_mask"]
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    error = []
 
-    with torch.no_grad():
-        outputs = model.generate(
-            input_ids=input_ids,
-            attention_mask=attention_mask,
-            pad_token_id=tokenizer.pad_token_id,
-            max_length=input_ids.shape[-1] + GEN_PARAMS["max_new_tokens"],
-            **GEN_PARAMS
-        )
-    generated = outputs[0][input_ids.shape[-1]:]
-    text = tokenizer.decode(generated, skip_special_tokens=True).strip()
-    return text or "<no response available>"
+    def run():
+        try:
+            with _inferencia_lock, torch.no_grad():
+                inicio = time.perf_counter()
+                outputs = model.generate(
+                    input_ids=input_ids,
+                    attention_mask=encoded["attention_mask"],
+                    pad_token_id=tokenizer.pad_token_id,
+                    max_length=input_ids.shape[-1] + GEN_PARAMS["max_new_tokens"],
+                    streamer=streamer,
+                    **GEN_PARAMS
+                )
+                _contar(outputs.shape[-1] - input_ids.shape[-1], time.perf_counter() - inicio)
+        except Exception as e:
+            error.append(e)
+            # Desbloquea al consumidor
+            streamer.end()
+
+    hilo = threading.Thread(target=run, name="ia-stream", daemon=True)
+    hilo.start()
+    for texto in streamer:
+        if texto:
+            yield texto
+    hilo.join()
+    if error:
+        raise error[0]
+
+def direccion_daemon():
+    """(host, puerto) del servicio de inferencia según ARCADE_IA_DAEMON, o None."""
+    valor = os.environ.get(DAEMON_ENV, "").strip()
+    if not valor:
+        return None
+    host, _, puerto = valor.rpartition(":")
+    return host or "127.0.0.1", int(puerto)
+
+def _leer_respuesta(linea):
+    # Una línea ilegible o {"ok": false} se tratan como servicio no disponible
+    # (ConnectionError es un OSError), así quien llama cae al modelo local
+    try:
+        respuesta = json.loads(linea)
+    except ValueError as e:
+        raise ConnectionError(f"respuesta ilegible del servicio de inferencia: {e}") from e
+    if not isinstance(respuesta, dict) or not respuesta.get("ok"):
+        error = respuesta.get("error") if isinstance(respuesta, dict) else None
+        raise ConnectionError(error or "error en el servicio de inferencia")
+    return respuesta
+
+def consultar_daemon(peticion: dict, direccion=None) -> str:
+    """
+    Envía una petición (una línea JSON) al servicio de inferencia y devuelve
+    el texto generado. Lanza OSError si el servicio no está disponible o
+    responde con un error.
+    """
+    direccion = direccion or direccion_daemon()
+    with socket.create_connection(direccion, timeout=DAEMON_TIMEOUT) as sock:
+        sock.sendall(json.dumps(peticion).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            linea = f.readline()
+    if not linea:
+        raise ConnectionError("el servicio de inferencia cerró la conexión")
+    return _leer_respuesta(linea)["texto"]
+
+def consultar_daemon_stream(peticion: dict, direccion=None):
+    """
+    Como consultar_daemon, pero el servicio responde con varias líneas
+    {"ok": true, "delta": ...} y una final {"ok": true, "fin": true}.
+    """
+    direccion = direccion or direccion_daemon()
+    with socket.create_connection(direccion, timeout=DAEMON_TIMEOUT) as sock:
+        sock.sendall(json.dumps(peticion).encode() + b"\n")
+        with sock.makefile("rb") as f:
+            for linea in f:
+                respuesta = _leer_respuesta(linea)
+                if respuesta.get("fin"):
+                    return
+                yield respuesta["delta"]
+    raise ConnectionError("el servicio de inferencia cerró la conexión")
+
+def _remoto_o_local(peticion, local):
+    direccion = direccion_daemon()
+    if direccion is not None:
+        try:
+            return consultar_daemon(peticion, direccion)
+        except OSError as e:
+            print(f"⚠️ Servicio IA no disponible ({e}); se usa el modelo local")
+    return local()
+
+def sugerencia_local(juego: str, estado: dict) -> str:
+    from clients.common.ia_cache import canonizar, desnormalizar
+
+    cache = get_cache()
+    clave, canonico, simetria = canonizar(juego, estado)
+    texto = cache.get(clave) if cache else None
+    if texto is None:
+        # El modelo responde sobre el estado canónico; la respuesta se
+        # devuelve al marco del tablero original
+        texto = generar(construir_prompt(juego, canonico))
+        if texto and cache:
+            cache.put(clave, texto)
+    return desnormalizar(juego, texto, estado, simetria) or "<no suggestion available>"
+
+def chatbot_local(pregunta: str) -> str:
+    return generar(pregunta) or "<no response available>"
+
+def solicitar_sugerencia(juego: str, estado: dict) -> str:
+    """
+    Construye un prompt en inglés para el estado del juego y devuelve la sugerencia.
+    """
+    return _remoto_o_local(
+        {"op": "sugerencia", "juego": juego, "estado": estado},
+        lambda: sugerencia_local(juego, estado)
+    )
+
+def consultar_chatbot(pregunta: str) -> str:
+    """
+    Envía una pregunta libre al modelo y devuelve su respuesta.
+    """
+    return _remoto_o_local(
+        {"op": "chat", "pregunta": pregunta},
+        lambda: chatbot_local(pregunta)
+    )
+
+def consultar_chatbot_stream(pregunta: str):
+    """
+    Como consultar_chatbot, pero genera la respuesta en trozos según se
+    producen los tokens.
+    """
+    direccion = direccion_daemon()
+    if direccion is not None:
+        recibido = False
+        try:
+            for delta in consultar_daemon_stream({"op": "chat_stream", "pregunta": pregunta}, direccion):
+                recibido = True
+                yield delta
+            return
+        except OSError as e:
+            # A mitad de respuesta no se puede reintentar en local sin repetir texto
+            if recibido:
+                raise
+            print(f"⚠️ Servicio IA no disponible ({e}); se usa el modelo local")
+    yield from generar_stream(pregunta)
+
+def _siguiente_token(logits, previos, params=GEN_PARAMS):
+    """
+    Elige el siguiente token a partir de los logits del último paso aplicando
+    los mismos filtros que generate con GEN_PARAMS: penalización de
+    repetición, n-gramas prohibidos, temperatura, top-k y top-p.
+    """
+    import torch
+
+    logits = logits.float().clone()
+    penalizacion = params.get("repetition_penalty", 1.0)
+    if penalizacion != 1.0 and previos:
+        idx = torch.tensor(sorted(set(previos)))
+        sel = logits[idx]
+        logits[idx] = torch.where(sel < 0, sel * penalizacion, sel / penalizacion)
+    n = params.get("no_repeat_ngram_size", 0)
+    if n and len(previos) >= n:
+        # Tokens que cerrarían un n-grama ya visto
+        prefijo = previos[len(previos) - n + 1:]
+        prohibidos = [
+            previos[i + n - 1] for i in range(len(previos) - n + 1)
+            if previos[i:i + n - 1] == prefijo
+        ]
+        if prohibidos:
+            logits[prohibidos] = float("-inf")
+    if not params.get("do_sample"):
+        return int(torch.argmax(logits))
+
+    logits /= params.get("temperature", 1.0)
+    top_k = params.get("top_k", 0)
+    if top_k:
+        umbral = torch.topk(logits, min(top_k, logits.shape[-1])).values[-1]
+        logits[logits < umbral] = float("-inf")
+    top_p = params.get("top_p", 1.0)
+    if top_p < 1.0:
+        ordenados, indices = torch.sort(logits, descending=True)
+        acumulada = torch.softmax(ordenados, dim=-1).cumsum(dim=-1)
+        # Se quitan los que quedan fuera de la masa top_p, conservando siempre el primero
+        quitar = acumulada > top_p
+        quitar[1:] = quitar[:-1].clone()
+        quitar[0] = False
+        logits[indices[quitar]] = float("-inf")
+    return int(torch.multinomial(torch.softmax(logits, dim=-1), 1))
+
+class ChatSession:
+    """
+    Conversación de varios turnos con el modelo.
+
+    El historial se guarda como lista de turnos (ids de tokens terminados en
+    eos, el formato de DialoGPT) junto con los past_key_values que ya lo
+    codifican: en cada turno solo se pasan al modelo los tokens que aún no
+    están en la caché (el eos de la última respuesta y el mensaje nuevo).
+    Si el historial más la respuesta superan `max_tokens`, se descartan los
+    turnos más antiguos y la caché se reconstruye una vez.
+
+    Con el servicio de inferencia configurado, la sesión vive en el servicio
+    (identificada por `id`) y aquí solo se reenvían los mensajes.
+    """
+
+    def __init__(self, max_tokens=None, id=None):
+        self.max_tokens = max_tokens or int(os.environ.get(CHAT_TOKENS_ENV, 512))
+        self.id = id or uuid.uuid4().hex
+        self.turnos = []
+        self.past = None
+        self.en_cache = 0
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Empieza una conversación nueva (también en el servicio, con otro id)."""
+        with self._lock:
+            self.id = uuid.uuid4().hex
+            self.turnos = []
+            self.past = None
+            self.en_cache = 0
+
+    def tokens(self):
+        return sum(len(t) for t in self.turnos)
+
+    def responder(self, pregunta: str) -> str:
+        return "".join(self.responder_stream(pregunta)).strip() or "<no response available>"
+
+    def responder_stream(self, pregunta: str):
+        """Trozos de la respuesta a `pregunta` en el contexto de la conversación."""
+        direccion = direccion_daemon()
+        if direccion is not None:
+            recibido = False
+            try:
+                peticion = {"op": "chat_stream", "pregunta": pregunta,
+                            "sesion": self.id, "max_tokens": self.max_tokens}
+                for delta in consultar_daemon_stream(peticion, direccion):
+                    recibido = True
+                    yield delta
+                return
+            except OSError as e:
+                if recibido:
+                    raise
+                print(f"⚠️ Servicio IA no disponible ({e}); se usa el modelo local")
+        yield from self.responder_local_stream(pregunta)
+
+    def _recortar(self, nuevo, reserva):
+        # Deja sitio para el mensaje nuevo y la respuesta quitando turnos antiguos
+        limite = max(self.max_tokens - reserva, 1)
+        nuevo = nuevo[-limite:]
+        recortado = False
+        while self.turnos and self.tokens() + len(nuevo) > limite:
+            self.turnos.pop(0)
+            recortado = True
+        if recortado:
+            self.past = None
+            self.en_cache = 0
+        return nuevo
+
+    def responder_local_stream(self, pregunta: str):
+        import torch
+
+        tokenizer, model = get_model()
+        eos = tokenizer.eos_token_id
+        max_nuevos = GEN_PARAMS["max_new_tokens"]
+        segundos = 0.0
+
+        def paso(ids, past):
+            # Cada forward espera su turno con los lotes y otros streams; el
+            # candado no se retiene entre tokens mientras el consumidor lee
+            nonlocal segundos
+            with _inferencia_lock:
+                t0 = time.perf_counter()
+                out = model(input_ids=torch.tensor(ids), past_key_values=past, use_cache=True)
+                segundos += time.perf_counter() - t0
+            return out
+
+        with self._lock:
+            nuevo = self._recortar(tokenizer.encode(pregunta) + [eos], max_nuevos)
+            historial = [tok for turno in self.turnos for tok in turno]
+            entrada = historial[self.en_cache:] + nuevo
+            previos = historial + nuevo
+            respuesta = []
+            texto = ""
+            try:
+                with torch.no_grad():
+                    out = paso([entrada], self.past)
+                    for _ in range(max_nuevos):
+                        tok = _siguiente_token(out.logits[0, -1], previos + respuesta)
+                        if tok == eos:
+                            break
+                        respuesta.append(tok)
+                        completo = tokenizer.decode(respuesta, skip_special_tokens=True)
+                        if len(completo) > len(texto):
+                            yield completo[len(texto):]
+                            texto = completo
+                        out = paso([[tok]], out.past_key_values)
+            except BaseException:
+                # Turno a medias (error o consumidor que abandona): se descarta la caché
+                self.past = None
+                self.en_cache = 0
+                raise
+            _contar(len(respuesta), segundos)
+            # La caché cubre todo menos el eos que cierra la respuesta
+            self.turnos += [nuevo, respuesta + [eos]]
+            self.past = out.past_key_values
+            self.en_cache = self.tokens() - 1
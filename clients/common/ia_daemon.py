@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Servicio local de inferencia para el asistente IA.
+
+Carga DialoGPT una sola vez y atiende por TCP a todas las UIs y al chat, que
+lo usan si tienen ARCADE_IA_DAEMON=host:puerto en el entorno. Protocolo: una
+línea JSON por petición y otra por respuesta, sobre la misma conexión.
+
+    {"op": "sugerencia", "juego": ..., "estado": {...}}
+    {"op": "chat", "pregunta": ...}
+    {"op": "chat_stream", "pregunta": ..., ["sesion": id, "max_tokens": n]}
+      -> {"ok": true, "delta": ...} por cada trozo y {"ok": true, "fin": true}
+    {"op": "ping"} | {"op": "metricas"}
+      -> {"ok": true, "texto": ...} | {"ok": false, "error": ...}
+
+Uso:
+    python -m clients.common.ia_daemon [--host 127.0.0.1] [--port 5060]
+    export ARCADE_IA_DAEMON=127.0.0.1:5060
+"""
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+
+# Ajuste de path para importar desde la raíz del proyecto
+THIS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, os.pardir, os.pardir))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from clients.common import ia_client
+
+DEFAULT_PORT = 5060
+# Conversaciones abiertas (ChatSession con su caché KV); se expulsa la más antigua
+MAX_SESIONES = 32
+
+_sesiones = OrderedDict()
+_sesiones_lock = threading.Lock()
+
+def obtener_sesion(id, max_tokens=None):
+    with _sesiones_lock:
+        sesion = _sesiones.get(id)
+        if sesion is None:
+            sesion = _sesiones[id] = ia_client.ChatSession(max_tokens, id=id)
+        _sesiones.move_to_end(id)
+        while len(_sesiones) > MAX_SESIONES:
+            _sesiones.popitem(last=False)
+        return sesion
+
+def atender(peticion):
+    op = peticion.get("op")
+    if op == "ping":
+        return {"ok": True, "texto": "pong", "modelo_cargado": ia_client.model_loaded()}
+    if op == "metricas":
+        return {"ok": True, "texto": json.dumps({
+            "cola": ia_client.metricas_cola(),
+            "cache": ia_client.metricas_cache(),
+            "modelo": ia_client.rendimiento(),
+        })}
+    # Cada conexión se atiende en su hilo; las generaciones simultáneas se
+    # agrupan en lotes en la cola de ia_client
+    if op == "sugerencia":
+        texto = ia_client.sugerencia_local(peticion["juego"], peticion["estado"])
+    elif op == "chat":
+        texto = ia_client.chatbot_local(peticion["pregunta"])
+    else:
+        return {"ok": False, "error": f"operación desconocida: {op}"}
+    return {"ok": True, "texto": texto}
+
+def atender_stream(peticion):
+    if peticion.get("sesion"):
+        sesion = obtener_sesion(peticion["sesion"], peticion.get("max_tokens"))
+        trozos = sesion.responder_local_stream(peticion["pregunta"])
+    else:
+        trozos = ia_client.generar_stream(peticion["pregunta"])
+    for delta in trozos:
+        yield {"ok": True, "delta": delta}
+    yield {"ok": True, "fin": True}
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for linea in self.rfile:
+            try:
+                peticion = json.loads(linea)
+                if peticion.get("op") == "chat_stream":
+                    for respuesta in atender_stream(peticion):
+                        self._responder(respuesta)
+                    continue
+                respuesta = atender(peticion)
+            except Exception as e:
+                respuesta = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self._responder(respuesta)
+
+    def _responder(self, respuesta):
+        self.wfile.write(json.dumps(respuesta).encode() + b"\n")
+        self.wfile.flush()
+
+class InferenceServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio de inferencia compartido del asistente IA")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--lazy", action="store_true",
+                        help="no cargar el modelo hasta la primera petición")
+    args = parser.parse_args()
+
+    if not args.lazy:
+        print("⏳ Cargando modelo...")
+        ia_client.get_model()
+    with InferenceServer((args.host, args.port), Handler) as srv:
+        print(f"🤖 Servicio IA escuchando en {args.host}:{args.port} "
+              f"(export {ia_client.DAEMON_ENV}={args.host}:{args.port})")
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,104 @@
 import socket
+import struct
+import threading
+
+# Protocolo con tramas (ver server/protocol.py): tras MAGIC, cada mensaje
+# viaja como longitud de 4 bytes big-endian + cuerpo, y el servidor responde
+# a cada trama, en orden, con otra trama ACK/NACK.
+MAGIC = b'ARCF'
+HEADER = struct.Struct('!I')
+# Mayor que RESPONSE_TIMEOUT (server/network.py, 30 s): el servidor puede
+# tardar eso en contestar NACK y el cliente debe recibirlo, no cortar antes
+TIMEOUT = 35
 
 class Client:
-    def __init__(self, host='127.0.0.1', port=5000):
+    """
+    Cliente de resultados.
+
+    Con `framed=True` (por defecto) mantiene una conexión abierta y la reutiliza
+    en cada `send`; `send_many` encadena varios mensajes sin esperar cada ACK.
+    Con `framed=False` usa el modo antiguo: una conexión por mensaje.
+    """
+
+    def __init__(self, host='127.0.0.1', port=5000, framed=True, timeout=TIMEOUT):
         self.host = host
         self.port = port
+        self.framed = framed
+        self.timeout = timeout
+        self.sock = None
+        self.lock = threading.Lock()
+
+    def connect(self):
+        if self.sock is None:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            sock.sendall(MAGIC)
+            self.sock = sock
+        return self.sock
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            finally:
+                self.sock = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _recv_exact(self, n):
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = self.sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError('El servidor cerró la conexión')
+            buf.extend(chunk)
+        return bytes(buf)
+
+    def _exchange(self, bodies):
+        sock = self.connect()
+        sock.sendall(b''.join(HEADER.pack(len(b)) + b for b in bodies))
+        responses = []
+        for _ in bodies:
+            (length,) = HEADER.unpack(self._recv_exact(HEADER.size))
+            responses.append(self._recv_exact(length).decode())
+        return responses
+
+    def send_many(self, messages):
+        """
+        Envía varios mensajes por la conexión persistente y devuelve las
+        respuestas en el mismo orden. Si la conexión estaba caída (p. ej. el
+        servidor la cerró por inactividad) se reconecta una vez.
+        """
+        bodies = [m.encode() for m in messages]
+        if not self.framed:
+            return [self._send_legacy(b) for b in bodies]
+        with self.lock:
+            reused = self.sock is not None
+            try:
+                return self._exchange(bodies)
+            except ConnectionError:
+                self.close()
+                if not reused:
+                    raise
+            except OSError:
+                self.close()
+                raise
+            try:
+                return self._exchange(bodies)
+            except OSError:
+                self.close()
+                raise
 
     def send(self, message: str):
+        resp = self.send_many([message])[0]
+        print(f'✅ Respuesta del servidor: {resp}')
+        return resp
+
+    def _send_legacy(self, body):
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
             sock.connect((self.host, self.port))
-            sock.sendall(message.encode())
-            resp = sock.recv(1024)
-            print(f'✅ Respuesta del servidor: {resp.decode()}')
-
+            sock.sendall(body)
+            return sock.recv(1024).decode()
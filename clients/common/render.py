@@ -0,0 +1,94 @@
+"""
+Capa de dibujo incremental para las UIs de pygame.
+
+En lugar de repintar todo el tablero y hacer display.flip() 30 veces por
+segundo, cada UI:
+
+- pinta una sola vez lo estático (fondo, tablero, panel, botón) en una
+  superficie de fondo cacheada;
+- marca con invalidate() los rectángulos que cambian (una casilla, el panel
+  de ayuda...);
+- llama a draw(paint): se restaura el fondo solo en la zona sucia, se pintan
+  encima las piezas con el recorte activo y se envían a pantalla únicamente
+  esos rectángulos con display.update(rects);
+- obtiene los eventos con events(): si no hay nada pendiente de pintar, el
+  hilo duerme en pygame.event.wait() en vez de girar a 30 FPS.
+
+Los hilos auxiliares (p. ej. el que trae la pista de la IA) despiertan el
+bucle con request_redraw().
+"""
+import pygame
+
+# Evento propio para despertar al bucle desde otro hilo
+REDRAW = pygame.USEREVENT + 1
+
+def request_redraw():
+    """Pide al bucle de la UI que vuelva a pintar; seguro desde cualquier hilo."""
+    if pygame.display.get_init():
+        pygame.event.post(pygame.event.Event(REDRAW))
+
+def translucent(size, color, alpha):
+    """Superficie de color uniforme semitransparente (para reutilizar como overlay)."""
+    surf = pygame.Surface(size)
+    surf.set_alpha(alpha)
+    surf.fill(color)
+    return surf
+
+class DirtyRenderer:
+    """
+    Gestiona el fondo cacheado, los rectángulos sucios y la espera de eventos
+    de una ventana. `background` debe tener el tamaño de `screen`.
+    """
+
+    def __init__(self, screen, background, fps=30):
+        self.screen = screen
+        self.background = background
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+        self.dirty = [screen.get_rect()]
+
+    def set_background(self, background):
+        self.background = background
+        self.invalidate()
+
+    def invalidate(self, *rects):
+        """Marca rectángulos para repintar; sin argumentos, toda la ventana."""
+        if not rects:
+            self.dirty = [self.screen.get_rect()]
+            return
+        for rect in rects:
+            if rect is not None:
+                self.dirty.append(pygame.Rect(rect))
+
+    def events(self, timeout_ms=None):
+        """
+        Eventos pendientes. Si hay algo que pintar limita a `fps`; si no,
+        duerme hasta el próximo evento (o `timeout_ms`, para temporizadores).
+        """
+        if self.dirty:
+            self.clock.tick(self.fps)
+            return pygame.event.get()
+        if timeout_ms is None:
+            first = pygame.event.wait()
+        else:
+            first = pygame.event.wait(timeout_ms)
+        pending = pygame.event.get()
+        if first.type == pygame.NOEVENT:
+            return pending
+        return [first] + pending
+
+    def draw(self, paint):
+        """
+        Repinta la zona sucia: fondo cacheado + paint(screen) con el recorte
+        activo, y actualiza en pantalla solo los rectángulos marcados.
+        """
+        if not self.dirty:
+            return False
+        area = self.dirty[0].unionall(self.dirty[1:]).clip(self.screen.get_rect())
+        self.screen.set_clip(area)
+        self.screen.blit(self.background, area, area)
+        paint(self.screen)
+        self.screen.set_clip(None)
+        pygame.display.update(self.dirty)
+        self.dirty = []
+        return True
@@ -0,0 +1,98 @@
+"""
+Caché de maquetación y render de texto para las UIs de pygame.
+
+El texto de ayuda, el contador y las etiquetas cambian muy de vez en cuando,
+pero antes se partían en líneas (un font.size() por palabra) y se
+renderizaban en cada fotograma. TextCache memoriza:
+
+- las líneas de wrap_text por (texto, fuente, ancho);
+- las superficies de render_text por (texto, fuente, color, antialias);
+
+ambas con expulsión LRU. Las funciones de módulo usan una instancia compartida.
+"""
+from collections import OrderedDict
+
+class TextCache:
+    def __init__(self, max_layouts=128, max_surfaces=512):
+        self.max_layouts = max_layouts
+        self.max_surfaces = max_surfaces
+        self._layouts = OrderedDict()
+        self._surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, store, key):
+        value = store.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        store.move_to_end(key)
+        self.hits += 1
+        return value
+
+    @staticmethod
+    def _put(store, key, value, limit):
+        store[key] = value
+        while len(store) > limit:
+            store.popitem(last=False)
+        return value
+
+    def wrap(self, text, font, max_width):
+        """Líneas de `text` que caben en `max_width` píxeles con `font`."""
+        key = (text, font, max_width)
+        lines = self._get(self._layouts, key)
+        if lines is None:
+            lines = self._put(self._layouts, key, tuple(self._wrap(text, font, max_width)),
+                              self.max_layouts)
+        return lines
+
+    @staticmethod
+    def _wrap(text, font, max_width):
+        lines, current = [], ''
+        for w in text.split(' '):
+            test = f"{current} {w}".strip()
+            if font.size(test)[0] <= max_width:
+                current = test
+            else:
+                if current:
+                    lines.append(current)
+                current = w
+        if current:
+            lines.append(current)
+        return lines
+
+    def render(self, text, font, color, antialias=True):
+        """Superficie con `text` renderizado; la misma para llamadas repetidas."""
+        key = (text, font, tuple(color), antialias)
+        surf = self._get(self._surfaces, key)
+        if surf is None:
+            surf = self._put(self._surfaces, key, font.render(text, antialias, color),
+                             self.max_surfaces)
+        return surf
+
+    def clear(self):
+        self._layouts.clear()
+        self._surfaces.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'layouts': len(self._layouts),
+            'surfaces': len(self._surfaces),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+_cache = TextCache()
+
+def wrap_text(text, font, max_width):
+    """Líneas de `text` que caben en `max_width` píxeles (cacheadas)."""
+    return _cache.wrap(text, font, max_width)
+
+def render_text(text, font, color, antialias=True):
+    """font.render() cacheado."""
+    return _cache.render(text, font, color, antialias)
+
+def text_cache():
+    return _cache
@@ -0,0 +1,70 @@
+"""
+Motor de las Torres de Hanói sin interfaz gráfica.
+
+Cada varilla es una pila array('H') de discos de abajo a arriba (1 = el más
+pequeño). Misma API que los demás motores: apply(move) / undo() con
+move = (desde, hasta), legal_moves(), is_legal(move), movable(), solved,
+moves, hint_state() (los `pegs` que espera hints.sugerir) y result().
+"""
+from array import array
+from datetime import datetime
+
+class HanoiEngine:
+    __slots__ = ('n', 'pegs', 'moves', 'history')
+
+    def __init__(self, n):
+        self.n = n
+        self.pegs = (array('H', range(n, 0, -1)), array('H'), array('H'))
+        self.moves = 0
+        self.history = []
+
+    @property
+    def solved(self):
+        return len(self.pegs[2]) == self.n
+
+    def top(self, peg):
+        """Disco superior de `peg`, o None si está vacía."""
+        stack = self.pegs[peg]
+        return stack[-1] if stack else None
+
+    def is_legal(self, move):
+        frm, to = move
+        if self.solved or frm == to or not (0 <= frm < 3 and 0 <= to < 3) or not self.pegs[frm]:
+            return False
+        return not self.pegs[to] or self.pegs[frm][-1] < self.pegs[to][-1]
+
+    def legal_moves(self):
+        return [(frm, to) for frm in range(3) for to in range(3) if self.is_legal((frm, to))]
+
+    def movable(self):
+        """Varillas cuyo disco superior puede moverse a alguna otra."""
+        return sorted({frm for frm, _ in self.legal_moves()})
+
+    def apply(self, move):
+        if not self.is_legal(move):
+            raise ValueError(f'jugada ilegal: {move}')
+        frm, to = move
+        self.pegs[to].append(self.pegs[frm].pop())
+        self.moves += 1
+        self.history.append((frm, to))
+
+    def undo(self):
+        """Deshace el último movimiento y lo devuelve."""
+        if not self.history:
+            raise ValueError('no hay jugadas que deshacer')
+        frm, to = self.history.pop()
+        self.pegs[frm].append(self.pegs[to].pop())
+        self.moves -= 1
+        return frm, to
+
+    def hint_state(self):
+        return {"discos": self.n, "pegs": {i: list(p) for i, p in enumerate(self.pegs)}}
+
+    def result(self):
+        return {
+            'juego': 'hanoi',
+            'discos': self.n,
+            'movimientos': self.moves,
+            'resuelto': self.solved,
+            'timestamp': datetime.utcnow().isoformat()
+        }
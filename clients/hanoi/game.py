@@ -1,29 +1,43 @@
 #!/usr/bin/env python3
+import argparse
 import json
 from clients.common.network import Client
+from clients.hanoi.engine import HanoiEngine
+from clients.hanoi.solver import generar_movimientos, total_movimientos
 
 def hanoi(n, origen, destino, auxiliar, moves):
-    if n == 0:
-        return
-    hanoi(n-1, origen, auxiliar, destino, moves)
-    moves.append((origen, destino))
-    hanoi(n-1, auxiliar, destino, origen, moves)
+    """Añade a `moves` los 2^n - 1 movimientos óptimos (sin recursión)."""
+    moves.extend(generar_movimientos(n, origen, destino, auxiliar))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Torres de Hanói (solver automático)')
+    parser.add_argument('discos', type=int, nargs='?', help='número de discos (se pregunta si falta)')
+    parser.add_argument('--mostrar', action='store_true',
+                        help='imprime la secuencia de movimientos, generada al vuelo')
+    return parser.parse_args()
 
 def main():
-    n = int(input("▶️  ¿Cuántos discos? "))
-    moves = []
-    hanoi(n, 'A', 'C', 'B', moves)
-    total = len(moves)
+    args = parse_args()
+    n = args.discos if args.discos is not None else int(input("▶️  ¿Cuántos discos? "))
+    total = total_movimientos(n)
     print(f"🏁 Movimientos mínimos para {n} discos: {total}")
-    # Opcional: podrías reproducir la secuencia, aquí solo contamos.
-
-    payload = {
-        'juego': 'hanoi',
-        'discos': n,
-        'movimientos': total,
-        'resuelto': True
-    }
-    Client().send(json.dumps(payload))
+    if args.mostrar:
+        # Se juega la secuencia en el motor: cada movimiento queda validado
+        engine = HanoiEngine(n)
+        for i, (frm, to) in enumerate(generar_movimientos(n), start=1):
+            engine.apply((frm, to))
+            print(f"  {i}: {'ABC'[frm]} → {'ABC'[to]}")
+        payload = engine.result()
+    else:
+        # Sin listar no hace falta jugar los 2^n - 1 movimientos: forma cerrada
+        payload = {
+            'juego': 'hanoi',
+            'discos': n,
+            'movimientos': total,
+            'resuelto': True
+        }
+    with Client() as client:
+        client.send(json.dumps(payload))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,77 @@
+"""
+Motor de las Torres de Hanói sin recursión ni listas de movimientos.
+
+- total_movimientos(n): 2^n - 1, en forma cerrada.
+- movimiento(n, k): el k-ésimo movimiento de la solución óptima en O(1),
+  usando la representación binaria de k: mueve el disco (bits a cero al final
+  de k) + 1, de la varilla (k & (k-1)) % 3 a la ((k | (k-1)) + 1) % 3.
+- generar_movimientos(n): generador perezoso de la secuencia completa.
+- siguiente_movimiento(pegs): jugada óptima desde cualquier configuración legal,
+  con el mismo formato de `pegs` que la UI ({varilla: [discos de abajo a arriba]}).
+"""
+
+def total_movimientos(n):
+    return (1 << n) - 1
+
+def _etiquetas(n, origen, destino, auxiliar):
+    # Con la fórmula binaria la torre acaba en la varilla 2 si n es impar y
+    # en la 1 si es par: se reasignan las etiquetas para terminar en `destino`
+    if n % 2:
+        return origen, auxiliar, destino
+    return origen, destino, auxiliar
+
+def movimiento(n, k, origen=0, destino=2, auxiliar=1):
+    """
+    k-ésimo movimiento (1 <= k <= 2^n - 1) de la solución óptima.
+    Devuelve (disco, desde, hasta); el disco 1 es el más pequeño.
+    """
+    if not 1 <= k <= total_movimientos(n):
+        raise ValueError(f'k debe estar entre 1 y {total_movimientos(n)}')
+    varillas = _etiquetas(n, origen, destino, auxiliar)
+    disco = (k & -k).bit_length()
+    return disco, varillas[(k & (k - 1)) % 3], varillas[((k | (k - 1)) + 1) % 3]
+
+def generar_movimientos(n, origen=0, destino=2, auxiliar=1):
+    """Genera los 2^n - 1 movimientos (desde, hasta) sin guardarlos en memoria."""
+    varillas = _etiquetas(n, origen, destino, auxiliar)
+    for k in range(1, total_movimientos(n) + 1):
+        yield varillas[(k & (k - 1)) % 3], varillas[((k | (k - 1)) + 1) % 3]
+
+def _posiciones(pegs):
+    """{disco: varilla} a partir de {varilla: [discos]} (claves int o str, p. ej. tras JSON)."""
+    pos = {}
+    for varilla, discos in pegs.items():
+        for disco in discos:
+            pos[disco] = int(varilla)
+    return pos
+
+def _plan(pegs, destino):
+    """
+    Recorre los discos de mayor a menor manteniendo a qué varilla debe ir cada
+    uno. Devuelve (movimientos restantes, último disco fuera de sitio y su
+    (desde, hasta)), que es la jugada óptima.
+    """
+    pos = _posiciones(pegs)
+    objetivo = destino
+    restantes = 0
+    jugada = None
+    for disco in sorted(pos, reverse=True):
+        actual = pos[disco]
+        if actual == objetivo:
+            continue
+        # Este disco debe ir a `objetivo`; antes, todos los menores a la tercera varilla
+        restantes += 1 << (disco - 1)
+        jugada = (actual, objetivo)
+        objetivo = 3 - actual - objetivo
+    return restantes, jugada
+
+def siguiente_movimiento(pegs, destino=2):
+    """
+    Jugada óptima (desde, hasta) para llevar todos los discos a `destino` desde
+    la configuración `pegs`, o None si ya están allí.
+    """
+    return _plan(pegs, destino)[1]
+
+def movimientos_restantes(pegs, destino=2):
+    """Número mínimo de movimientos que faltan desde la configuración `pegs`."""
+    return _plan(pegs, destino)[0]
@@ -3,8 +3,7 @@ import sys
 import threading
 import json
 import os
-import re
-from datetime import datetime
+from functools import lru_cache
 
 # Path setup so we can import from project root
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -14,7 +13,10 @@ if PROJECT_ROOT not in sys.path:
 
 import pygame
 from clients.common.network import Client
-from clients.common.ia_client import solicitar_sugerencia
+from clients.common.hints import sugerir
+from clients.common.text import render_text, wrap_text
+from clients.common.render import REDRAW, DirtyRenderer, request_redraw, translucent
+from clients.hanoi.engine import HanoiEngine
 
 # Visual parameters
 SIZE = 500
@@ -27,56 +29,35 @@ help_text = ""
 suggested_rods = None    # tuple(origin_idx, dest_idx)
 movable_pegs = []        # list of peg indices whose top disk is movable
 
-def wrap_text(text, font, max_width):
-    """Split `text` into lines fitting within `max_width` pixels."""
-    words = text.split(' ')
-    lines, current = [], ''
-    for w in words:
-        test = (current + ' ' + w).strip()
-        if font.size(test)[0] <= max_width:
-            current = test
-        else:
-            lines.append(current)
-            current = w
-    if current:
-        lines.append(current)
-    return lines
-
-def send_result(discs, moves, completed):
-    payload = {
-        'juego': 'hanoi',
-        'discos': discs,
-        'movimientos': moves,
-        'resuelto': completed,
-        'timestamp': datetime.utcnow().isoformat()
-    }
+def send_result(payload):
     try:
-        Client().send(json.dumps(payload))
+        with Client() as client:
+            client.send(json.dumps(payload))
     except Exception as e:
         print(f"⚠️ Error sending result: {e}")
 
 def fetch_help(state):
     global help_text, suggested_rods
-    try:
-        suggestion = solicitar_sugerencia("hanoi", state)
-    except Exception as e:
-        suggestion = f"Error IA: {e}"
-    help_text = suggestion
-    # parse "(from, to)"
-    m = re.search(r"\(?\s*(\d+)\s*,\s*(\d+)\s*\)?", suggestion)
-    if m:
-        frm = int(m.group(1)) - 1
-        to  = int(m.group(2)) - 1
-        suggested_rods = (frm, to)
-    else:
-        suggested_rods = None
+    hint = sugerir("hanoi", state)
+    help_text = hint['texto']
+    suggested_rods = hint['movimiento']
+    request_redraw()
 
-def draw_pegs(screen, pegs):
+@lru_cache(maxsize=32)
+def movable_overlay(w, h):
+    return translucent((w, h), (0, 0, 255), 120)
+
+def draw_poles(screen):
     spacing = (SIZE - 2*MARGIN) // 2
-    # draw poles and disks
     for i in range(3):
         x = MARGIN + i * spacing
         pygame.draw.line(screen, (0,0,0), (x, MARGIN), (x, BASE_Y), 4)
+
+def draw_pegs(screen, pegs):
+    spacing = (SIZE - 2*MARGIN) // 2
+    # draw disks (the poles are part of the cached background)
+    for i in range(3):
+        x = MARGIN + i * spacing
         for depth, size in enumerate(pegs[i]):
             w, h = size * 18, 18
             rect = pygame.Rect(x - w//2,
@@ -95,10 +76,7 @@ def draw_pegs(screen, pegs):
             rect = pygame.Rect(x - w//2,
                                BASE_Y - (depth+1)*h,
                                w, h)
-            overlay = pygame.Surface((w, h))
-            overlay.set_alpha(120)
-            overlay.fill((0, 0, 255))
-            screen.blit(overlay, rect.topleft)
+            screen.blit(movable_overlay(w, h), rect.topleft)
     # highlight suggested move: origin green, dest yellow
     if suggested_rods:
         origin, dest = suggested_rods
@@ -123,11 +101,22 @@ def draw_pegs(screen, pegs):
                              w2, h2)
         pygame.draw.rect(screen, (255,255,0), rect_d, 3)
 
+def build_background(btn, font_h):
+    """Fondo estático: varillas, panel de ayuda y botón, pintados una sola vez."""
+    bg = pygame.Surface((SIZE, SIZE + INFO_HEIGHT))
+    bg.fill((255,255,255))
+    draw_poles(bg)
+    bg.blit(translucent((SIZE-20, INFO_HEIGHT), (240,240,240), 200), (10, SIZE))
+    pygame.draw.rect(bg, (70,130,180), btn)
+    bg.blit(font_h.render("IA Help", True, (255,255,255)), (btn.x+10, btn.y+5))
+    return bg
+
 def main():
     # initial state
     n = int(sys.argv[1]) if len(sys.argv) > 1 else 3
-    pegs = {0: list(range(n,0,-1)), 1: [], 2: []}
-    moves = 0
+    # game rules and state (pegs, moves) live in the engine
+    engine = HanoiEngine(n)
+    pegs = engine.pegs
     sel = None
     solved = False
     solved_time = 0
@@ -138,23 +127,44 @@ def main():
     movable_pegs = []
 
     btn = pygame.Rect(SIZE - 120, SIZE + INFO_HEIGHT - 50, 100, 25)
-    btn_color = (70,130,180)
 
     pygame.init()
     screen = pygame.display.set_mode((SIZE, SIZE + INFO_HEIGHT))
     pygame.display.set_caption("Towers of Hanoi")
     font = pygame.font.SysFont(None, 20)
     font_h = pygame.font.SysFont(None, 18)
-    clock = pygame.time.Clock()
+
+    play_rect = pygame.Rect(0, 0, SIZE, SIZE)
+    panel_rect = pygame.Rect(0, SIZE, SIZE, INFO_HEIGHT)
+    renderer = DirtyRenderer(screen, build_background(btn, font_h))
+
+    def paint(screen):
+        draw_pegs(screen, pegs)
+
+        # moves count and solved
+        screen.blit(render_text(f"Moves: {engine.moves}", font, (0,0,0)), (10,10))
+        if solved:
+            screen.blit(render_text("Completed!", font, (0,128,0)), (MARGIN, BASE_Y+5))
+
+        # draw IA help text with wrapping
+        lines = wrap_text(help_text, font_h, SIZE-40)
+        for i, line in enumerate(lines[:4]):
+            screen.blit(render_text(line, font_h, (0,0,0)), (15, SIZE+5 + i*18))
 
     while True:
-        for e in pygame.event.get():
+        # sleep until something happens; once solved, wake up to close the window
+        for e in renderer.events(100 if solved else None):
             if e.type == pygame.QUIT:
                 pygame.quit()
                 return
+            if e.type == REDRAW:
+                # a hint arrived: suggested rods and help text changed
+                renderer.invalidate(play_rect, panel_rect)
             if e.type == pygame.MOUSEBUTTONDOWN:
                 x,y = e.pos
                 # clear previous highlights
+                if suggested_rods or movable_pegs:
+                    renderer.invalidate(play_rect)
                 suggested_rods = None
                 movable_pegs = []
                 # regular move logic
@@ -165,60 +175,35 @@ def main():
                             if sel is None and pegs[i]:
                                 sel = i
                             elif sel is not None:
-                                if not pegs[i] or pegs[sel][-1] < pegs[i][-1]:
-                                    pegs[i].append(pegs[sel].pop())
-                                    moves += 1
+                                if engine.is_legal((sel, i)):
+                                    engine.apply((sel, i))
+                                    renderer.invalidate(play_rect)
                                 sel = None
                             break
-                    if len(pegs[2]) == n:
+                    if engine.solved:
                         solved = True
                         solved_time = pygame.time.get_ticks()
+                        renderer.invalidate(play_rect)
                         threading.Thread(
                             target=send_result,
-                            args=(n, moves, True),
+                            args=(engine.result(),),
                             daemon=True
                         ).start()
                 # IA help button
                 if btn.collidepoint(x,y):
                     help_text = "<waiting for IA>"
                     # compute movable pegs
-                    for i in range(3):
-                        if pegs[i]:
-                            top = pegs[i][-1]
-                            for j in range(3):
-                                if j != i and (not pegs[j] or top < pegs[j][-1]):
-                                    movable_pegs.append(i)
-                                    break
+                    movable_pegs = engine.movable()
+                    renderer.invalidate(play_rect, panel_rect)
                     # call IA
-                    state = {"discos": n, "pegs": pegs}
+                    state = engine.hint_state()
                     threading.Thread(target=lambda: fetch_help(state), daemon=True).start()
 
-        screen.fill((255,255,255))
-        draw_pegs(screen, pegs)
-
-        # moves count and solved
-        screen.blit(font.render(f"Moves: {moves}", True, (0,0,0)), (10,10))
-        if solved:
-            screen.blit(font.render("Completed!", True, (0,128,0)), (MARGIN, BASE_Y+5))
-            if pygame.time.get_ticks() - solved_time > 1500:
-                pygame.quit()
-                return
-
-        # draw IA button
-        pygame.draw.rect(screen, btn_color, btn)
-        screen.blit(font_h.render("IA Help", True, (255,255,255)), (btn.x+10, btn.y+5))
-
-        # draw IA help text box with wrapping
-        bg = pygame.Surface((SIZE-20, INFO_HEIGHT))
-        bg.set_alpha(200)
-        bg.fill((240,240,240))
-        screen.blit(bg, (10, SIZE))
-        lines = wrap_text(help_text, font_h, SIZE-40)
-        for i, line in enumerate(lines[:4]):
-            screen.blit(font_h.render(line, True, (0,0,0)), (15, SIZE+5 + i*18))
+        if solved and pygame.time.get_ticks() - solved_time > 1500:
+            pygame.quit()
+            return
 
-        pygame.display.flip()
-        clock.tick(30)
+        renderer.draw(paint)
 
 if __name__ == "__main__":
     main()
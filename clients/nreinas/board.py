@@ -0,0 +1,91 @@
+"""
+Estado incremental de un tablero de N-Reinas.
+
+Cada fila, columna, diagonal (r - c) y antidiagonal (r + c) guarda el conjunto
+de reinas que contiene. Poner o quitar una reina solo toca sus 4 líneas, así
+que "¿está resuelto?" es O(1) (N reinas y ninguna línea con dos) y el conjunto
+de reinas en conflicto se mantiene al día en cada jugada revisando únicamente
+las reinas de esas 4 líneas, sin comparar todos los pares.
+"""
+
+class QueensBoard:
+    __slots__ = ('N', 'queens', 'conflicts', '_lines', '_crowded')
+
+    def __init__(self, N, queens=()):
+        self.N = N
+        self.queens = set()
+        # Reinas atacadas por alguna otra
+        self.conflicts = set()
+        self._lines = (
+            [set() for _ in range(N)],          # filas
+            [set() for _ in range(N)],          # columnas
+            [set() for _ in range(2 * N - 1)],  # diagonales r - c + N - 1
+            [set() for _ in range(2 * N - 1)],  # antidiagonales r + c
+        )
+        # Líneas con dos o más reinas
+        self._crowded = 0
+        for r, c in queens:
+            self.place(r, c)
+
+    def _lines_of(self, r, c):
+        rows, cols, diag, anti = self._lines
+        return rows[r], cols[c], diag[r - c + self.N - 1], anti[r + c]
+
+    def attacks(self, r, c):
+        """Número de reinas que atacan a la de (r, c)."""
+        return sum(len(line) - 1 for line in self._lines_of(r, c))
+
+    def _refresh(self, lines):
+        # Solo pueden cambiar de estado las reinas de las líneas tocadas
+        for line in lines:
+            for q in line:
+                if self.attacks(*q):
+                    self.conflicts.add(q)
+                else:
+                    self.conflicts.discard(q)
+
+    def place(self, r, c):
+        if not (0 <= r < self.N and 0 <= c < self.N):
+            raise ValueError(f'casilla fuera del tablero: ({r}, {c})')
+        if (r, c) in self.queens:
+            raise ValueError(f'ya hay una reina en ({r}, {c})')
+        lines = self._lines_of(r, c)
+        for line in lines:
+            line.add((r, c))
+            if len(line) == 2:
+                self._crowded += 1
+        self.queens.add((r, c))
+        self._refresh(lines)
+
+    def remove(self, r, c):
+        if (r, c) not in self.queens:
+            raise ValueError(f'no hay reina en ({r}, {c})')
+        lines = self._lines_of(r, c)
+        for line in lines:
+            line.discard((r, c))
+            if len(line) == 1:
+                self._crowded -= 1
+        self.queens.discard((r, c))
+        self.conflicts.discard((r, c))
+        self._refresh(lines)
+
+    def toggle(self, r, c):
+        """Pone o quita la reina de (r, c). Devuelve True si ahora hay reina."""
+        if (r, c) in self.queens:
+            self.remove(r, c)
+            return False
+        self.place(r, c)
+        return True
+
+    def is_safe(self, r, c):
+        """True si una reina en (r, c) no atacaría a ninguna de las colocadas."""
+        return all(len(line) == ((r, c) in line) for line in self._lines_of(r, c))
+
+    def is_solved(self):
+        return len(self.queens) == self.N and self._crowded == 0
+
+    def __len__(self):
+        return len(self.queens)
+
+    def __contains__(self, square):
+        return square in self.queens
@@ -0,0 +1,93 @@
+"""
+Motor de N-Reinas sin interfaz gráfica.
+
+Las reglas vivían dentro del bucle de eventos de la UI. QueensEngine las
+reúne sobre el tablero incremental (board.QueensBoard) para poder jugar
+partidas sin pantalla (pruebas de carga, benchmarks, el CLI) con la misma
+API que los demás motores:
+
+- apply(move) / undo(): una jugada es (fila, columna) y pone o quita la reina;
+- legal_moves() / is_legal(move);
+- solved, steps, hint_state() (estado para hints.sugerir) y result()
+  (payload para el servidor).
+"""
+from datetime import datetime
+
+from clients.nreinas.board import QueensBoard
+
+class QueensEngine:
+    __slots__ = ('N', 'board', 'steps', 'history')
+
+    def __init__(self, N):
+        self.N = N
+        self.board = QueensBoard(N)
+        # Clics realizados (poner o quitar cuentan igual, como en la UI)
+        self.steps = 0
+        self.history = []
+
+    @property
+    def queens(self):
+        return self.board.queens
+
+    @property
+    def conflicts(self):
+        return self.board.conflicts
+
+    @property
+    def solved(self):
+        return self.board.is_solved()
+
+    def is_legal(self, move):
+        r, c = move
+        return not self.solved and 0 <= r < self.N and 0 <= c < self.N
+
+    def legal_moves(self, safe_only=False):
+        """
+        Casillas en las que se puede jugar. Por defecto todas (quitar una reina
+        o ponerla aunque quede atacada, como permite la UI); con safe_only,
+        solo las que añaden una reina sin conflicto.
+        """
+        if self.solved:
+            return
+        board = self.board
+        for r in range(self.N):
+            for c in range(self.N):
+                if not safe_only or ((r, c) not in board and board.is_safe(r, c)):
+                    yield r, c
+
+    def apply(self, move):
+        """Pone o quita la reina de `move`. Devuelve True si ahora hay reina."""
+        if not self.is_legal(move):
+            raise ValueError(f'jugada ilegal: {move}')
+        placed = self.board.toggle(*move)
+        self.steps += 1
+        self.history.append(tuple(move))
+        return placed
+
+    def undo(self):
+        """Deshace la última jugada y la devuelve."""
+        if not self.history:
+            raise ValueError('no hay jugadas que deshacer')
+        move = self.history.pop()
+        self.board.toggle(*move)
+        self.steps -= 1
+        return move
+
+    def hint_state(self):
+        # Reinas en orden de colocación (la última es la más reciente)
+        orden = {}
+        for move in self.history:
+            if move in orden:
+                del orden[move]
+            else:
+                orden[move] = None
+        return {"reinas": list(orden), "N": self.N}
+
+    def result(self):
+        return {
+            'juego': 'nreinas',
+            'N': self.N,
+            'resuelto': self.solved,
+            'pasos': self.steps,
+            'timestamp': datetime.utcnow().isoformat()
+        }
@@ -1,60 +1,76 @@
 #!/usr/bin/env python3
+import argparse
 import json
 from datetime import datetime
 from clients.common.network import Client
+from clients.nreinas.engine import QueensEngine
+from clients.nreinas.solver import primera_solucion, contar_soluciones, enumerar_soluciones
+from clients.nreinas.parallel import contar_soluciones_paralelo
 
 def solve_n_reinas(N):
     """
     Encuentra UNA solución al problema de N reinas y cuenta los intentos (pasos).
     Devuelve (resuelto:boolean, pasos:int).
     """
-    pasos = 0
-    col = set()
-    diag1 = set()
-    diag2 = set()
-    board = [-1] * N
-    encontrado = False
-
-    def backtrack(row):
-        nonlocal pasos, encontrado
-        if encontrado:
-            return
-        pasos += 1
-        if row == N:
-            encontrado = True
-            return
-        for c in range(N):
-            if c in col or (row - c) in diag1 or (row + c) in diag2:
-                continue
-            # Coloco reina
-            board[row] = c
-            col.add(c); diag1.add(row - c); diag2.add(row + c)
-            backtrack(row + 1)
-            if encontrado:
-                return
-            # Deshago
-            col.remove(c); diag1.remove(row - c); diag2.remove(row + c)
-
-    backtrack(0)
+    encontrado, pasos, tablero = primera_solucion(N)
+    if encontrado:
+        # El motor comprueba la solución colocando las reinas una a una
+        engine = QueensEngine(N)
+        for fila, columna in enumerate(tablero):
+            engine.apply((fila, columna))
+        encontrado = engine.solved
     return encontrado, pasos
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='N-Reinas (solver automático)')
+    parser.add_argument('N', type=int, nargs='?', help='tamaño del tablero (se pregunta si falta)')
+    parser.add_argument('--modo', choices=('primera', 'contar', 'enumerar'), default='primera',
+                        help='primera solución, contar todas o listarlas')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='procesos para el modo contar (0 = uno por CPU)')
+    return parser.parse_args()
+
 def main():
-    N = int(input("▶️  Introduce tamaño de tablero N: "))
+    args = parse_args()
+    N = args.N if args.N is not None else int(input("▶️  Introduce tamaño de tablero N: "))
     print(f"🔍 Resolviendo N‑Reinas para N={N}...")
-    resuelto, pasos = solve_n_reinas(N)
-    print(f"🏁 Resuelto: {resuelto} en {pasos} pasos")
 
     payload = {
         'juego': 'nreinas',
         'N': N,
-        'resuelto': resuelto,
-        'pasos': pasos,
         'timestamp': datetime.utcnow().isoformat()
     }
+    if args.modo == 'primera':
+        resuelto, pasos = solve_n_reinas(N)
+        print(f"🏁 Resuelto: {resuelto} en {pasos} pasos")
+    elif args.modo == 'contar':
+        if args.workers == 1:
+            soluciones, pasos = contar_soluciones(N)
+        else:
+            informe = contar_soluciones_paralelo(N, args.workers or None)
+            soluciones, pasos = informe['soluciones'], informe['pasos']
+            for pid, stats in sorted(informe['workers'].items()):
+                print(f"  worker {pid}: {stats['tareas']} subproblemas, {stats['segundos']:.2f} s")
+            print(f"  tiempo total: {informe['segundos']:.2f} s")
+        resuelto = soluciones > 0
+        payload['soluciones'] = soluciones
+        print(f"🏁 {soluciones} soluciones, {pasos} pasos (árbol completo)")
+    else:
+        soluciones = 0
+        stats = {}
+        for tablero in enumerar_soluciones(N, stats):
+            soluciones += 1
+            print(f"  {soluciones}: {[c + 1 for c in tablero]}")
+        resuelto = soluciones > 0
+        pasos = stats['pasos']
+        payload['soluciones'] = soluciones
+        print(f"🏁 {soluciones} soluciones")
+    payload['resuelto'] = resuelto
+    payload['pasos'] = pasos
 
     # Envía al servidor
-    client = Client()
-    client.send(json.dumps(payload))
+    with Client() as client:
+        client.send(json.dumps(payload))
 
 if __name__ == '__main__':
     main()
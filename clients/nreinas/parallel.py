@@ -0,0 +1,82 @@
+"""
+Conteo de soluciones de N-Reinas repartido en un pool de procesos.
+
+El árbol se corta en las dos primeras filas: cada par (columna fila 1,
+columna fila 2) compatible es un subproblema independiente que se cuenta con
+solver.explorar. Solo se generan las columnas de la fila 1 de la mitad
+izquierda (simetría especular) y cada subproblema lleva su peso.
+
+Los subproblemas se envían uno a uno al ProcessPoolExecutor, así que un worker
+que termina pronto toma el siguiente de la cola compartida: los subárboles
+grandes y pequeños se reparten solos sin tener que estimar su tamaño.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from clients.nreinas.solver import (
+    contar_soluciones, estado_tras, explorar, subproblemas_primera_fila
+)
+
+# Por debajo de este N el coste de arrancar procesos supera al de contar
+MIN_N_PARALELO = 8
+
+def generar_subproblemas(N):
+    """Lista de (c1, c2, peso, cols, ld, rd) con el estado tras las dos primeras filas."""
+    full = (1 << N) - 1
+    tareas = []
+    for c1, peso in subproblemas_primera_fila(N):
+        cols, ld, rd = estado_tras(N, 0, 0, 0, c1)
+        libres = full & ~(cols | ld | rd)
+        for c2 in range(N):
+            if libres >> c2 & 1:
+                tareas.append((c1, c2, peso) + estado_tras(N, cols, ld, rd, c2))
+    return tareas
+
+def _resolver(N, tarea):
+    c1, c2, peso, cols, ld, rd = tarea
+    inicio = time.perf_counter()
+    soluciones, nodos = explorar(N, 2, cols, ld, rd)
+    return c1, peso, soluciones, nodos, time.perf_counter() - inicio, os.getpid()
+
+def contar_soluciones_paralelo(N, workers=None):
+    """
+    Cuenta las soluciones de N-Reinas usando `workers` procesos (por defecto,
+    uno por CPU). Devuelve un dict con soluciones, pasos (misma semántica que
+    contar_soluciones), tiempo total y, por worker, tareas y segundos de CPU.
+    """
+    inicio = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if N < MIN_N_PARALELO or workers <= 1:
+        soluciones, pasos = contar_soluciones(N)
+        return {
+            'N': N,
+            'soluciones': soluciones,
+            'pasos': pasos,
+            'segundos': time.perf_counter() - inicio,
+            'workers': {},
+        }
+
+    tareas = generar_subproblemas(N)
+    soluciones = 0
+    # Raíz + un nodo por cada reina de la fila 1 (ponderada por simetría)
+    pasos = 1 + sum(peso for _, peso in subproblemas_primera_fila(N))
+    por_worker = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_resolver, N, tarea) for tarea in tareas]
+        for fut in as_completed(futures):
+            c1, peso, s, nodos, segundos, pid = fut.result()
+            soluciones += peso * s
+            pasos += peso * nodos
+            stats = por_worker.setdefault(pid, {'tareas': 0, 'segundos': 0.0})
+            stats['tareas'] += 1
+            stats['segundos'] += segundos
+
+    return {
+        'N': N,
+        'soluciones': soluciones,
+        'pasos': pasos,
+        'segundos': time.perf_counter() - inicio,
+        'workers': por_worker,
+    }
@@ -0,0 +1,251 @@
+"""
+Motor de N-Reinas con máscaras de bits.
+
+Columnas y diagonales ocupadas se guardan como enteros (bit c = columna c) y
+la búsqueda usa una pila explícita en lugar de recursión. Los "pasos" tienen
+la misma semántica que en solve_n_reinas: número de nodos visitados, es decir,
+llamadas a backtrack(row), incluido el nodo row == N de cada solución.
+
+Modos:
+  primera_solucion(N)    -> la misma primera solución y los mismos pasos que antes
+  contar_soluciones(N)   -> total de soluciones y nodos del árbol completo
+  enumerar_soluciones(N) -> generador de todas las soluciones
+  completar(N, reinas)   -> una solución que respeta las reinas ya colocadas
+
+En contar_soluciones y enumerar_soluciones se aprovecha la simetría especular:
+solo se exploran las reinas de la primera fila en la mitad izquierda y se
+duplica el resultado.
+"""
+
+def explorar(N, fila, cols, ld, rd):
+    """
+    Recorre completo el subárbol cuyo nodo raíz es backtrack(fila) con el
+    estado dado. Devuelve (soluciones, nodos), contando el propio nodo raíz.
+    """
+    if fila == N:
+        return 1, 1
+    full = (1 << N) - 1
+    libres = full & ~(cols | ld | rd)
+    if fila == N - 1:
+        k = bin(libres).count('1')
+        return k, 1 + k
+
+    soluciones = 0
+    nodos = 1
+    # Profundidad (relativa a `fila`) cuyos hijos están en la última fila
+    ultima = N - fila - 1
+    profundidad = 1
+    # Marcos pendientes del padre: (cols, ld, rd, columnas libres sin probar)
+    pila = []
+    push = pila.append
+    pop = pila.pop
+    while True:
+        if not libres:
+            if not pila:
+                break
+            cols, ld, rd, libres = pop()
+            profundidad -= 1
+            continue
+        bit = libres & -libres
+        libres ^= bit
+        nodos += 1
+        nc = cols | bit
+        nl = ((ld | bit) << 1) & full
+        nr = (rd | bit) >> 1
+        hijo = full & ~(nc | nl | nr)
+        if not hijo:
+            # Callejón sin salida: el nodo cuenta, pero no hay nada que apilar
+            continue
+        if profundidad == ultima:
+            # Cada columna libre de la última fila es una solución (un nodo más)
+            k = bin(hijo).count('1')
+            soluciones += k
+            nodos += k
+            continue
+        push((cols, ld, rd, libres))
+        cols, ld, rd, libres = nc, nl, nr, hijo
+        profundidad += 1
+    return soluciones, nodos
+
+def primera_solucion(N):
+    """
+    Busca la primera solución en el mismo orden que solve_n_reinas (columnas
+    de menor a mayor). Devuelve (encontrado, pasos, tablero) donde tablero[fila]
+    es la columna de la reina, o None si no hay solución.
+    """
+    if N == 0:
+        return True, 1, []
+    full = (1 << N) - 1
+    pasos = 1
+    tablero = [0] * N
+    pila = [(0, 0, 0, full)]
+    while pila:
+        cols, ld, rd, libres = pila[-1]
+        if not libres:
+            pila.pop()
+            continue
+        bit = libres & -libres
+        pila[-1] = (cols, ld, rd, libres ^ bit)
+        fila = len(pila) - 1
+        tablero[fila] = bit.bit_length() - 1
+        pasos += 1
+        if fila == N - 1:
+            return True, pasos, tablero
+        nc = cols | bit
+        nl = ((ld | bit) << 1) & full
+        nr = (rd | bit) >> 1
+        pila.append((nc, nl, nr, full & ~(nc | nl | nr)))
+    return False, pasos, None
+
+def subproblemas_primera_fila(N):
+    """
+    Reinas de la primera fila que hay que explorar con simetría especular:
+    lista de (columna, peso). Las de la mitad izquierda pesan 2 (cuentan
+    también su reflejo) y la central, si N es impar, pesa 1.
+    """
+    mitad = [(c, 2) for c in range(N // 2)]
+    if N % 2:
+        mitad.append((N // 2, 1))
+    return mitad
+
+def estado_tras(N, cols, ld, rd, c):
+    """Estado (cols, ld, rd) de la fila siguiente tras colocar una reina en `c`."""
+    full = (1 << N) - 1
+    bit = 1 << c
+    return cols | bit, ((ld | bit) << 1) & full, (rd | bit) >> 1
+
+def contar_soluciones(N):
+    """
+    Cuenta todas las soluciones. Devuelve (soluciones, pasos), donde pasos es
+    el número de nodos del árbol de búsqueda completo (igual que una búsqueda
+    exhaustiva sin simetría), aunque solo se recorra la mitad.
+    """
+    if N == 0:
+        return 1, 1
+    soluciones = 0
+    pasos = 1  # nodo raíz, backtrack(0)
+    for c, peso in subproblemas_primera_fila(N):
+        s, n = explorar(N, 1, *estado_tras(N, 0, 0, 0, c))
+        soluciones += peso * s
+        pasos += peso * n
+    return soluciones, pasos
+
+def _enumerar_desde(N, fila, cols, ld, rd, prefijo, stats, peso):
+    # Cada nodo (este y cada reina colocada) cuenta `peso` veces, como en explorar
+    stats['pasos'] += peso
+    if fila == N:
+        yield list(prefijo)
+        return
+    full = (1 << N) - 1
+    tablero = prefijo + [0] * (N - fila)
+    pila = [(cols, ld, rd, full & ~(cols | ld | rd))]
+    while pila:
+        cols, ld, rd, libres = pila[-1]
+        if not libres:
+            pila.pop()
+            continue
+        bit = libres & -libres
+        pila[-1] = (cols, ld, rd, libres ^ bit)
+        stats['pasos'] += peso
+        f = fila + len(pila) - 1
+        tablero[f] = bit.bit_length() - 1
+        if f == N - 1:
+            yield list(tablero)
+            continue
+        nc = cols | bit
+        nl = ((ld | bit) << 1) & full
+        nr = (rd | bit) >> 1
+        pila.append((nc, nl, nr, full & ~(nc | nl | nr)))
+
+def enumerar_soluciones(N, stats=None):
+    """
+    Genera todas las soluciones como listas tablero[fila] = columna.
+    Cada solución con la primera reina en la mitad izquierda se emite seguida
+    de su reflejo, así que el orden no es lexicográfico.
+    Si se pasa un dict `stats`, al agotar el generador stats['pasos'] tiene
+    los nodos del árbol completo, los mismos que devuelve contar_soluciones.
+    """
+    stats = {} if stats is None else stats
+    stats['pasos'] = 1  # nodo raíz
+    if N == 0:
+        yield []
+        return
+    for c, peso in subproblemas_primera_fila(N):
+        for tablero in _enumerar_desde(N, 1, *estado_tras(N, 0, 0, 0, c), [c], stats, peso):
+            yield tablero
+            if peso == 2:
+                yield [N - 1 - x for x in tablero]
+
+def completar(N, reinas, max_nodos=20000):
+    """
+    Completa un tablero con reinas ya colocadas (lista de (fila, columna)).
+    Devuelve tablero[fila] = columna con una solución que respeta esas reinas;
+    False si está demostrado que no hay ninguna (chocan entre sí o la búsqueda
+    se agota), y None si se acaba el presupuesto de `max_nodos` nodos sin saberlo.
+
+    En lugar de ir fila a fila, en cada paso se rellena la fila con menos
+    columnas libres y se prueban primero las columnas centrales; así se
+    completan tableros grandes (N=50, 100, 200) sin explorar el árbol entero.
+    """
+    full = (1 << N) - 1
+    tablero = [None] * N
+
+    def colocar(libres, r, c):
+        # Columnas libres de cada fila tras poner una reina en (r, c)
+        nuevo = list(libres)
+        for r2 in range(N):
+            d = r2 - r
+            m = 1 << c
+            if 0 <= c + d < N:
+                m |= 1 << (c + d)
+            if 0 <= c - d < N:
+                m |= 1 << (c - d)
+            nuevo[r2] &= ~m
+        nuevo[r] = 0
+        return nuevo
+
+    libres = [full] * N
+    for r, c in reinas:
+        if not (0 <= r < N and 0 <= c < N) or tablero[r] is not None or not libres[r] >> c & 1:
+            return False
+        tablero[r] = c
+        libres = colocar(libres, r, c)
+
+    pendientes = {r for r in range(N) if tablero[r] is None}
+    if not pendientes:
+        return tablero
+
+    def elegir(libres):
+        # Fila pendiente con menos columnas libres (MRV)
+        return min(pendientes, key=lambda r: bin(libres[r]).count('1'))
+
+    centro = (N - 1) / 2
+    orden = sorted(range(N), key=lambda c: abs(c - centro))
+    nodos = 0
+    r = elegir(libres)
+    pendientes.discard(r)
+    # Marcos: (columnas libres de cada fila, fila rellenada, candidatas sin probar)
+    pila = [(libres, r, libres[r])]
+    while pila:
+        libres, r, candidatas = pila[-1]
+        if not candidatas:
+            pila.pop()
+            tablero[r] = None
+            pendientes.add(r)
+            continue
+        if nodos >= max_nodos:
+            return None
+        nodos += 1
+        c = next(c for c in orden if candidatas >> c & 1)
+        pila[-1] = (libres, r, candidatas & ~(1 << c))
+        tablero[r] = c
+        nuevas = colocar(libres, r, c)
+        if not pendientes:
+            return tablero
+        r2 = elegir(nuevas)
+        if not nuevas[r2]:
+            tablero[r] = None
+            continue
+        pendientes.discard(r2)
+        pila.append((nuevas, r2, nuevas[r2]))
+    return False
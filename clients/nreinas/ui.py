@@ -3,8 +3,6 @@ import sys
 import threading
 import json
 import os
-import re
-from datetime import datetime
 
 # Path setup so we can import from project root
 THIS_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -14,7 +12,11 @@ if PROJECT_ROOT not in sys.path:
 
 import pygame
 from clients.common.network import Client
-from clients.common.ia_client import solicitar_sugerencia
+from clients.common.hints import sugerir
+from clients.common.text import render_text, wrap_text
+from clients.common.render import REDRAW, DirtyRenderer, request_redraw, translucent
+from clients.common.boardview import BoardView
+from clients.nreinas.engine import QueensEngine
 
 # Visual parameters
 SIZE = 500
@@ -24,77 +26,35 @@ MARGIN = 40
 # Globals for IA help
 help_text = ""
 suggested_move = None
-conflicts = set()
-
-def wrap_text(text, font, max_width):
-    """Split `text` into lines that fit within `max_width` pixels."""
-    words = text.split(' ')
-    lines, current = [], ''
-    for w in words:
-        test = f"{current} {w}".strip()
-        if font.size(test)[0] <= max_width:
-            current = test
-        else:
-            lines.append(current)
-            current = w
-    if current:
-        lines.append(current)
-    return lines
-
-def send_result(N, solved, steps):
-    payload = {
-        'juego': 'nreinas',
-        'N': N,
-        'resuelto': solved,
-        'pasos': steps,
-        'timestamp': datetime.utcnow().isoformat()
-    }
+
+def send_result(payload):
     try:
-        Client().send(json.dumps(payload))
+        with Client() as client:
+            client.send(json.dumps(payload))
     except Exception as e:
         print(f"⚠️ Error sending result: {e}")
 
 def fetch_help(state):
-    global help_text, suggested_move, conflicts
-    try:
-        suggestion = solicitar_sugerencia("nreinas", state)
-    except Exception as e:
-        suggestion = f"Error IA: {e}"
-    help_text = suggestion
-
-    # parse suggested move "(r, c)"
-    m = re.search(r"\(?\s*(\d+)\s*,\s*(\d+)\s*\)?", suggestion)
-    if m:
-        suggested_move = (int(m.group(1)) - 1, int(m.group(2)) - 1)
-    else:
-        suggested_move = None
-
-    # detect conflicts among queens
-    queens = {tuple(q) for q in state.get('reinas', [])}
-    cset = set()
-    for (r1, c1) in queens:
-        for (r2, c2) in queens:
-            if (r1, c1) != (r2, c2):
-                if r1 == r2 or c1 == c2 or abs(r1 - r2) == abs(c1 - c2):
-                    cset.add((r1, c1))
-                    cset.add((r2, c2))
-    conflicts = cset
-
-def check_solution(queens, N):
-    if len(queens) != N:
-        return False
-    for (r1, c1) in queens:
-        for (r2, c2) in queens:
-            if (r1, c1) != (r2, c2):
-                if r1 == r2 or c1 == c2 or abs(r1 - r2) == abs(c1 - c2):
-                    return False
-    return True
+    global help_text, suggested_move
+    hint = sugerir("nreinas", state)
+    help_text = hint['texto']
+    suggested_move = hint['movimiento']
+    request_redraw()
+
+def build_background(view, btn, font_h):
+    """Fondo estático: tablero visible, panel de ayuda y botón; se rehace al hacer zoom/pan."""
+    bg = pygame.Surface((SIZE, SIZE + INFO_HEIGHT))
+    bg.fill((255, 255, 255))
+    view.draw_board(bg)
+    bg.blit(translucent((SIZE-20, INFO_HEIGHT), (240, 240, 240), 200), (10, SIZE))
+    pygame.draw.rect(bg, (70, 130, 180), btn)
+    bg.blit(font_h.render("IA Help", True, (255, 255, 255)), (btn.x+10, btn.y+5))
+    return bg
 
 def main():
     # read N from command line
     N = int(sys.argv[1]) if len(sys.argv) > 1 else 8
     BOARD = SIZE - 2 * MARGIN
-    CELL = BOARD // N
 
     pygame.init()
     screen = pygame.display.set_mode((SIZE, SIZE + INFO_HEIGHT))
@@ -102,96 +62,87 @@ def main():
     font = pygame.font.SysFont(None, 20)
     font_h = pygame.font.SysFont(None, 18)
 
-    queens = set()
-    steps = 0
+    # game rules and state (queens, live conflicts, steps) live in the engine
+    engine = QueensEngine(N)
     solved = False
     solved_time = 0
 
-    global help_text, suggested_move, conflicts
+    global help_text, suggested_move
     help_text = "<waiting for IA>"
     suggested_move = None
-    conflicts = set()
 
     btn = pygame.Rect(SIZE - 120, SIZE + INFO_HEIGHT - 50, 100, 25)
-    btn_color = (70, 130, 180)
-    clock = pygame.time.Clock()
+    # zoomable viewport: wheel / +- to zoom, right or middle drag / arrows to pan
+    view = BoardView(N, (MARGIN, MARGIN, BOARD, BOARD), (200, 200, 200), (100, 100, 100))
+    panel_rect = pygame.Rect(0, SIZE, SIZE, INFO_HEIGHT)
+    renderer = DirtyRenderer(screen, build_background(view, btn, font_h))
+
+    def paint(screen):
+        # draw queens: red if in conflict, else blue (only the visible ones)
+        view.draw_pieces(screen, engine.queens - engine.conflicts, (0, 0, 255))
+        view.draw_pieces(screen, engine.conflicts, (255, 0, 0))
+        # highlight IA suggestion
+        if suggested_move:
+            view.outline(screen, *suggested_move, (0, 255, 0))
+
+        # draw step count and solved message
+        screen.blit(render_text(f"Steps: {engine.steps}", font, (0, 0, 0)), (10, SIZE))
+        if solved:
+            screen.blit(render_text("Solved!", font, (0, 128, 0)), (MARGIN, SIZE+5))
+
+        # draw IA help text with wrapping
+        lines = wrap_text(help_text, font_h, SIZE-40)
+        for i, line in enumerate(lines[:4]):
+            screen.blit(render_text(line, font_h, (0, 0, 0)), (15, SIZE+5 + i*18))
 
     while True:
-        for e in pygame.event.get():
+        # sleep until something happens; once solved, wake up to close the window
+        for e in renderer.events(100 if solved else None):
             if e.type == pygame.QUIT:
                 pygame.quit()
                 return
-            if e.type == pygame.MOUSEBUTTONDOWN and not solved:
+            if e.type == REDRAW:
+                # a hint arrived: suggestion and help text changed
+                if suggested_move and view.center_on(*suggested_move):
+                    renderer.set_background(build_background(view, btn, font_h))
+                renderer.invalidate(view.viewport, panel_rect)
+            if view.handle_event(e):
+                renderer.set_background(build_background(view, btn, font_h))
+            # wheel events also arrive as buttons 4/5: only the left button plays
+            if e.type == pygame.MOUSEBUTTONDOWN and e.button == 1 and not solved:
                 x, y = e.pos
-                # clear previous conflicts
-                conflicts = set()
                 # click on board
-                if MARGIN <= x < MARGIN + CELL * N and MARGIN <= y < MARGIN + CELL * N:
-                    c = (x - MARGIN) // CELL
-                    r = (y - MARGIN) // CELL
-                    if (r, c) in queens:
-                        queens.remove((r, c))
-                    else:
-                        queens.add((r, c))
-                    steps += 1
-                    if check_solution(queens, N):
+                cell = view.cell_at((x, y))
+                if cell:
+                    r, c = cell
+                    before = set(engine.conflicts)
+                    engine.apply((r, c))
+                    # repaint the cell and every visible queen whose conflict state changed
+                    renderer.invalidate(view.dirty_rect(r, c), panel_rect,
+                                        *(view.dirty_rect(*q) for q in before ^ engine.conflicts))
+                    if engine.solved:
                         solved = True
                         solved_time = pygame.time.get_ticks()
                         threading.Thread(
                             target=send_result,
-                            args=(N, True, steps),
+                            args=(engine.result(),),
                             daemon=True
                         ).start()
                 # click on IA help button
                 if btn.collidepoint(x, y):
                     help_text = "<waiting for IA>"
+                    if suggested_move:
+                        renderer.invalidate(view.dirty_rect(*suggested_move))
                     suggested_move = None
-                    state = {"reinas": list(queens), "N": N}
+                    renderer.invalidate(panel_rect)
+                    state = engine.hint_state()
                     threading.Thread(target=lambda: fetch_help(state), daemon=True).start()
 
-        # draw board
-        screen.fill((255, 255, 255))
-        for r in range(N):
-            for c in range(N):
-                col = (200, 200, 200) if (r + c) % 2 == 0 else (100, 100, 100)
-                pygame.draw.rect(screen, col, (MARGIN + c*CELL, MARGIN + r*CELL, CELL, CELL))
-        # draw queens
-        for (r, c) in queens:
-            center = (MARGIN + c*CELL + CELL//2, MARGIN + r*CELL + CELL//2)
-            # red if in conflict, else blue
-            color = (255, 0, 0) if (r, c) in conflicts else (0, 0, 255)
-            pygame.draw.circle(screen, color, center, CELL//3)
-        # highlight IA suggestion
-        if suggested_move:
-            r, c = suggested_move
-            pygame.draw.rect(
-                screen, (0, 255, 0),
-                (MARGIN + c*CELL, MARGIN + r*CELL, CELL, CELL), 3
-            )
-
-        # draw step count and solved message
-        screen.blit(font.render(f"Steps: {steps}", True, (0, 0, 0)), (10, SIZE))
-        if solved:
-            screen.blit(font.render("Solved!", True, (0, 128, 0)), (MARGIN, SIZE+5))
-            if pygame.time.get_ticks() - solved_time > 1500:
-                pygame.quit()
-                return
-
-        # draw IA button
-        pygame.draw.rect(screen, btn_color, btn)
-        screen.blit(font_h.render("IA Help", True, (255, 255, 255)), (btn.x+10, btn.y+5))
-
-        # draw IA help text box with wrapping
-        bg = pygame.Surface((SIZE-20, INFO_HEIGHT))
-        bg.set_alpha(200)
-        bg.fill((240, 240, 240))
-        screen.blit(bg, (10, SIZE))
-        lines = wrap_text(help_text, font_h, SIZE-40)
-        for i, line in enumerate(lines[:4]):
-            screen.blit(font_h.render(line, True, (0, 0, 0)), (15, SIZE+5 + i*18))
+        if solved and pygame.time.get_ticks() - solved_time > 1500:
+            pygame.quit()
+            return
 
-        pygame.display.flip()
-        clock.tick(30)
+        renderer.draw(paint)
 
 if __name__ == "__main__":
     main()
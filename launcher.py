@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import os
 import sys
 import subprocess
 import sqlite3
@@ -10,49 +11,101 @@ def launch_game(module, arg=None):
     subprocess.Popen(cmd)
 
 
-def view_results():
-    db_path = "server/resultados.db"
-    try:
-        conn = sqlite3.connect(db_path)
-    except sqlite3.Error as e:
-        print(f"⚠️ No se pudo abrir la BD: {e}")
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.environ.get("ARCADE_DB_PATH") or os.path.join(PROJECT_ROOT, "server", "resultados.db")
+PAGE_SIZE = 50
+GAME_TABLES = {"1": "reinas_results", "2": "caballo_results", "3": "hanoi_results"}
+GAME_NAMES = {"1": "nreinas", "2": "caballo", "3": "hanoi"}
+
+
+def print_table_paged(cursor, table):
+    """Muestra la tabla por páginas (paginación por id), sin fetchall()."""
+    last_id = 0
+    header_done = False
+    while True:
+        cursor.execute(
+            f"SELECT * FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, PAGE_SIZE)
+        )
+        rows = cursor.fetchmany(PAGE_SIZE)
+        if not header_done:
+            print(" | ".join(desc[0] for desc in cursor.description))
+            header_done = True
+        if not rows:
+            return
+        for row in rows:
+            # Columnas largas (p. ej. el recorrido del caballo) se recortan
+            print(" | ".join(str(x) if len(str(x)) <= 40 else str(x)[:37] + "..." for x in row))
+        last_id = rows[-1][0]
+        if len(rows) < PAGE_SIZE:
+            return
+        if input("  -- Enter para más, 'q' para salir -- ").strip().lower() == "q":
+            return
+
+
+def view_stats():
+    # server/ usa imports planos (from db import ...), así que lo añadimos al path
+    server_dir = os.path.join(PROJECT_ROOT, "server")
+    if server_dir not in sys.path:
+        sys.path.insert(0, server_dir)
+    os.environ.setdefault("ARCADE_DB_PATH", DB_PATH)
+    import stats
+
+    print("\n¿De qué juego?")
+    print("1) N-Reinas")
+    print("2) Knight’s Tour")
+    print("3) Torres de Hanói")
+    juego = GAME_NAMES.get(input("Selecciona [1-3]: ").strip())
+    if juego is None:
+        print("Opción no válida.")
         return
-    cursor = conn.cursor()
 
+    print(f"\n--- Resumen por parámetro ({juego}) ---")
+    stats.print_rows(stats.summary_by_param(juego))
+    print(f"\n--- Top 10 ({juego}) ---")
+    stats.print_rows(stats.leaderboard(juego))
+    print(f"\n--- Tasa de resolución diaria ({juego}) ---")
+    stats.print_rows(stats.summary_series(juego, periodo="day"))
+
+
+def view_results():
     print("\n¿Qué resultados quieres ver?")
     print("1) N-Reinas")
     print("2) Knight’s Tour")
     print("3) Torres de Hanói")
     print("4) Todos")
-    sel = input("Selecciona [1-4]: ").strip()
-
-    if sel == "1":
-        tables = ["reinas_results"]
-    elif sel == "2":
-        tables = ["caballo_results"]
-    elif sel == "3":
-        tables = ["hanoi_results"]
+    print("5) Estadísticas")
+    sel = input("Selecciona [1-5]: ").strip()
+
+    if sel in GAME_TABLES:
+        tables = [GAME_TABLES[sel]]
     elif sel == "4":
-        tables = ["reinas_results", "caballo_results", "hanoi_results"]
+        tables = list(GAME_TABLES.values())
+    elif sel == "5":
+        try:
+            view_stats()
+        except Exception as e:
+            print(f"⚠️ Error consultando estadísticas: {e}")
+        return
     else:
         print("Opción no válida.")
-        conn.close()
         return
 
+    try:
+        conn = sqlite3.connect(DB_PATH)
+    except sqlite3.Error as e:
+        print(f"⚠️ No se pudo abrir la BD: {e}")
+        return
+    cursor = conn.cursor()
+
     for t in tables:
         print(f"\n--- {t} ---")
         try:
-            cursor.execute(f"SELECT * FROM {t}")
-            cols = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
+            print_table_paged(cursor, t)
         except sqlite3.Error as e:
             print(f"⚠️ Error consultando {t}: {e}")
             continue
 
-        print(" | ".join(cols))
-        for row in rows:
-            print(" | ".join(str(x) for x in row))
-
     conn.close()
 
 def main():
@@ -71,8 +124,9 @@ def main():
             launch_game("clients.nreinas.ui", n)
 
         elif choice == "2":
+            n = input("  Introduce N (por defecto 8): ").strip() or "8"
             print("  - Selecciona la casilla inicial en la ventana")
-            launch_game("clients.caballo.ui")
+            launch_game("clients.caballo.ui", n)
 
         elif choice == "3":
             d = input("  ¿Cuántos discos? (por defecto 3): ").strip() or "3"
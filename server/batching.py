@@ -0,0 +1,77 @@
+"""
+Bucle de agrupación en lotes compartido por la ingesta del servidor
+(ingest.IngestQueue) y la cola de inferencia de los clientes
+(clients.common.ia_batch.InferenceQueue).
+
+Solo usa la biblioteca estándar para poder importarse igual desde server/
+(`from batching import BatchQueue`) que desde la raíz del proyecto
+(`from server.batching import BatchQueue`).
+"""
+import queue
+import threading
+import time
+
+class BatchQueue:
+    """
+    Un único hilo consume la cola: toma el primer elemento, espera hasta
+    `max_delay` segundos a que lleguen más (como mucho `max_batch`) y llama a
+    `process(batch)` con la lista. Al parar, lo que quede en la cola se
+    procesa en lotes de `max_batch` antes de terminar el hilo.
+
+    `process` no debe lanzar excepciones: si lo hace, el hilo muere y los
+    elementos siguientes no se atienden.
+    """
+
+    _STOP = object()
+
+    def __init__(self, process, max_batch, max_delay, name):
+        self.process = process
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Atiende lo pendiente y detiene el hilo."""
+        self.queue.put(self._STOP)
+        self.thread.join()
+
+    def put(self, item):
+        self.queue.put(item)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is self._STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self.process(batch)
+
+        rest = []
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not self._STOP:
+                rest.append(item)
+        for i in range(0, len(rest), self.max_batch):
+            self.process(rest[i:i + self.max_batch])
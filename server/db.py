@@ -1,15 +1,149 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 from models import Base
 
-# Crea (o abre) resultados.db en el directorio actual
-engine = create_engine('sqlite:///resultados.db', echo=False)
-SessionLocal = sessionmaker(bind=engine)
+# Por defecto la BD vive junto a este fichero (server/resultados.db), sea cual
+# sea el directorio desde el que se arranque. Se puede cambiar con la variable
+# de entorno ARCADE_DB_PATH o con configure_engine(path=...).
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados.db')
+
+# Perfiles de ajuste de SQLite. Los PRAGMA se aplican a cada conexión nueva.
+#   wal      -> WAL + synchronous FULL: lectores y escritor no se bloquean y
+#               cada commit sigue siendo durable (el ACK implica fsync).
+#   wal-fast -> WAL + synchronous NORMAL: commits más baratos; ante un corte
+#               de luz se pueden perder las últimas transacciones.
+#   legacy   -> sin PRAGMA (journal por defecto), como antes.
+PROFILES = {
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,         # ms esperando el lock antes de "database is locked"
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,         # negativo = KiB (≈64 MB)
+        'pool_size': 8,
+        'max_overflow': 8,
+    },
+    'wal-fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64000,
+        'pool_size': 8,
+        'max_overflow': 8,
+    },
+    'legacy': {
+        'journal_mode': None,
+        'synchronous': None,
+        'busy_timeout': 5000,
+        'mmap_size': None,
+        'cache_size': None,
+        'pool_size': 5,
+        'max_overflow': 10,
+    },
+}
+DEFAULT_PROFILE = 'wal'
+
+PRAGMAS = ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size')
+
+engine = None
+SessionLocal = sessionmaker()
+
+def build_engine(path, profile=DEFAULT_PROFILE, **overrides):
+    """
+    Crea un engine SQLite para `path` con el perfil indicado.
+    `overrides` permite cambiar cualquier clave del perfil (p. ej. synchronous='OFF').
+    """
+    if profile not in PROFILES:
+        raise ValueError(f'Perfil de BD desconocido: {profile} (opciones: {", ".join(PROFILES)})')
+    settings = dict(PROFILES[profile], **overrides)
+
+    new_engine = create_engine(
+        f'sqlite:///{path}',
+        echo=False,
+        poolclass=QueuePool,
+        pool_size=settings['pool_size'],
+        max_overflow=settings['max_overflow'],
+        pool_pre_ping=True,
+        # Las conexiones del pool se comparten entre hilos del servidor
+        connect_args={
+            'check_same_thread': False,
+            'timeout': settings['busy_timeout'] / 1000,
+        },
+    )
+
+    @event.listens_for(new_engine, 'connect')
+    def apply_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name in PRAGMAS:
+            value = settings[name]
+            if value is not None:
+                cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    return new_engine
+
+def configure_engine(path=None, profile=None, **overrides):
+    """
+    (Re)configura el engine global y SessionLocal.
+    Sin argumentos usa ARCADE_DB_PATH / ARCADE_DB_PROFILE o los valores por defecto.
+    """
+    global engine
+    path = path or os.environ.get('ARCADE_DB_PATH') or DEFAULT_DB_PATH
+    profile = profile or os.environ.get('ARCADE_DB_PROFILE') or DEFAULT_PROFILE
+
+    if engine is not None:
+        engine.dispose()
+    engine = build_engine(path, profile, **overrides)
+    SessionLocal.configure(bind=engine)
+    return engine
+
+def get_engine():
+    return engine
+
+def _add_missing_columns():
+    """
+    Añade a las tablas existentes las columnas nuevas (siempre opcionales)
+    que se hayan definido en models.py después de crearlas.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col['name'] for col in inspector.get_columns(table.name)}
+            for col in table.columns:
+                if col.name not in existing and col.nullable:
+                    col_type = col.type.compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}')
+
+def _caballo_rollups_antiguos():
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT 1 FROM result_rollups WHERE juego = 'caballo' AND parametro NOT LIKE '%:%' LIMIT 1"
+        )).first() is not None
 
 def init_db():
     """
     Crea las tablas definidas en models.py si no existen.
     Llamar al arrancar el servidor para inicializar la BD.
     """
+    had_rollups = inspect(engine).has_table('result_rollups')
+    _add_missing_columns()
     Base.metadata.create_all(bind=engine)
+    # create_all no añade índices nuevos a tablas que ya existían
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+    # Primera vez con rollups sobre una BD que ya tenía resultados, o rollups
+    # de caballo del formato anterior (solo la casilla, sin el tablero)
+    if not had_rollups or _caballo_rollups_antiguos():
+        from rollups import rebuild_rollups
+        with SessionLocal() as sess:
+            rebuild_rollups(sess)
+            sess.commit()
 
+configure_engine()
@@ -0,0 +1,161 @@
+import datetime
+import json
+from concurrent.futures import Future
+
+from batching import BatchQueue
+from db import SessionLocal
+from models import ReinasResult, CaballoResult, HanoiResult
+from rollups import apply_rollups
+
+def build_result(payload):
+    """
+    Convierte el payload recibido en la fila ORM correspondiente.
+    Devuelve (resultado, descripción) o (None, None) si el juego no está soportado.
+    """
+    juego = payload.get('juego')
+    # Marca de tiempo explícita para que la fila y su rollup caigan en el mismo intervalo
+    ahora = datetime.datetime.utcnow()
+
+    if juego == 'nreinas':
+        resultado = ReinasResult(
+            N=payload['N'],
+            resuelto=payload['resuelto'],
+            pasos=payload['pasos'],
+            timestamp=ahora
+        )
+        return resultado, f'N‑Reinas: N={payload["N"]}, pasos={payload["pasos"]}'
+
+    if juego == 'caballo':
+        resultado = CaballoResult(
+            N=payload.get('N'),
+            inicio=payload['inicio'],
+            movimientos=payload['movimientos'],
+            completado=payload['completado'],
+            recorrido=json.dumps(payload['recorrido']) if payload.get('recorrido') else None,
+            timestamp=ahora
+        )
+        return resultado, f'Knight’s Tour: inicio={payload["inicio"]}, movimientos={payload["movimientos"]}'
+
+    if juego == 'hanoi':
+        resultado = HanoiResult(
+            discos=payload['discos'],
+            movimientos=payload['movimientos'],
+            resuelto=payload['resuelto'],
+            timestamp=ahora
+        )
+        return resultado, f'Hanói: discos={payload["discos"]}, movimientos={payload["movimientos"]}, resuelto={payload["resuelto"]}'
+
+    return None, None
+
+def store_result(payload):
+    """
+    Guarda un resultado en su propia transacción.
+    Devuelve b'ACK' si se guardó y b'NACK' si el juego no está soportado.
+    """
+    resultado, descripcion = build_result(payload)
+    if resultado is None:
+        print(f'ℹ️ Juego no soportado: {payload.get("juego")}')
+        return b'NACK'
+
+    sess = SessionLocal()
+    try:
+        sess.add(resultado)
+        apply_rollups(sess, [resultado])
+        sess.commit()
+    finally:
+        sess.close()
+    print(f'✅ Guardado {descripcion}')
+    return b'ACK'
+
+def resolved(value):
+    """Future ya resuelto con `value`."""
+    fut = Future()
+    fut.set_result(value)
+    return fut
+
+class IngestQueue(BatchQueue):
+    """
+    Cola de ingesta con commit agrupado.
+
+    Los resultados se acumulan y un único hilo escritor los guarda en lotes:
+    una transacción (y un fsync) por lote en lugar de uno por resultado.
+    Un lote se escribe al llegar a `batch_size` elementos o cuando han pasado
+    `max_delay` segundos desde que entró el primero. El Future de cada
+    resultado se resuelve con b'ACK' solo después del commit.
+    """
+
+    def __init__(self, batch_size=100, max_delay=0.02):
+        super().__init__(self._flush_safe, batch_size, max_delay, name='ingest')
+        self.batch_size = batch_size
+        self.batches = 0
+        self.rows = 0
+
+    def submit(self, payload):
+        """
+        Encola un resultado y devuelve un Future con la respuesta (ACK/NACK).
+        Los payloads no soportados o incompletos se rechazan sin esperar al lote.
+        """
+        try:
+            resultado, descripcion = build_result(payload)
+        except (KeyError, TypeError) as e:
+            print(f'⚠️ Payload incompleto: {e}')
+            return resolved(b'NACK')
+        if resultado is None:
+            print(f'ℹ️ Juego no soportado: {payload.get("juego")}')
+            return resolved(b'NACK')
+
+        fut = Future()
+        self.put((resultado, descripcion, fut))
+        return fut
+
+    def _flush_safe(self, batch):
+        """
+        _flush sin dejar escapar excepciones: si algo falla fuera del manejo
+        por fila (rollback, close, apply_rollups en el reintento...), los
+        resultados aún pendientes se rechazan con NACK y el hilo escritor
+        sigue vivo para los lotes siguientes.
+        """
+        try:
+            self._flush(batch)
+        except Exception as e:
+            print(f'⚠️ Error inesperado guardando lote de {len(batch)}: {e}')
+            for _, _, fut in batch:
+                if not fut.done():
+                    fut.set_result(b'NACK')
+
+    def _flush(self, batch):
+        sess = SessionLocal()
+        try:
+            resultados = [resultado for resultado, _, _ in batch]
+            sess.bulk_save_objects(resultados)
+            apply_rollups(sess, resultados)
+            sess.commit()
+        except Exception as e:
+            sess.rollback()
+            print(f'⚠️ Error guardando lote de {len(batch)}: {e}; se reintenta fila a fila')
+            self._flush_one_by_one(sess, batch)
+            return
+        finally:
+            sess.close()
+
+        self.batches += 1
+        self.rows += len(batch)
+        print(f'✅ Guardado lote de {len(batch)} resultados')
+        for _, _, fut in batch:
+            fut.set_result(b'ACK')
+
+    def _flush_one_by_one(self, sess, batch):
+        # Aísla las filas problemáticas para no rechazar el lote entero
+        for resultado, descripcion, fut in batch:
+            try:
+                sess.add(resultado)
+                apply_rollups(sess, [resultado])
+                sess.commit()
+            except Exception as e:
+                sess.rollback()
+                print(f'⚠️ Error guardando {descripcion}: {e}')
+                fut.set_result(b'NACK')
+            else:
+                self.rows += 1
+                print(f'✅ Guardado {descripcion}')
+                fut.set_result(b'ACK')
@@ -1,8 +1,45 @@
-from network import Server
+import argparse
+
+from db import PROFILES, configure_engine
+from ingest import IngestQueue
+from network import Server, AsyncServer
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Servidor de resultados de la Máquina Arcade')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--engine', choices=('threaded', 'async'), default='threaded',
+                        help='threaded: un hilo por conexión; async: un único bucle asyncio')
+    parser.add_argument('--db-workers', type=int, default=4,
+                        help='hilos dedicados a escribir en la BD (solo engine async sin lotes)')
+    parser.add_argument('--db', default=None,
+                        help='ruta de la BD SQLite (por defecto server/resultados.db o ARCADE_DB_PATH)')
+    parser.add_argument('--db-profile', choices=sorted(PROFILES), default=None,
+                        help='perfil de ajuste de SQLite (por defecto wal o ARCADE_DB_PROFILE)')
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help='resultados por transacción; 0 desactiva la ingesta por lotes')
+    parser.add_argument('--batch-delay-ms', type=float, default=20,
+                        help='espera máxima antes de escribir un lote incompleto')
+    return parser.parse_args()
 
 def main():
-    srv = Server()
-    srv.start()
+    args = parse_args()
+    if args.db or args.db_profile:
+        configure_engine(args.db, args.db_profile)
+
+    ingest = None
+    if args.batch_size > 0:
+        ingest = IngestQueue(args.batch_size, args.batch_delay_ms / 1000).start()
+
+    if args.engine == 'async':
+        srv = AsyncServer(args.host, args.port, db_workers=args.db_workers, ingest=ingest)
+    else:
+        srv = Server(args.host, args.port, ingest=ingest)
+    try:
+        srv.start()
+    finally:
+        if ingest is not None:
+            ingest.stop()
 
 if __name__ == '__main__':
     main()
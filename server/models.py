@@ -1,11 +1,16 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, Boolean, DateTime
+from sqlalchemy import Column, Integer, Boolean, DateTime, Index
 import datetime
 
 Base = declarative_base()
 
 class ReinasResult(Base):
     __tablename__ = 'reinas_results'
+    __table_args__ = (
+        # Mejor número de pasos por N (leaderboards) y ventanas temporales
+        Index('ix_reinas_results_N_resuelto_pasos', 'N', 'resuelto', 'pasos'),
+        Index('ix_reinas_results_timestamp', 'timestamp'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     N = Column(Integer, nullable=False)
@@ -13,24 +18,70 @@ class ReinasResult(Base):
     pasos = Column(Integer, nullable=False)
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
 
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Text, cast, func
+from sqlalchemy.ext.hybrid import hybrid_property
 
 class CaballoResult(Base):
     __tablename__ = 'caballo_results'
+    __table_args__ = (
+        Index('ix_caballo_results_inicio_completado_movimientos', 'inicio', 'completado', 'movimientos'),
+        Index('ix_caballo_results_timestamp', 'timestamp'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    inicio = Column(String, nullable=False)       # e.g. "A1"
+    N = Column(Integer, nullable=True)            # lado del tablero (NULL en filas antiguas: 8)
+    inicio = Column(String, nullable=False)       # e.g. "A1" o "fila,columna" si N > 26
     movimientos = Column(Integer, nullable=False) # número de movimientos realizados
     completado = Column(Boolean, nullable=False)  # True si cubrió todo el tablero
+    recorrido = Column(Text, nullable=True)       # JSON [[fila, col], ...] si el cliente lo envía
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
 
+    @hybrid_property
+    def parametro(self):
+        # Tablero y casilla inicial ("8:A1"): la misma casilla en tableros
+        # distintos es otra partida
+        return f'{self.N or 8}:{self.inicio}'
+
+    @parametro.expression
+    def parametro(cls):
+        return cast(func.coalesce(cls.N, 8), String) + ':' + cls.inicio
+
 from sqlalchemy import Column
 
 class HanoiResult(Base):
     __tablename__ = 'hanoi_results'
+    __table_args__ = (
+        Index('ix_hanoi_results_discos_resuelto_movimientos', 'discos', 'resuelto', 'movimientos'),
+        Index('ix_hanoi_results_timestamp', 'timestamp'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     discos = Column(Integer, nullable=False)      # número de discos iniciales
     movimientos = Column(Integer, nullable=False) # movimientos realizados
     resuelto = Column(Boolean, nullable=False)    # True si resolvió
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+
+from sqlalchemy import UniqueConstraint
+
+class ResultRollup(Base):
+    """
+    Agregados por juego, parámetro (N, tablero y casilla inicial o discos) e intervalo
+    (hora o día). Se actualizan de forma incremental al guardar cada lote
+    de resultados (ver rollups.py).
+    """
+    __tablename__ = 'result_rollups'
+    __table_args__ = (
+        UniqueConstraint('juego', 'periodo', 'intervalo', 'parametro',
+                         name='uq_result_rollups_clave'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    juego = Column(String, nullable=False)        # nreinas | caballo | hanoi
+    periodo = Column(String, nullable=False)      # hour | day
+    intervalo = Column(String, nullable=False)    # e.g. "2024-05-01 13:00" o "2024-05-01"
+    parametro = Column(String, nullable=False)    # N, "N:casilla" (caballo) o discos
+    partidas = Column(Integer, nullable=False, default=0)
+    resueltas = Column(Integer, nullable=False, default=0)
+    suma_marca = Column(Integer, nullable=False, default=0)  # suma de pasos/movimientos
+    mejor_marca = Column(Integer, nullable=True)  # mínimo entre las resueltas
+    optimas = Column(Integer, nullable=False, default=0)     # Hanói: resueltas en 2^n - 1
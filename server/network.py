@@ -1,17 +1,58 @@
+import asyncio
 import socket
 import threading
 import json
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
-from db import init_db, SessionLocal
-from models import ReinasResult, CaballoResult, HanoiResult
+from db import init_db
+from ingest import resolved, store_result
+from protocol import MAGIC, FrameDecoder, LegacyDecoder, encode_frame, is_magic_prefix
+
+# Espera máxima por la respuesta de la BD (cola de ingesta o escritura
+# directa) antes de contestar NACK, para no bloquear la conexión para siempre
+RESPONSE_TIMEOUT = 30
+
+def wait_response(fut):
+    """Resultado del Future de un mensaje, o NACK si no llega a tiempo."""
+    try:
+        return fut.result(timeout=RESPONSE_TIMEOUT)
+    except FutureTimeout:
+        print(f'⚠️ Sin respuesta de la BD en {RESPONSE_TIMEOUT} s')
+        return b'NACK'
+
+def parse_payload(data):
+    """Decodifica el JSON recibido; devuelve None si no es válido."""
+    try:
+        text = data.decode()
+        print(f'📨 Recibido raw: {text[:200]}')
+        payload = json.loads(text)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        print(f'⚠️ JSON inválido: {e}')
+        return None
+    if not isinstance(payload, dict):
+        print('⚠️ JSON inválido: se esperaba un objeto')
+        return None
+    return payload
+
+def store_or_nack(payload):
+    """Como store_result, pero cualquier error se traduce en NACK."""
+    try:
+        return store_result(payload)
+    except Exception as e:
+        print(f'⚠️ Error guardando resultado: {e}')
+        return b'NACK'
 
 class Server:
-    def __init__(self, host='127.0.0.1', port=5000):
+    def __init__(self, host='127.0.0.1', port=5000, timeout=300, ingest=None):
         # Inicializa la base de datos (crea tablas si no existen)
         init_db()
 
         self.host = host
         self.port = port
+        # Cola de ingesta por lotes (IngestQueue); sin ella, un commit por resultado
+        self.ingest = ingest
+        # Tiempo máximo de inactividad de una conexión antes de cerrarla
+        self.timeout = timeout
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.sock.bind((self.host, self.port))
         self.sock.listen()
@@ -19,66 +60,77 @@ class Server:
     def handle_client(self, conn, addr):
         print(f'🌐 Conexión entrante desde {addr}')
         try:
-            data = conn.recv(4096)
-            text = data.decode()
-            print(f'📨 Recibido raw: {text}')
-
-            # Intentamos parsear JSON
-            try:
-                payload = json.loads(text)
-            except json.JSONDecodeError as e:
-                print(f'⚠️ JSON inválido: {e}')
-                conn.sendall(b'NACK')
-                return
-
-            juego = payload.get('juego')
-            sess = SessionLocal()
-
-            if juego == 'nreinas':
-                resultado = ReinasResult(
-                    N=payload['N'],
-                    resuelto=payload['resuelto'],
-                    pasos=payload['pasos']
-                )
-                sess.add(resultado)
-                sess.commit()
-                print(f'✅ Guardado N‑Reinas: N={payload["N"]}, pasos={payload["pasos"]}')
-                conn.sendall(b'ACK')
-
-            elif juego == 'caballo':
-                resultado = CaballoResult(
-                    inicio=payload['inicio'],
-                    movimientos=payload['movimientos'],
-                    completado=payload['completado']
-                )
-                sess.add(resultado)
-                sess.commit()
-                print(f'✅ Guardado Knight’s Tour: inicio={payload["inicio"]}, movimientos={payload["movimientos"]}')
-                conn.sendall(b'ACK')
-
-            elif juego == 'hanoi':
-                resultado = HanoiResult(
-                    discos=payload['discos'],
-                    movimientos=payload['movimientos'],
-                    resuelto=payload['resuelto']
-                )
-                sess.add(resultado)
-                sess.commit()
-                print(f'✅ Guardado Hanói: discos={payload["discos"]}, movimientos={payload["movimientos"]}, resuelto={payload["resuelto"]}')
-                conn.sendall(b'ACK')
+            conn.settimeout(self.timeout)
+            buf = conn.recv(4096)
+            while buf and is_magic_prefix(buf):
+                chunk = conn.recv(4096)
+                if not chunk:
+                    break
+                buf += chunk
 
+            if buf.startswith(MAGIC):
+                self.serve_framed(conn, buf[len(MAGIC):])
             else:
-                print(f'ℹ️ Juego no soportado: {juego}')
-                conn.sendall(b'NACK')
-
-            sess.close()
+                self.serve_legacy(conn, buf)
 
         except Exception as e:
             print(f'⚠️ Error manejando cliente {addr}: {e}')
-            conn.sendall(b'NACK')
+            try:
+                conn.sendall(b'NACK')
+            except OSError:
+                pass
         finally:
             conn.close()
 
+    def serve_legacy(self, conn, buf):
+        # Un único JSON sin cabecera: leemos hasta que se cierre el objeto, el
+        # cliente cierre su lado o el JSON ya no pueda ser válido
+        decoder = LegacyDecoder()
+        try:
+            complete = decoder.feed(buf)
+            while not complete:
+                chunk = conn.recv(4096)
+                if not chunk:
+                    break
+                complete = decoder.feed(chunk)
+        except ValueError as e:
+            print(f'⚠️ {e}')
+            conn.sendall(b'NACK')
+            return
+        conn.sendall(wait_response(self.submit(bytes(decoder.buffer))))
+
+    def submit(self, data):
+        """Procesa un mensaje completo; devuelve un Future con la respuesta."""
+        payload = parse_payload(data)
+        if payload is None:
+            return resolved(b'NACK')
+        if self.ingest is not None:
+            return self.ingest.submit(payload)
+        return resolved(store_or_nack(payload))
+
+    def serve_framed(self, conn, buf):
+        # Conexión persistente: una respuesta por trama, en orden
+        decoder = FrameDecoder()
+        chunk = buf
+        while True:
+            try:
+                frames = decoder.feed(chunk)
+            except ValueError as e:
+                print(f'⚠️ Trama inválida: {e}')
+                conn.sendall(encode_frame(b'NACK'))
+                return
+            # Se encolan todas las tramas recibidas antes de esperar las
+            # respuestas, para que puedan caer en el mismo lote
+            futures = [self.submit(body) for body in frames]
+            for fut in futures:
+                conn.sendall(encode_frame(wait_response(fut)))
+            try:
+                chunk = conn.recv(65536)
+            except socket.timeout:
+                return
+            if not chunk:
+                return
+
     def start(self):
         print(f'🚀 Servidor escuchando en {self.host}:{self.port}')
         try:
@@ -92,5 +144,130 @@ class Server:
         finally:
             self.sock.close()
 
+class AsyncServer:
+    """
+    Variante asyncio del servidor: todas las conexiones comparten un único
+    bucle de eventos y las escrituras en la BD se ejecutan en un pool de
+    hilos acotado, de modo que cientos de clientes no crean cientos de hilos.
+    Habla los mismos protocolos (antiguo y con tramas) que Server.
+    """
+
+    def __init__(self, host='127.0.0.1', port=5000, db_workers=4, max_pending=256, timeout=300,
+                 ingest=None):
+        init_db()
+
+        self.host = host
+        self.port = port
+        self.ingest = ingest
+        self.db_workers = db_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.executor = None
+        self.pending = None
+
+    async def read(self, reader):
+        return await asyncio.wait_for(reader.read(65536), self.timeout)
+
+    async def process(self, data):
+        payload = parse_payload(data)
+        if payload is None:
+            return b'NACK'
+        # Limita cuántas escrituras esperan turno (en la cola o en el executor)
+        async with self.pending:
+            if self.ingest is not None:
+                fut = asyncio.wrap_future(self.ingest.submit(payload))
+            else:
+                loop = asyncio.get_running_loop()
+                fut = loop.run_in_executor(self.executor, store_or_nack, payload)
+            try:
+                return await asyncio.wait_for(fut, RESPONSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f'⚠️ Sin respuesta de la BD en {RESPONSE_TIMEOUT} s')
+                return b'NACK'
+
+    async def handle_client(self, reader, writer):
+        addr = writer.get_extra_info('peername')
+        print(f'🌐 Conexión entrante desde {addr}')
+        try:
+            buf = await self.read(reader)
+            while buf and is_magic_prefix(buf):
+                chunk = await self.read(reader)
+                if not chunk:
+                    break
+                buf += chunk
+
+            if buf.startswith(MAGIC):
+                await self.serve_framed(reader, writer, buf[len(MAGIC):])
+            else:
+                await self.serve_legacy(reader, writer, buf)
+
+        except Exception as e:
+            print(f'⚠️ Error manejando cliente {addr}: {e}')
+            try:
+                writer.write(b'NACK')
+                await writer.drain()
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def serve_legacy(self, reader, writer, buf):
+        decoder = LegacyDecoder()
+        try:
+            complete = decoder.feed(buf)
+            while not complete:
+                chunk = await self.read(reader)
+                if not chunk:
+                    break
+                complete = decoder.feed(chunk)
+        except ValueError as e:
+            print(f'⚠️ {e}')
+            writer.write(b'NACK')
+        else:
+            writer.write(await self.process(bytes(decoder.buffer)))
+        await writer.drain()
+
+    async def serve_framed(self, reader, writer, buf):
+        decoder = FrameDecoder()
+        chunk = buf
+        while True:
+            try:
+                frames = decoder.feed(chunk)
+            except ValueError as e:
+                print(f'⚠️ Trama inválida: {e}')
+                writer.write(encode_frame(b'NACK'))
+                await writer.drain()
+                return
+            # Las tramas que llegan juntas se procesan a la vez; gather
+            # conserva el orden de las respuestas
+            responses = await asyncio.gather(*(self.process(body) for body in frames))
+            for resp in responses:
+                writer.write(encode_frame(resp))
+            await writer.drain()
+            try:
+                chunk = await self.read(reader)
+            except asyncio.TimeoutError:
+                return
+            if not chunk:
+                return
+
+    async def serve(self):
+        self.executor = ThreadPoolExecutor(max_workers=self.db_workers,
+                                           thread_name_prefix='db')
+        self.pending = asyncio.Semaphore(self.max_pending)
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        print(f'🚀 Servidor asyncio escuchando en {self.host}:{self.port}')
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=True)
+
+    def start(self):
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            print('\n🛑 Servidor detenido por teclado')
+
 if __name__ == '__main__':
     Server().start()
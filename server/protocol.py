@@ -0,0 +1,194 @@
+import struct
+
+# Protocolo con tramas de longitud prefijada.
+#
+# Un cliente "framed" abre la conexión enviando MAGIC y después tantas tramas
+# como quiera: cada trama es la longitud del cuerpo (4 bytes, big-endian)
+# seguida del JSON en UTF-8. El servidor responde a cada trama, en el mismo
+# orden, con otra trama que contiene b'ACK' o b'NACK', así que el cliente
+# puede encadenar envíos sin esperar las respuestas intermedias.
+#
+# Los clientes antiguos envían el JSON sin cabecera y esperan b'ACK'/b'NACK'
+# en crudo; se distinguen porque nunca empiezan por MAGIC.
+MAGIC = b'ARCF'
+HEADER = struct.Struct('!I')
+MAX_FRAME = 16 * 1024 * 1024
+
+def encode_frame(body):
+    """Antepone la cabecera de longitud a `body` (bytes)."""
+    if len(body) > MAX_FRAME:
+        raise ValueError(f'Trama de {len(body)} bytes supera el máximo ({MAX_FRAME})')
+    return HEADER.pack(len(body)) + body
+
+def is_magic_prefix(buf):
+    """True si `buf` podría ser todavía el comienzo de MAGIC."""
+    return len(buf) < len(MAGIC) and MAGIC.startswith(buf)
+
+_WS = frozenset(b' \t\r\n')
+_ESCAPES = frozenset(b'"\\/bfnrt')
+_HEX = frozenset(b'0123456789abcdefABCDEF')
+_NUMBER = frozenset(b'0123456789+-.eE')
+_LITERALS = {ord('t'): b'rue', ord('f'): b'alse', ord('n'): b'ull'}
+_CLOSE = {ord('}'): ord('{'), ord(']'): ord('[')}
+
+class LegacyDecoder:
+    """
+    Lector incremental de un mensaje del modo antiguo (un objeto JSON sin
+    cabecera). Cada byte se examina una sola vez con una pequeña máquina de
+    estados de la sintaxis JSON, de modo que:
+
+    - feed() devuelve True en cuanto se cierra el objeto de primer nivel, sin
+      volver a parsear todo el búfer con cada trozo recibido;
+    - un error de sintaxis lanza ValueError en el byte que lo provoca, en vez
+      de esperar datos que nunca completarán el JSON (y al timeout).
+
+    La validación fina (números, unicode) la sigue haciendo json.loads en
+    parse_payload; aquí solo importa dónde termina el mensaje.
+    """
+
+    def __init__(self, max_size=MAX_FRAME):
+        self.max_size = max_size
+        self.buffer = bytearray()
+        self.pos = 0
+        self.stack = []
+        self.state = 'top'
+        self.pending = b''      # resto esperado de true/false/null
+        self.hex_left = 0
+        self.is_key = False
+
+    def _fail(self, what):
+        raise ValueError(f'JSON inválido en el byte {self.pos}: {what}')
+
+    def _after_value(self):
+        self.state = 'after_value' if self.stack else 'done'
+
+    def _start_value(self, b, allow_close):
+        if b == ord('{'):
+            self.stack.append(b)
+            self.state = 'key_or_close'
+        elif b == ord('['):
+            self.stack.append(b)
+            self.state = 'value_or_close'
+        elif b == ord('"'):
+            self.is_key = False
+            self.state = 'string'
+        elif b in _LITERALS:
+            self.pending = _LITERALS[b]
+            self.state = 'literal'
+        elif b == ord('-') or ord('0') <= b <= ord('9'):
+            self.state = 'number'
+        elif allow_close and b == ord(']'):
+            self._close(b)
+        else:
+            self._fail(f'se esperaba un valor y llegó {chr(b)!r}')
+
+    def _close(self, b):
+        if not self.stack or self.stack[-1] != _CLOSE[b]:
+            self._fail(f'{chr(b)!r} no cierra nada')
+        self.stack.pop()
+        self._after_value()
+
+    def _step(self, b):
+        state = self.state
+        if state == 'string':
+            if b == ord('"'):
+                if self.is_key:
+                    self.state = 'colon'
+                else:
+                    self._after_value()
+            elif b == ord('\\'):
+                self.state = 'escape'
+            elif b < 0x20:
+                self._fail('carácter de control dentro de una cadena')
+        elif state == 'escape':
+            if b == ord('u'):
+                self.hex_left = 4
+                self.state = 'unicode'
+            elif b in _ESCAPES:
+                self.state = 'string'
+            else:
+                self._fail(f'escape inválido \\{chr(b)}')
+        elif state == 'unicode':
+            if b not in _HEX:
+                self._fail('escape \\u inválido')
+            self.hex_left -= 1
+            if not self.hex_left:
+                self.state = 'string'
+        elif state == 'literal':
+            if b != self.pending[0]:
+                self._fail('literal inválido')
+            self.pending = self.pending[1:]
+            if not self.pending:
+                self._after_value()
+        elif state == 'number' and b in _NUMBER:
+            pass
+        else:
+            if state == 'number':
+                # El byte que termina el número se procesa como tras un valor
+                self._after_value()
+                state = self.state
+            if b in _WS:
+                return
+            if state == 'top':
+                if b != ord('{'):
+                    self._fail('se esperaba un objeto')
+                self._start_value(b, False)
+            elif state in ('value', 'value_or_close'):
+                self._start_value(b, state == 'value_or_close')
+            elif state in ('key', 'key_or_close'):
+                if b == ord('"'):
+                    self.is_key = True
+                    self.state = 'string'
+                elif state == 'key_or_close' and b == ord('}'):
+                    self._close(b)
+                else:
+                    self._fail('se esperaba una clave')
+            elif state == 'colon':
+                if b != ord(':'):
+                    self._fail("se esperaba ':'")
+                self.state = 'value'
+            elif state == 'after_value':
+                if b == ord(','):
+                    self.state = 'key' if self.stack[-1] == ord('{') else 'value'
+                elif b in _CLOSE:
+                    self._close(b)
+                else:
+                    self._fail("se esperaba ',' o el cierre")
+
+    def feed(self, data):
+        """
+        Añade bytes. Devuelve True cuando el objeto está completo (el mensaje
+        es self.buffer) y lanza ValueError si ya no puede ser JSON válido.
+        """
+        self.buffer.extend(data)
+        if len(self.buffer) > self.max_size:
+            raise ValueError(f'Mensaje de más de {self.max_size} bytes')
+        buf = self.buffer
+        while self.pos < len(buf) and self.state != 'done':
+            self._step(buf[self.pos])
+            self.pos += 1
+        return self.state == 'done'
+
+class FrameDecoder:
+    """
+    Decodificador incremental de tramas: se le pasan los bytes según llegan
+    del socket y devuelve los cuerpos completos que haya reunido.
+    """
+
+    def __init__(self, max_frame=MAX_FRAME):
+        self.max_frame = max_frame
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        self.buffer.extend(data)
+        frames = []
+        while len(self.buffer) >= HEADER.size:
+            (length,) = HEADER.unpack_from(self.buffer)
+            if length > self.max_frame:
+                raise ValueError(f'Trama de {length} bytes supera el máximo ({self.max_frame})')
+            end = HEADER.size + length
+            if len(self.buffer) < end:
+                break
+            frames.append(bytes(self.buffer[HEADER.size:end]))
+            del self.buffer[:end]
+        return frames
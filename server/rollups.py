@@ -0,0 +1,126 @@
+"""
+Mantenimiento incremental de la tabla result_rollups.
+
+Cada lote que guarda la ingesta se resume en memoria por
+(juego, periodo, intervalo, parámetro) y se suma a los agregados existentes
+con un único UPSERT por grupo, dentro de la misma transacción que las filas.
+Así las estadísticas se leen en O(grupos) en lugar de recorrer las tablas.
+"""
+from sqlalchemy import func, select, case, cast, literal, delete, String
+from sqlalchemy.dialects.sqlite import insert
+
+from models import ReinasResult, CaballoResult, HanoiResult, ResultRollup
+
+# Formato de cada intervalo; coincide con el de stats.BUCKETS
+PERIODOS = {
+    'hour': '%Y-%m-%d %H:00',
+    'day': '%Y-%m-%d',
+}
+
+# modelo -> (juego, atributo de parámetro, atributo de marca, atributo de éxito)
+SOURCES = {
+    ReinasResult: ('nreinas', 'N', 'pasos', 'resuelto'),
+    CaballoResult: ('caballo', 'parametro', 'movimientos', 'completado'),  # "N:casilla"
+    HanoiResult: ('hanoi', 'discos', 'movimientos', 'resuelto'),
+}
+
+def _es_optima(resultado, resuelto):
+    # Solo Hanói tiene un óptimo conocido a priori: 2^n - 1 movimientos. Se
+    # compara con bit_length en lugar de calcular 2 ** discos, que llega del
+    # cliente sin acotar y bloquearía el hilo escritor con un n enorme
+    if not (isinstance(resultado, HanoiResult) and resuelto):
+        return False
+    movs, discos = resultado.movimientos, resultado.discos
+    return (isinstance(movs, int) and isinstance(discos, int) and movs >= 0
+            and movs & (movs + 1) == 0 and movs.bit_length() == discos)
+
+def summarize(resultados):
+    """Agrupa una lista de filas ORM en deltas por clave de rollup."""
+    deltas = {}
+    for resultado in resultados:
+        juego, param_attr, score_attr, ok_attr = SOURCES[type(resultado)]
+        parametro = str(getattr(resultado, param_attr))
+        marca = getattr(resultado, score_attr)
+        resuelto = bool(getattr(resultado, ok_attr))
+        optima = _es_optima(resultado, resuelto)
+
+        for periodo, fmt in PERIODOS.items():
+            key = (juego, periodo, resultado.timestamp.strftime(fmt), parametro)
+            d = deltas.get(key)
+            if d is None:
+                d = deltas[key] = {'partidas': 0, 'resueltas': 0, 'suma_marca': 0,
+                                   'mejor_marca': None, 'optimas': 0}
+            d['partidas'] += 1
+            d['suma_marca'] += marca
+            if resuelto:
+                d['resueltas'] += 1
+                if d['mejor_marca'] is None or marca < d['mejor_marca']:
+                    d['mejor_marca'] = marca
+            if optima:
+                d['optimas'] += 1
+    return deltas
+
+def apply_rollups(sess, resultados):
+    """
+    Suma `resultados` (filas ORM con timestamp ya asignado) a result_rollups.
+    Debe llamarse en la misma transacción en la que se guardan las filas.
+    """
+    deltas = summarize(resultados)
+    if not deltas:
+        return
+    rows = [
+        dict(juego=juego, periodo=periodo, intervalo=intervalo, parametro=parametro, **d)
+        for (juego, periodo, intervalo, parametro), d in deltas.items()
+    ]
+    stmt = insert(ResultRollup)
+    excluded = stmt.excluded
+    tabla = ResultRollup.__table__.c
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['juego', 'periodo', 'intervalo', 'parametro'],
+        set_={
+            'partidas': tabla.partidas + excluded.partidas,
+            'resueltas': tabla.resueltas + excluded.resueltas,
+            'suma_marca': tabla.suma_marca + excluded.suma_marca,
+            # min() escalar de SQLite devuelve NULL si algún argumento lo es
+            'mejor_marca': func.min(func.coalesce(tabla.mejor_marca, excluded.mejor_marca),
+                                    func.coalesce(excluded.mejor_marca, tabla.mejor_marca)),
+            'optimas': tabla.optimas + excluded.optimas,
+        },
+    )
+    sess.execute(stmt, rows)
+
+def rebuild_rollups(sess):
+    """
+    Recalcula result_rollups desde cero a partir de las tablas de resultados.
+    Útil la primera vez sobre una BD con datos previos; recorre todas las filas.
+    """
+    sess.execute(delete(ResultRollup))
+    for model, (juego, param_attr, score_attr, ok_attr) in SOURCES.items():
+        param_col = getattr(model, param_attr)
+        score_col = getattr(model, score_attr)
+        ok_col = getattr(model, ok_attr)
+        if model is HanoiResult:
+            minimo = literal(1).op('<<')(model.discos) - 1
+            optima = case(((ok_col.is_(True)) & (score_col == minimo), 1), else_=0)
+        else:
+            optima = literal(0)
+
+        for periodo, fmt in PERIODOS.items():
+            intervalo = func.strftime(fmt, model.timestamp)
+            parametro = cast(param_col, String)
+            query = (select(
+                        literal(juego), literal(periodo), intervalo, parametro,
+                        func.count(),
+                        func.sum(case((ok_col.is_(True), 1), else_=0)),
+                        func.sum(score_col),
+                        func.min(case((ok_col.is_(True), score_col), else_=None)),
+                        func.sum(optima))
+                     .where(model.timestamp.isnot(None))
+                     .group_by(intervalo, param_col))
+            sess.execute(
+                ResultRollup.__table__.insert().from_select(
+                    ['juego', 'periodo', 'intervalo', 'parametro', 'partidas',
+                     'resueltas', 'suma_marca', 'mejor_marca', 'optimas'],
+                    query
+                )
+            )
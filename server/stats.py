@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Consultas agregadas sobre los resultados: leaderboards, mejores marcas por
+parámetro y tasas de resolución por ventana temporal.
+
+Todas las consultas se apoyan en los índices de models.py y devuelven páginas
+(limit/offset) o iteradores que leen por bloques, nunca la tabla entera.
+Los resúmenes (summary_by_param, summary_series) leen la tabla de rollups
+mantenida por la ingesta, así que cuestan O(grupos) y no O(filas).
+
+Uso desde línea de comandos (en la carpeta server/):
+    python stats.py leaderboard nreinas --param 8
+    python stats.py best hanoi
+    python stats.py rate caballo --bucket hour --since 2024-01-01
+    python stats.py summary hanoi
+    python stats.py series nreinas --periodo hour --param 8
+    python stats.py dump nreinas
+    python stats.py rebuild-rollups
+"""
+import argparse
+import datetime
+
+from sqlalchemy import select, func, case
+
+from db import SessionLocal, init_db
+from models import ReinasResult, CaballoResult, HanoiResult, ResultRollup
+from rollups import PERIODOS, rebuild_rollups
+
+# juego -> (modelo, columna de parámetro, columna de marca, columna de éxito)
+GAMES = {
+    'nreinas': (ReinasResult, ReinasResult.N, ReinasResult.pasos, ReinasResult.resuelto),
+    'caballo': (CaballoResult, CaballoResult.parametro, CaballoResult.movimientos, CaballoResult.completado),
+    'hanoi': (HanoiResult, HanoiResult.discos, HanoiResult.movimientos, HanoiResult.resuelto),
+}
+
+BUCKETS = {
+    'hour': '%Y-%m-%d %H:00',
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m',
+}
+
+def _game(juego):
+    try:
+        return GAMES[juego]
+    except KeyError:
+        raise ValueError(f'Juego desconocido: {juego} (opciones: {", ".join(GAMES)})')
+
+def caballo_param(param):
+    """Clave "N:casilla" del caballo; una casilla sola ("A1") es del tablero 8×8."""
+    param = str(param)
+    return param if ':' in param else f'8:{param}'
+
+def _caballo_orden(grupo):
+    tablero, _, casilla = grupo.rpartition(':')
+    return int(tablero or 8), casilla
+
+def _where_param(query, juego, param_col, param):
+    if juego != 'caballo':
+        return query.where(param_col == param)
+    param = caballo_param(param)
+    # Filtrar también por inicio deja usar el índice de caballo_results
+    return query.where(param_col == param, CaballoResult.inicio == param.split(':', 1)[1])
+
+def leaderboard(juego, param=None, limit=10, offset=0):
+    """
+    Mejores partidas resueltas (menos pasos/movimientos primero).
+    Con `param` se limita a un N / tablero y casilla inicial / número de discos.
+    """
+    model, param_col, score_col, ok_col = _game(juego)
+    query = (select(model.id, param_col, score_col, model.timestamp)
+             .where(ok_col.is_(True))
+             .order_by(score_col, model.timestamp)
+             .limit(limit).offset(offset))
+    if param is not None:
+        query = _where_param(query, juego, param_col, param)
+
+    with SessionLocal() as sess:
+        return [
+            {'id': row[0], 'param': row[1], 'marca': row[2], 'timestamp': row[3]}
+            for row in sess.execute(query)
+        ]
+
+def best_by_param(juego, limit=100, offset=0):
+    """Mejor marca, número de partidas resueltas por cada valor del parámetro."""
+    model, param_col, score_col, ok_col = _game(juego)
+    query = (select(param_col, func.min(score_col), func.count())
+             .where(ok_col.is_(True))
+             .group_by(param_col)
+             .order_by(param_col)
+             .limit(limit).offset(offset))
+
+    with SessionLocal() as sess:
+        return [
+            {'param': row[0], 'mejor': row[1], 'resueltas': row[2]}
+            for row in sess.execute(query)
+        ]
+
+def solve_rate(juego, since=None, until=None, bucket='day', param=None):
+    """
+    Partidas, partidas resueltas y tasa de resolución por intervalo
+    (`bucket`: hour, day, week o month) dentro de [since, until).
+    """
+    model, param_col, score_col, ok_col = _game(juego)
+    if bucket not in BUCKETS:
+        raise ValueError(f'Intervalo desconocido: {bucket} (opciones: {", ".join(BUCKETS)})')
+    periodo = func.strftime(BUCKETS[bucket], model.timestamp)
+    query = (select(periodo, func.count(), func.sum(case((ok_col.is_(True), 1), else_=0)))
+             .group_by(periodo)
+             .order_by(periodo))
+    if since is not None:
+        query = query.where(model.timestamp >= since)
+    if until is not None:
+        query = query.where(model.timestamp < until)
+    if param is not None:
+        query = _where_param(query, juego, param_col, param)
+
+    with SessionLocal() as sess:
+        return [
+            {'periodo': row[0], 'partidas': row[1], 'resueltas': row[2],
+             'tasa': row[2] / row[1] if row[1] else 0.0}
+            for row in sess.execute(query)
+        ]
+
+def iter_results(juego, batch=1000, since=None):
+    """
+    Recorre todas las filas de un juego en orden de id, leyendo por bloques de
+    `batch` con paginación por clave (id > último), sin cargar la tabla entera.
+    """
+    model = _game(juego)[0]
+    columns = [c.name for c in model.__table__.columns]
+    last_id = 0
+    while True:
+        query = select(model.__table__).where(model.id > last_id).order_by(model.id).limit(batch)
+        if since is not None:
+            query = query.where(model.timestamp >= since)
+        with SessionLocal() as sess:
+            rows = sess.execute(query).all()
+        if not rows:
+            return
+        for row in rows:
+            yield dict(zip(columns, row))
+        last_id = rows[-1][0]
+
+def _summary_row(row):
+    partidas, resueltas, suma, mejor, optimas = row[1:]
+    return {
+        'grupo': row[0],
+        'partidas': partidas,
+        'resueltas': resueltas,
+        'tasa': resueltas / partidas if partidas else 0.0,
+        'media_marca': suma / partidas if partidas else None,
+        'mejor': mejor,
+        'optimas': optimas,
+    }
+
+def _summary_columns():
+    r = ResultRollup
+    return (func.sum(r.partidas), func.sum(r.resueltas), func.sum(r.suma_marca),
+            func.min(r.mejor_marca), func.sum(r.optimas))
+
+def summary_by_param(juego, since=None):
+    """
+    Por cada parámetro: partidas, tasa de resolución, marca media, mejor marca
+    y (en Hanói) partidas óptimas. `since` es una fecha 'YYYY-MM-DD'.
+    """
+    _game(juego)
+    r = ResultRollup
+    query = (select(r.parametro, *_summary_columns())
+             .where(r.juego == juego, r.periodo == 'day')
+             .group_by(r.parametro)
+             .order_by(r.parametro))
+    if since is not None:
+        query = query.where(r.intervalo >= since)
+
+    with SessionLocal() as sess:
+        rows = [_summary_row(row) for row in sess.execute(query)]
+    # parametro es texto; N y discos se ordenan numéricamente, y caballo por tablero
+    if juego == 'caballo':
+        rows.sort(key=lambda row: _caballo_orden(row['grupo']))
+    else:
+        rows.sort(key=lambda row: int(row['grupo']))
+    return rows
+
+def summary_series(juego, periodo='day', param=None, since=None, until=None):
+    """Serie temporal de los mismos agregados por hora o por día."""
+    _game(juego)
+    if periodo not in PERIODOS:
+        raise ValueError(f'Periodo desconocido: {periodo} (opciones: {", ".join(PERIODOS)})')
+    r = ResultRollup
+    query = (select(r.intervalo, *_summary_columns())
+             .where(r.juego == juego, r.periodo == periodo)
+             .group_by(r.intervalo)
+             .order_by(r.intervalo))
+    if param is not None:
+        query = query.where(r.parametro == (caballo_param(param) if juego == 'caballo' else str(param)))
+    if since is not None:
+        query = query.where(r.intervalo >= since)
+    if until is not None:
+        query = query.where(r.intervalo < until)
+
+    with SessionLocal() as sess:
+        return [_summary_row(row) for row in sess.execute(query)]
+
+def _parse_date(text):
+    return datetime.datetime.fromisoformat(text)
+
+def print_rows(rows):
+    if not rows:
+        print('(sin resultados)')
+        return
+    cols = list(rows[0])
+    print(' | '.join(cols))
+    for row in rows:
+        print(' | '.join(str(row[c]) for c in cols))
+
+def main():
+    parser = argparse.ArgumentParser(description='Estadísticas de la Máquina Arcade')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    p = sub.add_parser('leaderboard', help='mejores partidas resueltas')
+    p.add_argument('juego', choices=sorted(GAMES))
+    p.add_argument('--param', default=None, help='N, casilla inicial ("16:A1" o "A1" para 8×8) o discos')
+    p.add_argument('--limit', type=int, default=10)
+    p.add_argument('--offset', type=int, default=0)
+
+    p = sub.add_parser('best', help='mejor marca por parámetro')
+    p.add_argument('juego', choices=sorted(GAMES))
+    p.add_argument('--limit', type=int, default=100)
+    p.add_argument('--offset', type=int, default=0)
+
+    p = sub.add_parser('rate', help='tasa de resolución por intervalo')
+    p.add_argument('juego', choices=sorted(GAMES))
+    p.add_argument('--bucket', choices=sorted(BUCKETS), default='day')
+    p.add_argument('--since', type=_parse_date, default=None)
+    p.add_argument('--until', type=_parse_date, default=None)
+    p.add_argument('--param', default=None)
+
+    p = sub.add_parser('summary', help='agregados por parámetro (desde rollups)')
+    p.add_argument('juego', choices=sorted(GAMES))
+    p.add_argument('--since', default=None, help='YYYY-MM-DD')
+
+    p = sub.add_parser('series', help='agregados por hora o día (desde rollups)')
+    p.add_argument('juego', choices=sorted(GAMES))
+    p.add_argument('--periodo', choices=sorted(PERIODOS), default='day')
+    p.add_argument('--param', default=None)
+    p.add_argument('--since', default=None, help="'YYYY-MM-DD' o 'YYYY-MM-DD HH:00'")
+    p.add_argument('--until', default=None)
+
+    sub.add_parser('rebuild-rollups', help='recalcula los rollups desde las tablas')
+
+    p = sub.add_parser('dump', help='todas las filas, leídas por bloques')
+    p.add_argument('juego', choices=sorted(GAMES))
+    p.add_argument('--since', type=_parse_date, default=None)
+
+    args = parser.parse_args()
+    # El parámetro de nreinas/hanoi es numérico; el de caballo, "N:casilla"
+    param = getattr(args, 'param', None)
+    if param is not None and args.juego != 'caballo' and args.cmd != 'series':
+        param = int(param)
+
+    if args.cmd == 'leaderboard':
+        print_rows(leaderboard(args.juego, param, args.limit, args.offset))
+    elif args.cmd == 'best':
+        print_rows(best_by_param(args.juego, args.limit, args.offset))
+    elif args.cmd == 'rate':
+        print_rows(solve_rate(args.juego, args.since, args.until, args.bucket, param))
+    elif args.cmd == 'summary':
+        print_rows(summary_by_param(args.juego, args.since))
+    elif args.cmd == 'series':
+        print_rows(summary_series(args.juego, args.periodo, param, args.since, args.until))
+    elif args.cmd == 'rebuild-rollups':
+        # Crea las tablas que falten (BD nueva o anterior a los rollups)
+        init_db()
+        with SessionLocal() as sess:
+            rebuild_rollups(sess)
+            sess.commit()
+        print('✅ Rollups recalculados')
+    elif args.cmd == 'dump':
+        first = True
+        for row in iter_results(args.juego, since=args.since):
+            if first:
+                print(' | '.join(row))
+                first = False
+            print(' | '.join(str(v) for v in row.values()))
+
+if __name__ == '__main__':
+    main()